@@ -0,0 +1,24 @@
+"""Gunicorn settings, loaded automatically when gunicorn starts in backend/.
+
+Prometheus metrics are collected per worker into PROMETHEUS_MULTIPROC_DIR
+and aggregated by /metrics (see umami_api/metrics.py).
+"""
+import os
+import shutil
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/umami-prometheus')
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to this one's
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
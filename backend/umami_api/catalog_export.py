@@ -0,0 +1,216 @@
+"""Columnar binary export of the full catalog for bulk consumers.
+
+Rows are read through a server-side cursor (``QuerySet.iterator``) and
+regrouped into column batches, so memory stays bounded by ``batch_size``
+whatever the catalog size. Formats:
+
+- ``arrow``: Arrow IPC stream, one record batch per row batch (pyarrow)
+- ``parquet``: Parquet file, one row group per batch (pyarrow)
+- ``msgpack``: a header map followed by one ``{column: [values]}`` map per
+  batch, for consumers without Arrow (msgpack)
+
+Chemistry columns are float64 and TCM/flags tags are list<string> columns.
+
+``stream_ndjson`` serves JSON integrations the same way: one serialized
+ingredient per line, read from a server-side cursor in ``chunk_size`` rows.
+"""
+import io
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Ingredient
+
+EXPORT_SCHEMA_VERSION = 1
+
+# (column, ORM lookup, type) where type is int64, float64, string or list<string>
+EXPORT_COLUMNS = (
+    ('id', 'id', 'int64'),
+    ('base_name', 'base_name', 'string'),
+    ('display_name', 'display_name', 'string'),
+    ('category', 'category', 'string'),
+    ('flavor_role', 'flavor_role', 'string'),
+    ('glu', 'chemistry__glu', 'float64'),
+    ('asp', 'chemistry__asp', 'float64'),
+    ('imp', 'chemistry__imp', 'float64'),
+    ('gmp', 'chemistry__gmp', 'float64'),
+    ('amp', 'chemistry__amp', 'float64'),
+    ('umami_aa', 'chemistry__umami_aa', 'float64'),
+    ('umami_nuc', 'chemistry__umami_nuc', 'float64'),
+    ('umami_synergy', 'chemistry__umami_synergy', 'float64'),
+    ('four_qi', 'tcm__four_qi', 'list<string>'),
+    ('five_flavors', 'tcm__five_flavors', 'list<string>'),
+    ('meridians', 'tcm__meridians', 'list<string>'),
+    ('allergens', 'flags__allergens', 'list<string>'),
+    ('dietary_restrictions', 'flags__dietary_restrictions', 'list<string>'),
+    ('umami_tags', 'flags__umami_tags', 'list<string>'),
+    ('flavor_tags', 'flags__flavor_tags', 'list<string>'),
+    ('diet_class', 'flags__diet_class', 'string'),
+)
+
+EXPORT_FORMATS = {
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'msgpack': ('application/x-msgpack', 'msgpack'),
+}
+
+
+class ExportUnavailable(Exception):
+    """Raised when the library for an export format is not installed"""
+
+
+def _convert(value, column_type):
+    if column_type == 'float64':
+        return float(value) if value is not None else None
+    if column_type == 'list<string>':
+        return [str(tag) for tag in (value or [])]
+    return value
+
+
+def iter_batches(batch_size=5000, using=None):
+    """Yield ``{column: [values]}`` dicts of up to ``batch_size`` rows"""
+    queryset = Ingredient.objects.order_by('id').values_list(*[lookup for _, lookup, _ in EXPORT_COLUMNS])
+    if using:
+        queryset = queryset.using(using)
+
+    batch = []
+    for row in queryset.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield _columnar(batch)
+            batch = []
+    if batch:
+        yield _columnar(batch)
+
+
+def _columnar(rows):
+    return {
+        name: [_convert(row[i], column_type) for row in rows]
+        for i, (name, _, column_type) in enumerate(EXPORT_COLUMNS)
+    }
+
+
+def default_format():
+    """Arrow when pyarrow is installed, msgpack otherwise"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'msgpack'
+    return 'arrow'
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ExportUnavailable('pyarrow is not installed; use the msgpack format') from exc
+    return pyarrow
+
+
+def arrow_schema():
+    pa = _pyarrow()
+    types = {
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'string': pa.string(),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema(
+        [(name, types[column_type]) for name, _, column_type in EXPORT_COLUMNS],
+        metadata={'schema_version': str(EXPORT_SCHEMA_VERSION)},
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller in chunks"""
+
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _stream_pyarrow(batches, file_format):
+    pa = _pyarrow()
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    out = pa.PythonFile(sink, mode='w')
+    if file_format == 'parquet':
+        writer = pa.parquet.ParquetWriter(out, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_stream(out, schema)
+
+    for columns in batches:
+        if file_format == 'parquet':
+            # One row group per batch
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+        else:
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schema))
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+
+def _stream_msgpack(batches):
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ExportUnavailable('msgpack is not installed') from exc
+
+    yield msgpack.packb({
+        'schema_version': EXPORT_SCHEMA_VERSION,
+        'columns': [[name, column_type] for name, _, column_type in EXPORT_COLUMNS],
+    }, use_bin_type=True)
+    for columns in batches:
+        yield msgpack.packb(columns, use_bin_type=True)
+
+
+def check_format(file_format):
+    """Raise ExportUnavailable unless ``file_format`` can be produced here"""
+    if file_format not in EXPORT_FORMATS:
+        raise ExportUnavailable(f"Unknown format '{file_format}'; use one of {', '.join(EXPORT_FORMATS)}")
+    if file_format in ('arrow', 'parquet'):
+        _pyarrow()
+    else:
+        try:
+            import msgpack  # noqa: F401
+        except ImportError as exc:
+            raise ExportUnavailable('msgpack is not installed') from exc
+
+
+def stream_export(file_format, batch_size=5000, using=None):
+    """Yield the encoded catalog in ``file_format`` as byte chunks"""
+    check_format(file_format)
+    batches = iter_batches(batch_size, using=using)
+    if file_format == 'msgpack':
+        return _stream_msgpack(batches)
+    return _stream_pyarrow(batches, file_format)
+
+
+def stream_ndjson(queryset, serializer_class, chunk_size=2000):
+    """Yield NDJSON, one chunk of ``chunk_size`` serialized rows at a time.
+
+    ``queryset.iterator`` uses a named server-side cursor on Postgres, so
+    memory stays constant however many rows match.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    lines = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        lines.append(encoder.encode(serializer_class(obj).data))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,180 @@
+"""Static, content-hashed catalog snapshot for client-side filtering.
+
+The snapshot is one columnar JSON document holding every ingredient's list
+fields, its AA/Nuc/Synergy level (0-6, from the quantile table's global cut
+points, shared with the level filters and umamiLevels6.ts) and one bitset
+per tag facet, so a client can evaluate every list filter locally.
+
+It is written to ``STATIC_ROOT/catalog/catalog.<hash>.json`` with gzip (and
+brotli, when installed) siblings. The snapshot endpoint serves those with
+immutable caching because the name carries the content hash; it reads the
+directory on every request, so a snapshot rebuilt while the server runs
+(whitenoise only indexes files at startup) is available at once. The small
+``manifest.json`` next to it names the current file and is what the
+manifest endpoint returns.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Ingredient
+from .quantiles import QUANTILE_METRICS, get_quantile_table, umami_level
+
+SNAPSHOT_SCHEMA_VERSION = 1
+SNAPSHOT_DIR = 'catalog'
+SNAPSHOT_NAME_PATTERN = r'catalog\.[0-9a-f]{12}\.json'
+MANIFEST_NAME = 'manifest.json'
+
+COMPOUND_COLUMNS = ('glu', 'asp', 'imp', 'gmp', 'amp', 'umami_aa', 'umami_nuc', 'umami_synergy')
+
+# Facet -> (lookup, multi-valued); multi-valued facets become bitsets
+TAG_FACETS = {
+    'four_qi': ('tcm__four_qi', True),
+    'five_flavors': ('tcm__five_flavors', True),
+    'meridians': ('tcm__meridians', True),
+    'allergens': ('flags__allergens', True),
+    'dietary_restrictions': ('flags__dietary_restrictions', True),
+}
+
+# Single-valued facets, stored as an index into their vocabulary (-1 = none)
+CODED_FACETS = {
+    'category': 'category',
+    'flavor_role': 'flavor_role',
+    'diet_class': 'flags__diet_class',
+}
+
+BITSET_WORD_BITS = 32  # Words stay within JS 32-bit bitwise operators
+
+
+def _bitset(indices, words):
+    bits = [0] * words
+    for index in indices:
+        bits[index // BITSET_WORD_BITS] |= 1 << (index % BITSET_WORD_BITS)
+    return bits[0] if words == 1 else bits
+
+
+def build_snapshot():
+    """Return the snapshot document (without volatile fields like timestamps)"""
+    lookups = (
+        ['id', 'base_name', 'display_name']
+        + list(CODED_FACETS.values())
+        + [f'chemistry__{field}' for field in COMPOUND_COLUMNS]
+        + [lookup for lookup, _ in TAG_FACETS.values()]
+    )
+    rows = list(Ingredient.objects.order_by('id').values(*lookups))
+
+    vocab = {}
+    for facet, lookup in CODED_FACETS.items():
+        vocab[facet] = sorted({row[lookup] for row in rows if row[lookup]})
+    for facet, (lookup, _) in TAG_FACETS.items():
+        vocab[facet] = sorted({str(tag) for row in rows for tag in (row[lookup] or [])})
+    positions = {facet: {value: i for i, value in enumerate(values)} for facet, values in vocab.items()}
+
+    columns = {name: [row[name] for row in rows] for name in ('id', 'base_name', 'display_name')}
+    for facet, lookup in CODED_FACETS.items():
+        columns[facet] = [positions[facet].get(row[lookup], -1) for row in rows]
+    for field in COMPOUND_COLUMNS:
+        columns[field] = [round(float(row[f'chemistry__{field}'] or 0), 3) for row in rows]
+    table = get_quantile_table()
+    level_cuts = {metric: list(table.level_cuts(metric)) for metric in QUANTILE_METRICS}
+    for field, cuts in level_cuts.items():
+        columns[f'{field}_level'] = [umami_level(value, cuts) for value in columns[field]]
+
+    tags = {}
+    for facet, (lookup, _) in TAG_FACETS.items():
+        words = max(1, -(-len(vocab[facet]) // BITSET_WORD_BITS))
+        tags[facet] = [
+            _bitset({positions[facet][str(tag)] for tag in (row[lookup] or [])}, words)
+            for row in rows
+        ]
+
+    return {
+        'schema_version': SNAPSHOT_SCHEMA_VERSION,
+        'count': len(rows),
+        'level_cuts': level_cuts,
+        # Cut points for a single-category view, as the umami[] filter uses them
+        'category_level_cuts': table.category_level_cuts(),
+        'vocab': vocab,
+        'columns': columns,
+        'tags': tags,
+    }
+
+
+def snapshot_directory():
+    return os.path.join(settings.STATIC_ROOT, SNAPSHOT_DIR)
+
+
+def write_snapshot(snapshot, directory=None, keep=3):
+    """Write the hashed snapshot plus compressed siblings and the manifest.
+
+    Older snapshots beyond the ``keep`` most recent are removed so clients
+    holding a recent manifest can still fetch their file.
+    """
+    directory = directory or snapshot_directory()
+    os.makedirs(directory, exist_ok=True)
+
+    body = json.dumps(snapshot, separators=(',', ':'), sort_keys=True, ensure_ascii=False).encode()
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    name = f'catalog.{digest}.json'
+    path = os.path.join(directory, name)
+
+    with open(path, 'wb') as handle:
+        handle.write(body)
+    with open(f'{path}.gz', 'wb') as handle:
+        handle.write(gzip.compress(body, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        with open(f'{path}.br', 'wb') as handle:
+            handle.write(brotli.compress(body, quality=11))
+
+    manifest = {
+        'schema_version': SNAPSHOT_SCHEMA_VERSION,
+        'hash': digest,
+        'file': name,
+        'url': reverse('catalog-snapshot', args=[name]),
+        'count': snapshot['count'],
+        'bytes': len(body),
+        'generated_at': timezone.now().isoformat(),
+    }
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(f'{manifest_path}.tmp', 'w') as handle:
+        json.dump(manifest, handle)
+    os.replace(f'{manifest_path}.tmp', manifest_path)
+
+    snapshots = sorted(
+        (entry for entry in os.scandir(directory)
+         if entry.name.startswith('catalog.') and entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in snapshots[keep:]:
+        for suffix in ('', '.gz', '.br'):
+            if os.path.exists(entry.path + suffix):
+                os.remove(entry.path + suffix)
+
+    return manifest
+
+
+def snapshot_files(name, directory=None):
+    """``[(path, content encoding or None)]`` of snapshot ``name``, compressed forms first"""
+    path = os.path.join(directory or snapshot_directory(), name)
+    candidates = [(f'{path}.br', 'br'), (f'{path}.gz', 'gzip'), (path, None)]
+    return [(candidate, encoding) for candidate, encoding in candidates if os.path.exists(candidate)]
+
+
+def read_manifest(directory=None):
+    """Current manifest, or None if no snapshot has been built"""
+    path = os.path.join(directory or snapshot_directory(), MANIFEST_NAME)
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
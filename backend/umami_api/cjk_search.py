@@ -0,0 +1,120 @@
+"""Character-bigram search for Chinese ingredient names.
+
+pg_trgm splits text into three-character words padded with spaces, which
+suits alphabetic names but not two- or three-character Chinese names such as
+香菇 or 昆布: they share few trigrams with any query and most lookups end
+in ``icontains`` scans. Here every alias or name containing CJK characters
+is tokenised into overlapping character bigrams (a lone character is its own
+token) and held in a per-process inverted index. A query is scored against
+each name by the Dice coefficient of their bigram sets, with a bonus when
+one contains the other, so 香菇 finds 干香菇 and 香菇 ranks above 冬菇.
+Single-character queries use a second index of individual characters.
+"""
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .models import Alias, Ingredient
+
+# CJK Unified Ideographs, Extension A and Compatibility Ideographs
+CJK_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+MIN_SCORE = 0.3
+SUBSTRING_BONUS = 0.5
+EXACT_BONUS = 1.0
+DEFAULT_LIMIT = 500
+
+_index = None
+
+
+def contains_cjk(text):
+    return bool(text) and CJK_RUN.search(text) is not None
+
+
+def cjk_text(text):
+    """Only the CJK characters of ``text``, runs joined without separators"""
+    return ''.join(CJK_RUN.findall(text or ''))
+
+
+def cjk_bigrams(text):
+    """Overlapping character bigrams of each CJK run (single characters stand alone)"""
+    tokens = set()
+    for run in CJK_RUN.findall(text or ''):
+        if len(run) == 1:
+            tokens.add(run)
+        tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class CJKIndex:
+    """Inverted index from bigram to the CJK names containing it"""
+
+    def __init__(self, names):
+        # names: iterable of (ingredient_id, text)
+        self.ingredient_ids = []
+        self.texts = []
+        # Token set sizes and postings, for bigram and single-character tokens
+        self.sizes = {'bigram': [], 'char': []}
+        self.postings = {'bigram': {}, 'char': {}}
+        seen = set()
+        for ingredient_id, text in names:
+            text = cjk_text(text)
+            if not text or (ingredient_id, text) in seen:
+                continue
+            seen.add((ingredient_id, text))
+            position = len(self.texts)
+            self.ingredient_ids.append(ingredient_id)
+            self.texts.append(text)
+            for kind, tokens in (('bigram', cjk_bigrams(text)), ('char', set(text))):
+                self.sizes[kind].append(len(tokens))
+                for token in tokens:
+                    self.postings[kind].setdefault(token, []).append(position)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        names = list(Alias.objects.values_list('ingredient_id', 'name'))
+        names += Ingredient.objects.values_list('id', 'base_name')
+        names += Ingredient.objects.exclude(display_name=None).values_list('id', 'display_name')
+        return cls((ingredient_id, text) for ingredient_id, text in names if contains_cjk(text))
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """``[(ingredient_id, score)]`` best first, one entry per ingredient"""
+        query_text = cjk_text(query)
+        if not query_text:
+            return []
+        kind = 'char' if len(query_text) == 1 else 'bigram'
+        query_tokens = set(query_text) if kind == 'char' else cjk_bigrams(query_text)
+
+        shared = Counter()
+        for token in query_tokens:
+            for position in self.postings[kind].get(token, ()):
+                shared[position] += 1
+
+        best = {}
+        for position, common in shared.items():
+            text = self.texts[position]
+            score = 2.0 * common / (len(query_tokens) + self.sizes[kind][position])
+            if text == query_text:
+                score += EXACT_BONUS
+            elif query_text in text or text in query_text:
+                score += SUBSTRING_BONUS
+            if score < MIN_SCORE:
+                continue
+            ingredient_id = self.ingredient_ids[position]
+            if score > best.get(ingredient_id, 0):
+                best[ingredient_id] = score
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return [(ingredient_id, round(score, 4)) for ingredient_id, score in ranked[:limit]]
+
+
+def get_cjk_index():
+    """Per-process index, rebuilt after ``CJK_INDEX_TTL`` seconds"""
+    global _index
+    ttl = getattr(settings, 'CJK_INDEX_TTL', 300)
+    if _index is None or time.monotonic() - _index.built_at > ttl:
+        _index = CJKIndex.build()
+    return _index
@@ -0,0 +1,464 @@
+"""Composition math shared by compose_preview and composition sessions
+
+Two implementations of the same formulas live here: the Decimal reference
+(``build_line_item`` / ``build_composition_result``) and the float64 fast
+path (``build_line_item_float`` / ``build_composition_result_float``) that
+preview traffic uses by default.
+"""
+from decimal import Decimal
+
+import numpy as np
+
+COMPOUNDS = ('glu', 'asp', 'imp', 'gmp', 'amp')
+
+# Relative umami intensity: Glu=1.0, Asp=0.077, IMP=1.0, GMP=2.3, AMP=0.18
+AA_WEIGHTS = {'glu': 1.0, 'asp': 0.077}
+NUC_WEIGHTS = {'imp': 1.0, 'gmp': 2.3, 'amp': 0.18}
+SYNERGY_CONSTANT = 1218.0
+
+# PUI model constants (see build_composition_result)
+PUI_K_AA = 80.0
+PUI_N = 1.4
+PUI_ALPHA = 1.5
+PUI_K_NUC = 30.0
+
+# AA:Nuc ratio boundaries for the synergy dial
+RATIO_EPSILON = 0.001
+RATIO_NEEDS_AA_BELOW = 0.6
+RATIO_OPTIMAL_MAX = 1.6
+
+
+def convert_to_grams(quantity: float, unit: str) -> float:
+    """Convert quantity to grams based on unit"""
+    unit_conversions = {
+        'g': 1.0,
+        'oz': 28.35,
+        'tsp': 5.0,  # assuming water density
+        'tbsp': 15.0,  # assuming water density
+        'cup': 240.0,  # assuming water density
+    }
+    return quantity * unit_conversions.get(unit.lower(), 1.0)
+
+
+def build_line_item(ingredient, chemistry_per_100g, quantity, unit):
+    """Build a composition line item with per-compound contributions.
+
+    ``chemistry_per_100g`` maps each compound to its mg/100g value (float or
+    Decimal). Contributions are kept as Decimal so running totals can be
+    adjusted by subtraction without drift.
+    """
+    quantity_grams = Decimal(str(convert_to_grams(float(quantity), unit)))
+
+    # Calculate contribution (assuming chemistry values are per 100g)
+    factor = quantity_grams / Decimal('100')
+    contributions = {
+        # str() keeps the stored 3-decimal value exact for float columns
+        compound: Decimal(str(chemistry_per_100g[compound])) * factor
+        for compound in COMPOUNDS
+    }
+
+    return {
+        'id': ingredient['id'],
+        'name': ingredient['name'],
+        'quantity': quantity,
+        'unit': unit,
+        'quantity_grams': quantity_grams,
+        'contributions': contributions,
+    }
+
+
+def build_line_item_float(ingredient, chemistry_per_100g, quantity, unit):
+    """Float64 counterpart of ``build_line_item``, already in API shape"""
+    quantity_grams = convert_to_grams(float(quantity), unit)
+    factor = quantity_grams / 100.0
+
+    return {
+        'id': ingredient['id'],
+        'name': ingredient['name'],
+        'quantity': quantity,
+        'unit': unit,
+        'quantity_grams': quantity_grams,
+        'contributions': {
+            compound: float(chemistry_per_100g[compound]) * factor
+            for compound in COMPOUNDS
+        },
+    }
+
+
+def serialize_line_item(line_item):
+    """Convert a line item to the float shape returned by the API"""
+    return {
+        'id': line_item['id'],
+        'name': line_item['name'],
+        'quantity': line_item['quantity'],
+        'unit': line_item['unit'],
+        'quantity_grams': float(line_item['quantity_grams']),
+        'contributions': {
+            compound: float(value)
+            for compound, value in line_item['contributions'].items()
+        },
+    }
+
+
+def build_composition_result(totals, total_weight, ingredients_data):
+    """Derive weighted AA/Nuc, EUC, PUI and synergy zone from compound totals.
+
+    ``totals`` maps each compound to its total mg in the composition and
+    ``total_weight`` is the composition weight in grams (must be > 0).
+    Returns the dict consumed by ``CompositionResultSerializer``.
+    """
+    total_glu = totals['glu']
+    total_asp = totals['asp']
+    total_imp = totals['imp']
+    total_gmp = totals['gmp']
+    total_amp = totals['amp']
+
+    # Calculate derived values using EUC formula
+    # EUC = Σ(ai·bi) + 1218 × (Σ(ai·bi)) × (Σ(aj·bj))
+    # where ai = amino acid concentrations (g/100g)
+    #       aj = nucleotide concentrations (g/100g)
+    #       bi = relative umami weights for amino acids (Glu=1, Asp=0.077)
+    #       bj = relative umami weights for nucleotides (IMP=1, GMP=2.3, AMP=0.18)
+    #       1218 = synergistic constant
+
+    def mg_per_100g(total_mg: Decimal) -> Decimal:
+        return (total_mg / total_weight) * Decimal('100')
+
+    glu_mg_per_100g = mg_per_100g(total_glu)
+    asp_mg_per_100g = mg_per_100g(total_asp)
+    imp_mg_per_100g = mg_per_100g(total_imp)
+    gmp_mg_per_100g = mg_per_100g(total_gmp)
+    amp_mg_per_100g = mg_per_100g(total_amp)
+
+    glu_g_per_100g = glu_mg_per_100g / Decimal('1000')
+    asp_g_per_100g = asp_mg_per_100g / Decimal('1000')
+    imp_g_per_100g = imp_mg_per_100g / Decimal('1000')
+    gmp_g_per_100g = gmp_mg_per_100g / Decimal('1000')
+    amp_g_per_100g = amp_mg_per_100g / Decimal('1000')
+
+    # Apply relative weights to each compound for umami-equivalent calculations
+    # Relative umami intensity: Glu=1.0, Asp=0.077, IMP=1.0, GMP=2.3, AMP=0.18
+    weighted_aa_g = glu_g_per_100g * Decimal('1.0') + asp_g_per_100g * Decimal('0.077')
+    weighted_nuc_g = (
+        imp_g_per_100g * Decimal('1.0') +
+        gmp_g_per_100g * Decimal('2.3') +
+        amp_g_per_100g * Decimal('0.18')
+    )
+
+    # Convert weighted values to mg/100g for display
+    weighted_aa_mg = weighted_aa_g * Decimal('1000')
+    weighted_nuc_mg = weighted_nuc_g * Decimal('1000')
+
+    # Calculate EUC (Equivalent Umami Concentration)
+    # Formula: EUC = weighted_AA + 1218 × weighted_AA × weighted_Nuc
+    if weighted_aa_g > 0 and weighted_nuc_g > 0:
+        euc_g = weighted_aa_g + Decimal('1218') * weighted_aa_g * weighted_nuc_g
+    else:
+        # If no nucleotides, synergy = just the amino acids
+        euc_g = weighted_aa_g if weighted_aa_g > 0 else Decimal('0')
+
+    euc_mg = euc_g * Decimal('1000')
+
+    # Calculate PUI (Perceived Umami Index)
+    # P_AA = 1 / (1 + (K_AA / AA_weighted_mg)^n)  where K_AA=80, n=1.4
+    # B_Nuc = 1 + α * (Nuc_weighted_mg / (Nuc_weighted_mg + K_Nuc))  where α=1.5, K_Nuc=30
+    # PUI = min(P_AA * B_Nuc, 1) * 100
+    # Using float for pow operation for better compatibility
+
+    if weighted_aa_mg > 0:
+        ratio = float(Decimal('80') / weighted_aa_mg)
+        p_aa = Decimal(str(1.0 / (1.0 + pow(ratio, 1.4))))
+    else:
+        p_aa = Decimal('0')
+
+    if weighted_nuc_mg > 0:
+        b_nuc = Decimal('1') + Decimal('1.5') * (weighted_nuc_mg / (weighted_nuc_mg + Decimal('30')))
+    else:
+        b_nuc = Decimal('1')
+
+    pui_raw = p_aa * b_nuc
+    pui = min(float(pui_raw), 1.0) * 100
+
+    # Calculate AA:Nuc ratio for synergy dial (using weighted values)
+    epsilon = Decimal('0.001')
+    aa_nuc_ratio = weighted_aa_mg / max(weighted_nuc_mg, epsilon)
+
+    # Determine synergy zone
+    if aa_nuc_ratio < Decimal('0.6'):
+        synergy_zone = 'needs_aa'
+        synergy_suggestion = 'Add amino-rich ingredient (tomato, cheese, soy sauce).'
+    elif aa_nuc_ratio <= Decimal('1.6'):
+        synergy_zone = 'optimal'
+        synergy_suggestion = 'Optimal synergy ratio achieved.'
+    else:
+        synergy_zone = 'needs_nuc'
+        synergy_suggestion = 'Add nucleotide-rich ingredient (mushrooms, seafood, seaweed).'
+
+    # Return weighted values in mg/100g for frontend display
+    total_aa = weighted_aa_mg
+    total_nuc = weighted_nuc_mg
+    total_synergy = euc_mg
+
+    # Prepare chart data
+    chart_data = {
+        'umami_aa': {
+            'glu': float(glu_mg_per_100g),
+            'asp': float(asp_mg_per_100g)
+        },
+        'umami_nuc': {
+            'imp': float(imp_mg_per_100g),
+            'gmp': float(gmp_mg_per_100g),
+            'amp': float(amp_mg_per_100g)
+        },
+        'breakdown': {
+            'total_aa': float(weighted_aa_mg),
+            'total_nuc': float(weighted_nuc_mg),
+            'total_synergy': float(euc_mg)
+        }
+    }
+
+    return {
+        'total_weight': float(total_weight),
+        'total_aa': float(total_aa),
+        'total_nuc': float(total_nuc),
+        'total_synergy': float(total_synergy),
+        'total_glu': float(total_glu),
+        'total_asp': float(total_asp),
+        'total_imp': float(total_imp),
+        'total_gmp': float(total_gmp),
+        'total_amp': float(total_amp),
+        'ingredients': ingredients_data,
+        'chart_data': chart_data,
+        'concentrations': {
+            'aa_mg_per_100g': float(weighted_aa_mg),
+            'nuc_mg_per_100g': float(weighted_nuc_mg),
+            'aa_g_per_100g': float(weighted_aa_g),
+            'nuc_g_per_100g': float(weighted_nuc_g),
+            'synergy_mg_per_100g': float(euc_mg)
+        },
+        'pui': float(pui),
+        'aa_nuc_ratio': float(aa_nuc_ratio),
+        'synergy_zone': synergy_zone,
+        'synergy_suggestion': synergy_suggestion
+    }
+
+
+def _synergy_zone(aa_nuc_ratio):
+    if aa_nuc_ratio < RATIO_NEEDS_AA_BELOW:
+        return 'needs_aa', 'Add amino-rich ingredient (tomato, cheese, soy sauce).'
+    if aa_nuc_ratio <= RATIO_OPTIMAL_MAX:
+        return 'optimal', 'Optimal synergy ratio achieved.'
+    return 'needs_nuc', 'Add nucleotide-rich ingredient (mushrooms, seafood, seaweed).'
+
+
+def build_composition_result_float(totals, total_weight, ingredients_data):
+    """Float64 fast path of ``build_composition_result``.
+
+    Accepts Decimal or float totals and returns the same result dict; values
+    agree with the Decimal reference to the 3 decimal places the API displays.
+    """
+    total_weight = float(total_weight)
+    scale = 100.0 / total_weight
+    mg_per_100g = {compound: float(totals[compound]) * scale for compound in COMPOUNDS}
+
+    weighted_aa_mg = sum(mg_per_100g[c] * w for c, w in AA_WEIGHTS.items())
+    weighted_nuc_mg = sum(mg_per_100g[c] * w for c, w in NUC_WEIGHTS.items())
+    weighted_aa_g = weighted_aa_mg / 1000.0
+    weighted_nuc_g = weighted_nuc_mg / 1000.0
+
+    # EUC = weighted_AA + 1218 × weighted_AA × weighted_Nuc (in g, displayed in mg)
+    if weighted_aa_g > 0 and weighted_nuc_g > 0:
+        euc_g = weighted_aa_g + SYNERGY_CONSTANT * weighted_aa_g * weighted_nuc_g
+    else:
+        euc_g = weighted_aa_g if weighted_aa_g > 0 else 0.0
+    euc_mg = euc_g * 1000.0
+
+    # PUI = min(P_AA * B_Nuc, 1) * 100
+    if weighted_aa_mg > 0:
+        p_aa = 1.0 / (1.0 + pow(PUI_K_AA / weighted_aa_mg, PUI_N))
+    else:
+        p_aa = 0.0
+    if weighted_nuc_mg > 0:
+        b_nuc = 1.0 + PUI_ALPHA * (weighted_nuc_mg / (weighted_nuc_mg + PUI_K_NUC))
+    else:
+        b_nuc = 1.0
+    pui = min(p_aa * b_nuc, 1.0) * 100
+
+    aa_nuc_ratio = weighted_aa_mg / max(weighted_nuc_mg, RATIO_EPSILON)
+    synergy_zone, synergy_suggestion = _synergy_zone(aa_nuc_ratio)
+
+    return {
+        'total_weight': total_weight,
+        'total_aa': weighted_aa_mg,
+        'total_nuc': weighted_nuc_mg,
+        'total_synergy': euc_mg,
+        'total_glu': float(totals['glu']),
+        'total_asp': float(totals['asp']),
+        'total_imp': float(totals['imp']),
+        'total_gmp': float(totals['gmp']),
+        'total_amp': float(totals['amp']),
+        'ingredients': ingredients_data,
+        'chart_data': {
+            'umami_aa': {
+                'glu': mg_per_100g['glu'],
+                'asp': mg_per_100g['asp']
+            },
+            'umami_nuc': {
+                'imp': mg_per_100g['imp'],
+                'gmp': mg_per_100g['gmp'],
+                'amp': mg_per_100g['amp']
+            },
+            'breakdown': {
+                'total_aa': weighted_aa_mg,
+                'total_nuc': weighted_nuc_mg,
+                'total_synergy': euc_mg
+            }
+        },
+        'concentrations': {
+            'aa_mg_per_100g': weighted_aa_mg,
+            'nuc_mg_per_100g': weighted_nuc_mg,
+            'aa_g_per_100g': weighted_aa_g,
+            'nuc_g_per_100g': weighted_nuc_g,
+            'synergy_mg_per_100g': euc_mg
+        },
+        'pui': pui,
+        'aa_nuc_ratio': aa_nuc_ratio,
+        'synergy_zone': synergy_zone,
+        'synergy_suggestion': synergy_suggestion
+    }
+
+
+def _euc_mg(aa_mg, nuc_mg):
+    """EUC in mg/100g from weighted AA/Nuc in mg/100g (works on arrays)"""
+    # 1218 × AA_g × Nuc_g expressed in mg: 1218 / 1000 × AA_mg × Nuc_mg
+    return aa_mg + (SYNERGY_CONSTANT / 1000.0) * aa_mg * nuc_mg
+
+
+def _pui_terms(aa_mg, nuc_mg):
+    """Return (P_AA, dP_AA/dAA, B_Nuc, dB_Nuc/dNuc) elementwise"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(aa_mg > 0, np.power(PUI_K_AA / np.where(aa_mg > 0, aa_mg, 1.0), PUI_N), 0.0)
+        p_aa = np.where(aa_mg > 0, 1.0 / (1.0 + x), 0.0)
+        dp_aa = np.where(aa_mg > 0, PUI_N * x / (np.where(aa_mg > 0, aa_mg, 1.0) * (1.0 + x) ** 2), 0.0)
+    nuc_pos = np.maximum(nuc_mg, 0.0)
+    b_nuc = 1.0 + PUI_ALPHA * nuc_pos / (nuc_pos + PUI_K_NUC)
+    db_nuc = PUI_ALPHA * PUI_K_NUC / (nuc_pos + PUI_K_NUC) ** 2
+    return p_aa, dp_aa, b_nuc, db_nuc
+
+
+def _pui(aa_mg, nuc_mg):
+    p_aa, _, b_nuc, _ = _pui_terms(aa_mg, nuc_mg)
+    return np.minimum(p_aa * b_nuc, 1.0) * 100
+
+
+def analyze_composition(line_items):
+    """Per-item sensitivity of EUC and PUI, computed in closed form.
+
+    ``line_items`` are dicts with ``id``, ``name``, ``quantity_grams`` and
+    ``chemistry`` (mg/100g per compound) for each composition entry. The
+    composition's weighted AA and Nuc are quantity-weighted means of each
+    item's weighted AA/Nuc, so for item i with q_i grams out of W:
+
+        dAA/dq_i  = (aa_i - AA) / W         dNuc/dq_i = (nuc_i - Nuc) / W
+        AA_-i     = (AA·W - aa_i·q_i) / (W - q_i)
+
+    EUC and PUI derivatives follow by the chain rule, and leave-one-out
+    values reuse the same closed form, so every item is handled in one
+    vectorised pass without re-running the composition.
+    """
+    grams = np.array([item['quantity_grams'] for item in line_items], dtype=float)
+    chemistry = np.array(
+        [[float(item['chemistry'][c]) for c in COMPOUNDS] for item in line_items],
+        dtype=float,
+    ).reshape(len(line_items), len(COMPOUNDS))
+    aa_weights = np.array([AA_WEIGHTS.get(c, 0.0) for c in COMPOUNDS])
+    nuc_weights = np.array([NUC_WEIGHTS.get(c, 0.0) for c in COMPOUNDS])
+
+    # Weighted AA / Nuc of each item on its own (mg/100g)
+    item_aa = chemistry @ aa_weights
+    item_nuc = chemistry @ nuc_weights
+
+    total_weight = grams.sum()
+    aa = float(item_aa @ grams) / total_weight
+    nuc = float(item_nuc @ grams) / total_weight
+    euc = float(_euc_mg(aa, nuc))
+    p_aa, dp_aa, b_nuc, db_nuc = (float(v) for v in _pui_terms(np.array(aa), np.array(nuc)))
+    pui = min(p_aa * b_nuc, 1.0) * 100
+
+    # Marginal effect of one more gram of each item
+    d_aa = (item_aa - aa) / total_weight
+    d_nuc = (item_nuc - nuc) / total_weight
+    k = SYNERGY_CONSTANT / 1000.0
+    d_euc = d_aa * (1.0 + k * nuc) + k * aa * d_nuc
+    if p_aa * b_nuc < 1.0:
+        d_pui = 100 * (dp_aa * b_nuc * d_aa + p_aa * db_nuc * d_nuc)
+    else:
+        # PUI is clamped at 100, so small changes have no effect
+        d_pui = np.zeros_like(grams)
+
+    # Composition with each item left out
+    rest_weight = total_weight - grams
+    has_rest = rest_weight > 0
+    safe_rest = np.where(has_rest, rest_weight, 1.0)
+    aa_without = np.where(has_rest, (aa * total_weight - item_aa * grams) / safe_rest, 0.0)
+    nuc_without = np.where(has_rest, (nuc * total_weight - item_nuc * grams) / safe_rest, 0.0)
+    # Clip float noise so a lone zero-AA remainder cannot go slightly negative
+    aa_without = np.maximum(aa_without, 0.0)
+    nuc_without = np.maximum(nuc_without, 0.0)
+    euc_without = _euc_mg(aa_without, nuc_without)
+    pui_without = _pui(aa_without, nuc_without)
+
+    items = []
+    for idx, item in enumerate(line_items):
+        items.append({
+            'id': item['id'],
+            'name': item['name'],
+            'quantity_grams': float(grams[idx]),
+            'marginal_euc_per_g': float(d_euc[idx]),
+            'marginal_pui_per_g': float(d_pui[idx]),
+            'leave_one_out': {
+                'euc_without': float(euc_without[idx]),
+                'pui_without': float(pui_without[idx]),
+                'euc_delta': euc - float(euc_without[idx]),
+                'pui_delta': pui - float(pui_without[idx]),
+            },
+        })
+
+    return {
+        'total_weight': float(total_weight),
+        'total_synergy': euc,
+        'pui': pui,
+        'items': items,
+    }
+
+
+def score_compositions(recipe_index, grams, chemistry, n_recipes):
+    """Vectorised totals, weighted AA/Nuc, EUC and PUI for many compositions.
+
+    Line items of all compositions are passed flattened: ``recipe_index[i]``
+    is the composition line i belongs to (0..n_recipes-1), ``grams[i]`` its
+    quantity and ``chemistry[i]`` its mg/100g values in ``COMPOUNDS`` order.
+    Compositions without weight score zero.
+    """
+    recipe_index = np.asarray(recipe_index, dtype=np.int64)
+    grams = np.asarray(grams, dtype=float)
+    chemistry = np.asarray(chemistry, dtype=float).reshape(len(grams), len(COMPOUNDS))
+
+    totals = np.zeros((n_recipes, len(COMPOUNDS)))
+    np.add.at(totals, recipe_index, chemistry * (grams / 100.0)[:, None])
+    weight = np.bincount(recipe_index, weights=grams, minlength=n_recipes)
+
+    has_weight = weight > 0
+    mg_per_100g = totals * (100.0 / np.where(has_weight, weight, 1.0))[:, None]
+    aa = mg_per_100g @ np.array([AA_WEIGHTS.get(c, 0.0) for c in COMPOUNDS])
+    nuc = mg_per_100g @ np.array([NUC_WEIGHTS.get(c, 0.0) for c in COMPOUNDS])
+    aa = np.where(has_weight, aa, 0.0)
+    nuc = np.where(has_weight, nuc, 0.0)
+
+    return {
+        'total_weight': weight,
+        'total_aa': aa,
+        'total_nuc': nuc,
+        'total_synergy': _euc_mg(aa, nuc),
+        'pui': _pui(aa, nuc),
+    }
@@ -0,0 +1,160 @@
+"""Server-side composition sessions with running compound totals.
+
+A session keeps every line item together with its ingredient's per-100g
+chemistry and the running totals for the whole composition, so a delta
+(add / remove / update quantity) only adjusts the totals by the changed
+item's contribution instead of re-fetching and re-summing every ingredient.
+Sessions live in the Django cache. Changes to a session are serialised by a
+short per-session lease (an atomic ``cache.add``). A request that finds the
+lease taken polls for up to ``COMPOSITION_SESSION_LEASE_WAIT`` seconds, so
+overlapping slider deltas queue up; only if the lease stays taken does it fail
+with 409 instead of overwriting the other request's totals.
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .composition import COMPOUNDS, build_line_item, build_composition_result_float, serialize_line_item
+from .models import Ingredient
+
+SESSION_KEY_PREFIX = 'composition_session:'
+LEASE_SECONDS = 10
+LEASE_POLL_INTERVAL = 0.02
+
+
+class CompositionSessionError(Exception):
+    """Raised when a delta cannot be applied to a session"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _session_ttl():
+    return getattr(settings, 'COMPOSITION_SESSION_TTL', 3600)
+
+
+@contextmanager
+def session_lease(session_id):
+    """Hold the session's update lease for the block; 409 if another request keeps it"""
+    lease_key = f'{SESSION_KEY_PREFIX}{session_id}:lease'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + getattr(settings, 'COMPOSITION_SESSION_LEASE_WAIT', 2.0)
+    while not cache.add(lease_key, token, LEASE_SECONDS):
+        if time.monotonic() >= deadline:
+            raise CompositionSessionError(
+                f'Composition session {session_id} is being updated by another request; retry',
+                status_code=409,
+            )
+        time.sleep(LEASE_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        # Only release our own lease; an expired one may belong to another request now
+        if cache.get(lease_key) == token:
+            cache.delete(lease_key)
+
+
+def _fetch_ingredient(ingredient_id):
+    """Load the name and per-100g chemistry needed to build line items"""
+    try:
+        ingredient = Ingredient.objects.select_related('chemistry').get(id=ingredient_id)
+    except Ingredient.DoesNotExist:
+        raise CompositionSessionError(
+            f'Ingredient with id {ingredient_id} not found', status_code=404
+        )
+    chemistry = ingredient.chemistry
+    return (
+        {'id': ingredient.id, 'name': ingredient.display_name or ingredient.base_name},
+        {compound: getattr(chemistry, compound) for compound in COMPOUNDS},
+    )
+
+
+class CompositionSession:
+    """Running totals plus line items for one composition"""
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id or uuid.uuid4().hex
+        # ingredient_id -> {'ingredient', 'chemistry', 'line_item'}
+        self.items = {}
+        self.totals = {compound: Decimal('0') for compound in COMPOUNDS}
+        self.total_weight = Decimal('0')
+
+    @classmethod
+    def load(cls, session_id):
+        return cache.get(SESSION_KEY_PREFIX + session_id)
+
+    def save(self):
+        cache.set(SESSION_KEY_PREFIX + self.session_id, self, _session_ttl())
+
+    def delete(self):
+        cache.delete(SESSION_KEY_PREFIX + self.session_id)
+
+    def _apply_line_item(self, line_item, sign):
+        for compound in COMPOUNDS:
+            self.totals[compound] += sign * line_item['contributions'][compound]
+        self.total_weight += sign * line_item['quantity_grams']
+
+    def add(self, ingredient_id, quantity, unit):
+        """Add an item; an ingredient already present gets the new grams on top"""
+        entry = self.items.get(ingredient_id)
+        if entry is not None:
+            # compose_preview accepts repeated ids too; summing their grams gives the same totals
+            added = build_line_item(entry['ingredient'], entry['chemistry'], quantity, unit)
+            grams = entry['line_item']['quantity_grams'] + added['quantity_grams']
+            self.update(ingredient_id, grams, 'g')
+            return
+        ingredient, chemistry = _fetch_ingredient(ingredient_id)
+        line_item = build_line_item(ingredient, chemistry, quantity, unit)
+        self.items[ingredient_id] = {
+            'ingredient': ingredient,
+            'chemistry': chemistry,
+            'line_item': line_item,
+        }
+        self._apply_line_item(line_item, 1)
+
+    def remove(self, ingredient_id):
+        entry = self.items.pop(ingredient_id, None)
+        if entry is None:
+            raise CompositionSessionError(
+                f'Ingredient with id {ingredient_id} is not in the composition', status_code=404
+            )
+        self._apply_line_item(entry['line_item'], -1)
+
+    def update(self, ingredient_id, quantity, unit):
+        entry = self.items.get(ingredient_id)
+        if entry is None:
+            raise CompositionSessionError(
+                f'Ingredient with id {ingredient_id} is not in the composition', status_code=404
+            )
+        line_item = build_line_item(entry['ingredient'], entry['chemistry'], quantity, unit)
+        self._apply_line_item(entry['line_item'], -1)
+        self._apply_line_item(line_item, 1)
+        entry['line_item'] = line_item
+
+    def apply(self, delta):
+        """Apply one validated delta from ``CompositionDeltaSerializer``"""
+        op = delta['op']
+        if op == 'add':
+            self.add(delta['ingredient_id'], delta['quantity'], delta['unit'])
+        elif op == 'remove':
+            self.remove(delta['ingredient_id'])
+        elif op == 'update':
+            self.update(delta['ingredient_id'], delta['quantity'], delta['unit'])
+
+    def result(self):
+        """Build the compose_preview result for the current totals, or None if empty
+
+        Totals stay Decimal so deltas never drift; only the derivation runs on
+        the float64 fast path.
+        """
+        if self.total_weight <= 0:
+            return None
+        ingredients_data = [
+            serialize_line_item(entry['line_item']) for entry in self.items.values()
+        ]
+        return build_composition_result_float(self.totals, self.total_weight, ingredients_data)
@@ -0,0 +1,91 @@
+"""Read-replica routing for catalog reads.
+
+Only code running inside ``replica_reads()`` reads from a replica; the
+IngredientViewSet wraps its requests in it. Everything else — writes,
+management commands, admin, other viewsets — stays on ``default``, the
+primary. A request is pinned to one replica, chosen among those whose
+replication lag is within ``REPLICA_MAX_LAG_SECONDS`` (when set), and falls
+back to the primary when no replica qualifies.
+"""
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica'
+
+_replica_alias = contextvars.ContextVar('replica_alias', default=None)
+_lag_checks = {}  # alias -> (checked_at, healthy)
+
+LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def _replica_is_fresh(alias):
+    max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', None)
+    if max_lag is None:
+        return True
+
+    interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+    checked_at, healthy = _lag_checks.get(alias, (None, False))
+    now = time.monotonic()
+    if checked_at is not None and now - checked_at < interval:
+        return healthy
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = float(cursor.fetchone()[0] or 0)
+        healthy = lag <= max_lag
+        if not healthy:
+            logger.warning('Replica %s is %.1fs behind; reading from primary', alias, lag)
+    except Exception:
+        logger.exception('Replica %s lag check failed; reading from primary', alias)
+        healthy = False
+    _lag_checks[alias] = (now, healthy)
+    return healthy
+
+
+def choose_replica():
+    """A fresh replica alias, or None to read from the primary"""
+    candidates = [alias for alias in replica_aliases() if _replica_is_fresh(alias)]
+    return random.choice(candidates) if candidates else None
+
+
+@contextmanager
+def replica_reads():
+    """Route ORM reads in this context to one replica (or the primary)"""
+    token = _replica_alias.set(choose_replica() if replica_aliases() else None)
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
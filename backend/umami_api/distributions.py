@@ -0,0 +1,80 @@
+"""Binned distributions of the chemistry metrics behind the range sliders.
+
+Values are heavy-tailed (synergy runs from 0 to ~450,000 mg/100g), so bins
+are log-spaced between ``HISTOGRAM_MIN`` and the metric's global maximum,
+with exact zeros counted separately. Histograms are precomputed per filter
+cell (category x diet_class x flavor_role) and summed at request time, so a
+slider never triggers an aggregate query.
+"""
+import numpy as np
+
+HISTOGRAM_METRICS = ('umami_aa', 'umami_nuc', 'umami_synergy')
+HISTOGRAM_BINS = 48
+HISTOGRAM_MIN = 0.1  # mg/100g; smaller positive values fall into the first bin
+HISTOGRAM_QUANTILES = (10, 25, 50, 75, 90, 95, 99)
+
+
+def histogram_edges(max_value, bins=HISTOGRAM_BINS):
+    """``bins + 1`` log-spaced edges covering (0, max_value]"""
+    upper = max(float(max_value), HISTOGRAM_MIN * 10) * 1.0001
+    return np.geomspace(HISTOGRAM_MIN, upper, bins + 1)
+
+
+def bin_counts(values, edges):
+    """(zero count, per-bin counts) for ``values``, clipping to the outer bins"""
+    values = np.asarray(values, dtype=float)
+    positive = values[values > 0]
+    clipped = np.clip(positive, edges[0], edges[-1])
+    counts, _ = np.histogram(clipped, bins=edges)
+    return int((values <= 0).sum()), counts
+
+
+def compute_histograms(rows, bins=HISTOGRAM_BINS):
+    """Per-cell histograms for ``rows`` of (category, diet_class, flavor_role, aa, nuc, synergy).
+
+    Returns ``(edges_by_metric, cells)`` where ``cells`` maps each cell key
+    to ``{metric: (zero, counts)}``.
+    """
+    values = {
+        metric: np.array([float(row[3 + i] or 0) for row in rows])
+        for i, metric in enumerate(HISTOGRAM_METRICS)
+    }
+    edges = {
+        metric: histogram_edges(values[metric].max() if len(rows) else 0, bins)
+        for metric in HISTOGRAM_METRICS
+    }
+
+    members = {}
+    for position, row in enumerate(rows):
+        members.setdefault(tuple(row[:3]), []).append(position)
+
+    cells = {}
+    for key, positions in members.items():
+        cells[key] = {
+            metric: bin_counts(values[metric][positions], edges[metric])
+            for metric in HISTOGRAM_METRICS
+        }
+    return edges, cells
+
+
+def approximate_quantiles(edges, counts, zero, percentiles=HISTOGRAM_QUANTILES):
+    """Quantiles interpolated log-linearly within the histogram bins"""
+    counts = np.asarray(counts, dtype=float)
+    total = zero + counts.sum()
+    if total == 0:
+        return {f'p{p}': None for p in percentiles}
+
+    cumulative = zero + np.cumsum(counts)
+    quantiles = {}
+    for p in percentiles:
+        target = total * p / 100.0
+        if target <= zero:
+            quantiles[f'p{p}'] = 0.0
+            continue
+        index = int(np.searchsorted(cumulative, target))
+        index = min(index, len(counts) - 1)
+        before = cumulative[index - 1] if index > 0 else zero
+        fraction = (target - before) / counts[index] if counts[index] else 1.0
+        low, high = np.log(edges[index]), np.log(edges[index + 1])
+        quantiles[f'p{p}'] = round(float(np.exp(low + fraction * (high - low))), 3)
+    return quantiles
@@ -0,0 +1,283 @@
+"""Compile ingredient list query parameters into filter predicates.
+
+Predicates on single-valued relations (chemistry, tcm and flags are all
+one-to-one with Ingredient) stay plain joins, since they cannot multiply
+rows. Predicates on multi-valued relations (aliases) are compiled to
+correlated EXISTS subqueries, which Postgres plans as semi-joins. A
+compiled queryset therefore yields each ingredient at most once and never
+needs DISTINCT.
+"""
+from functools import partial
+from urllib.parse import urlencode
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, Exists, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .cjk_search import contains_cjk, get_cjk_index
+from .flavor_roles import FLAVOR_CARRIER, FLAVOR_SUPPORTING, HIGH_UMAMI
+from .models import DIET_FILTER_CLASSES, Alias, Ingredient
+from .quantiles import QUANTILE_METRICS, get_quantile_table
+from .romanize import romanized_query
+
+FLAVOR_ROLES = (HIGH_UMAMI, FLAVOR_CARRIER, FLAVOR_SUPPORTING)
+
+# Range parameter -> (chemistry field, lookup)
+RANGE_FILTERS = {
+    'aa_min': ('umami_aa', 'gte'),
+    'aa_max': ('umami_aa', 'lte'),
+    'nuc_min': ('umami_nuc', 'gte'),
+    'nuc_max': ('umami_nuc', 'lte'),
+    'syn_min': ('umami_synergy', 'gte'),
+    'syn_max': ('umami_synergy', 'lte'),
+}
+
+MAX_QUERY_LENGTH = 200
+
+# Fuzzy search: a pinyin alias match counts for at most PINYIN_WEIGHT of the score,
+# and is not looked up when the name similarity already reaches STRONG_NAME_SIMILARITY
+PINYIN_WEIGHT = 0.5
+STRONG_NAME_SIMILARITY = 0.6
+
+# Parameters that select and order list results (``canonical_filter_key``)
+FILTER_PARAMS = (
+    'q', 'sort', 'umami[]', 'flavor[]', 'qi[]', 'flavors[]', 'meridians[]', 'allergens_include[]',
+    'allergens_exclude[]', 'dietary[]', 'dietary', 'category[]', *RANGE_FILTERS,
+)
+
+
+def canonical_filter_key(params):
+    """Order-insensitive ``key=value&...`` of the filter/search/sort parameters in ``params``"""
+    pairs = sorted(
+        (key, value.strip())
+        for key in FILTER_PARAMS
+        for value in params.getlist(key)
+        if value.strip()
+    )
+    return urlencode(pairs, safe='[]')
+
+
+def relation_predicate(relation, lookup, value):
+    """Q for ``<relation>__<lookup>=value`` that can never duplicate rows.
+
+    Multi-valued relations become ``EXISTS (SELECT 1 FROM related WHERE
+    related.fk = ingredient.id AND lookup)``; single-valued ones stay joins.
+    """
+    field = Ingredient._meta.get_field(relation)
+    if field.one_to_many or field.many_to_many:
+        related = field.related_model.objects.filter(
+            **{field.field.name: OuterRef('pk'), lookup: value}
+        )
+        return Q(Exists(related))
+    return Q(**{f'{relation}__{lookup}': value})
+
+
+class IngredientFilterCompiler:
+    """Applies the ``IngredientViewSet`` list filters described by ``params``"""
+
+    def __init__(self, params):
+        self.params = params
+
+    @property
+    def query(self):
+        # Validate query length to prevent abuse
+        return self.params.get('q', '')[:MAX_QUERY_LENGTH]
+
+    @property
+    def level_category(self):
+        """The category whose cut points define "High", when exactly one is selected"""
+        categories = set(self.params.getlist('category[]'))
+        return categories.pop() if len(categories) == 1 else None
+
+    def compile(self, queryset):
+        params = self.params
+        query = self.query
+
+        # Apply fuzzy search if query provided
+        if query.strip():
+            queryset = self._apply_fuzzy_search(queryset, query)
+
+        # Dietary filters also accept the bare 'dietary' key
+        dietary_filters = params.getlist('dietary[]') or params.getlist('dietary')
+
+        list_filters = (
+            (params.getlist('umami[]'), partial(self._apply_umami_filters, category=self.level_category)),
+            (params.getlist('flavor[]'), self._apply_flavor_filters),
+            (params.getlist('qi[]'), self._apply_qi_filters),
+            (params.getlist('flavors[]'), self._apply_tcm_flavor_filters),  # TCM Five Tastes
+            (params.getlist('meridians[]'), self._apply_meridian_filters),
+            (params.getlist('allergens_include[]'), self._apply_allergen_include_filters),
+            (params.getlist('allergens_exclude[]'), self._apply_allergen_exclude_filters),
+            (dietary_filters, self._apply_dietary_filters),
+            (params.getlist('category[]'), self._apply_category_filters),
+        )
+        for values, apply_filter in list_filters:
+            if values:
+                queryset = apply_filter(queryset, values)
+
+        # Apply range filters
+        for param, (field, lookup) in RANGE_FILTERS.items():
+            value = params.get(param)
+            if value is not None:
+                queryset = queryset.filter(relation_predicate('chemistry', f'{field}__{lookup}', value))
+
+        return queryset
+
+    def _apply_fuzzy_search(self, queryset, query):
+        """Apply trigram similarity across names and aliases with weighted score"""
+        if contains_cjk(query):
+            return self._apply_cjk_search(queryset, query)
+
+        # Compute trigram similarity for base/display names
+        qs = queryset.annotate(
+            sim_base=TrigramSimilarity('base_name', query),
+            sim_display=TrigramSimilarity('display_name', query),
+        )
+        # Best name similarity
+        qs = qs.annotate(sim_name=F('sim_base') + F('sim_display'))
+
+        # Alias matches are a semi-join (EXISTS) so an ingredient with several
+        # matching aliases still appears once; we boost items that have any alias
+        # containing the query, and otherwise rely on name similarity.
+        alias_match = relation_predicate('aliases', 'name__icontains', query)
+        match = Q(sim_name__gt=0.05) | alias_match | Q(base_name__icontains=query) | Q(display_name__icontains=query)
+
+        # Typed pinyin ("xianggu") matches the romanized keys of Chinese aliases,
+        # by prefix or trigram similarity (both indexed on alias.romanized)
+        key = romanized_query(query)
+        if key:
+            match |= relation_predicate('aliases', 'romanized__startswith', key)
+            match |= relation_predicate('aliases', 'romanized__trigram_similar', key)
+            best_pinyin = Alias.objects.filter(ingredient=OuterRef('pk')).exclude(romanized='').annotate(
+                sim=TrigramSimilarity('romanized', key)
+            ).order_by('-sim').values('sim')[:1]
+            # CASE only runs the correlated subquery for rows without a strong name match
+            qs = qs.annotate(sim_pinyin=Case(
+                When(sim_name__gte=STRONG_NAME_SIMILARITY, then=Value(0.0)),
+                default=Coalesce(Subquery(best_pinyin, output_field=FloatField()), 0.0),
+                output_field=FloatField(),
+            ))
+        else:
+            qs = qs.annotate(sim_pinyin=Value(0.0, output_field=FloatField()))
+
+        # Filter low-similarity quickly
+        qs = qs.filter(match)
+
+        # Weighted score: names weighted higher than alias (pinyin) matches
+        qs = qs.annotate(
+            score=F('sim_name') * 0.9 + F('sim_base') * 0.1 + F('sim_pinyin') * PINYIN_WEIGHT
+        ).order_by('-score')
+
+        return qs
+
+    def _apply_cjk_search(self, queryset, query):
+        """Rank by character-bigram overlap with Chinese names (trigrams suit short CJK poorly)"""
+        matches = get_cjk_index().search(query)
+        if not matches:
+            return queryset.none()
+        score = Case(
+            *(When(id=ingredient_id, then=Value(value)) for ingredient_id, value in matches),
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=[ingredient_id for ingredient_id, _ in matches]).annotate(
+            score=score
+        ).order_by('-score', 'id')
+
+    def _apply_umami_filters(self, queryset, umami_filters, category=None):
+        """Apply umami-related filters based on chart levels (High = p90 and up)
+        Cut points come from the precomputed quantile table (quantiles.py), the
+        same ones the level columns and the frontend levels use; with a single
+        ``category`` selected, that category's own p90 (global if it has none).
+        """
+        table = get_quantile_table()
+        umami_query = Q()
+        for filter_type in umami_filters:
+            if filter_type in QUANTILE_METRICS:
+                threshold = table.high_threshold(filter_type, category)
+                umami_query |= relation_predicate('chemistry', f'{filter_type}__gte', threshold)
+
+        return queryset.filter(umami_query)
+
+    def _apply_flavor_filters(self, queryset, flavor_filters):
+        """Apply flavor role filters on the precomputed Ingredient.flavor_role
+        - High Umami: AA, Nuc or Synergy at or above its p90 cut point
+        - Flavor Carrier: Staple foods (rice, bread, noodles, pasta, flour, wheat, grain)
+        - Flavor Supporting: Everything else
+        Rules live in flavor_roles.py.
+        """
+        roles = [role for role in flavor_filters if role in FLAVOR_ROLES]
+        if not roles:
+            return queryset
+        return queryset.filter(flavor_role__in=roles)
+
+    def _apply_qi_filters(self, queryset, qi_filters):
+        """Apply TCM Four Qi filters (OR within group)"""
+        qi_query = Q()
+        for qi in qi_filters:
+            qi_query |= relation_predicate('tcm', 'four_qi__contains', [qi])
+
+        return queryset.filter(qi_query)
+
+    def _apply_tcm_flavor_filters(self, queryset, flavor_filters):
+        """Apply TCM Five Tastes filters (OR within group)"""
+        flavor_query = Q()
+        for flavor in flavor_filters:
+            flavor_query |= relation_predicate('tcm', 'five_flavors__contains', [flavor])
+
+        return queryset.filter(flavor_query)
+
+    def _apply_meridian_filters(self, queryset, meridian_filters):
+        """Apply TCM Meridian filters (OR within group)"""
+        meridian_query = Q()
+        for meridian in meridian_filters:
+            meridian_query |= relation_predicate('tcm', 'meridians__contains', [meridian])
+
+        return queryset.filter(meridian_query)
+
+    def _apply_allergen_include_filters(self, queryset, allergen_filters):
+        """Include ingredients with specific allergens"""
+        allergen_query = Q()
+        for allergen in allergen_filters:
+            allergen_query |= relation_predicate('flags', 'allergens__contains', [allergen])
+
+        return queryset.filter(allergen_query)
+
+    def _apply_allergen_exclude_filters(self, queryset, allergen_filters):
+        """Exclude ingredients with specific allergens"""
+        for allergen in allergen_filters:
+            queryset = queryset.exclude(relation_predicate('flags', 'allergens__contains', [allergen]))
+
+        return queryset
+
+    def _apply_dietary_filters(self, queryset, dietary_filters):
+        """Apply dietary restriction filters with inclusive logic
+        vegan -> vegan
+        vegetarian -> vegetarian OR vegan
+        pescatarian -> pescatarian OR vegetarian OR vegan
+        non_vegetarian -> pescatarian OR non_vegetarian
+        Known diets resolve to one indexed IN on flags.diet_class.
+        """
+        if not dietary_filters:
+            return queryset
+
+        diet_classes = set()
+        unknown = []
+        for flt in dietary_filters:
+            key = (flt or '').lower()
+            if key in DIET_FILTER_CLASSES:
+                diet_classes.update(DIET_FILTER_CLASSES[key])
+            else:
+                unknown.append(flt)
+
+        combined_query = Q()
+        if diet_classes:
+            combined_query |= relation_predicate('flags', 'diet_class__in', sorted(diet_classes))
+        for flt in unknown:
+            # Fallback to exact contains for any unknown tag
+            combined_query |= relation_predicate('flags', 'dietary_restrictions__contains', [flt])
+
+        return queryset.filter(combined_query)
+
+    def _apply_category_filters(self, queryset, category_filters):
+        """Apply category filters (OR within group)"""
+        return queryset.filter(category__in=category_filters)
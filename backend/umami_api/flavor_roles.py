@@ -0,0 +1,71 @@
+"""Flavor role classification rules.
+
+Every ingredient gets exactly one role, stored in ``Ingredient.flavor_role``:
+- high_umami: at or above the p90 cut point (weighted) on any umami metric
+- flavor_carrier: staple foods (rice, bread, noodles, ...) that are not high umami
+- flavor_supporting: everything else
+
+Bump ``FLAVOR_ROLE_RULES_VERSION`` whenever the rules below change; rows
+classified under an older version are recomputed by classify_flavor_roles.
+"""
+
+FLAVOR_ROLE_RULES_VERSION = 2
+
+HIGH_UMAMI = 'high_umami'
+FLAVOR_CARRIER = 'flavor_carrier'
+FLAVOR_SUPPORTING = 'flavor_supporting'
+
+# Static high-umami thresholds in mg/100g (weighted AA, weighted Nuc, EUC).
+# Live classification uses the quantile table's p90 (quantiles.py); these
+# only apply when no thresholds are passed.
+HIGH_UMAMI_THRESHOLDS = {
+    'umami_aa': 740,
+    'umami_nuc': 650,
+    'umami_synergy': 1900,
+}
+
+STAPLE_TERMS = ('rice', 'bread', 'noodle', 'pasta', 'flour', 'wheat', 'grain')
+
+
+def is_high_umami(umami_aa, umami_nuc, umami_synergy, thresholds=None):
+    values = {'umami_aa': umami_aa, 'umami_nuc': umami_nuc, 'umami_synergy': umami_synergy}
+    return any(
+        values[metric] is not None and values[metric] >= threshold
+        for metric, threshold in (thresholds or HIGH_UMAMI_THRESHOLDS).items()
+    )
+
+
+def is_staple(base_name, display_name, category):
+    text = ' '.join((value or '').lower() for value in (base_name, display_name, category))
+    return any(term in text for term in STAPLE_TERMS)
+
+
+def classify_flavor_role(base_name, display_name, category, umami_aa=None, umami_nuc=None, umami_synergy=None,
+                         thresholds=None):
+    """Role for an ingredient; missing chemistry counts as not high umami"""
+    if is_high_umami(umami_aa, umami_nuc, umami_synergy, thresholds):
+        return HIGH_UMAMI
+    if is_staple(base_name, display_name, category):
+        return FLAVOR_CARRIER
+    return FLAVOR_SUPPORTING
+
+
+def current_high_umami_thresholds():
+    """p90 cut points from the in-memory quantile table"""
+    from .quantiles import get_quantile_table
+
+    return get_quantile_table().high_umami_thresholds()
+
+
+def classify_ingredient(ingredient):
+    """Classify an Ingredient instance using its (possibly missing) chemistry"""
+    chemistry = getattr(ingredient, 'chemistry', None)
+    return classify_flavor_role(
+        ingredient.base_name,
+        ingredient.display_name,
+        ingredient.category,
+        getattr(chemistry, 'umami_aa', None),
+        getattr(chemistry, 'umami_nuc', None),
+        getattr(chemistry, 'umami_synergy', None),
+        current_high_umami_thresholds(),
+    )
@@ -0,0 +1,107 @@
+"""Hot query templates and planning-time measurement.
+
+A handful of statement shapes dominate traffic: the fuzzy search and level
+filter list queries, and the two complementary-ingredient lookups run for
+every detail request. With the pooled psycopg mode (``DB_CONNECTION_POOL``)
+connections live across requests, and psycopg prepares any statement text
+run ``DB_PREPARE_THRESHOLD`` times on a connection, so these shapes stop
+being re-planned while one-off queries never get prepared.
+
+The helpers below measure what that saves by comparing the planning time
+of an ad-hoc statement with the same statement run as a prepared statement.
+"""
+import json
+import re
+
+# Complementary lookups for Nuc-heavy / AA-heavy partners. Kept as constants so
+# every execution sends identical text, which is what makes them preparable.
+COMPLEMENTARY_NUC_SQL = """
+    SELECT i2.id, i2.base_name, i2.display_name,
+           c2.umami_nuc, c2.umami_synergy
+    FROM ingredient i2
+    JOIN chemistry c2 ON i2.id = c2.ingredient_id
+    WHERE i2.id != %s
+      AND c2.umami_nuc > c2.umami_aa
+      AND c2.umami_nuc > 0
+    ORDER BY c2.umami_nuc DESC, c2.umami_synergy DESC
+    LIMIT 5
+"""
+
+COMPLEMENTARY_AA_SQL = """
+    SELECT i2.id, i2.base_name, i2.display_name,
+           c2.umami_aa, c2.umami_synergy
+    FROM ingredient i2
+    JOIN chemistry c2 ON i2.id = c2.ingredient_id
+    WHERE i2.id != %s
+      AND c2.umami_aa > c2.umami_nuc
+      AND c2.umami_aa > 0
+    ORDER BY c2.umami_aa DESC, c2.umami_synergy DESC
+    LIMIT 5
+"""
+
+# List query shapes that make up most list traffic (query strings)
+HOT_LIST_SHAPES = {
+    'fuzzy_search': 'q=shiitake',
+    'fuzzy_search_relevance': 'q=kombu&sort=relevance',
+    'level_filter': 'umami[]=umami_aa&umami[]=umami_nuc',
+    'level_filter_synergy': 'umami[]=umami_synergy&sort=synergy',
+}
+
+LIST_PAGE_SIZE = 20
+
+
+def list_queryset(query_string):
+    """The queryset ``IngredientViewSet.list`` builds for ``query_string``"""
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+
+    from .views import IngredientViewSet
+
+    view = IngredientViewSet()
+    view.request = Request(RequestFactory().get(f'/api/ingredients/?{query_string}'))
+    view.action = 'list'
+    view.format_kwarg = None
+    return view.get_queryset()
+
+
+def list_statement(query_string):
+    """SQL and params of the first list page for ``query_string``"""
+    return list_queryset(query_string)[:LIST_PAGE_SIZE].query.sql_with_params()
+
+
+def _positional(sql):
+    """Rewrite ``%s`` placeholders as ``$1, $2, ...`` for PREPARE"""
+    counter = iter(range(1, 10_000))
+    sql = re.sub(r'(?<!%)%s', lambda _: f'${next(counter)}', sql)
+    return sql.replace('%%', '%')
+
+
+def _planning_ms(cursor, statement, params):
+    cursor.execute(f'EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) {statement}', params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return float(plan[0]['Planning Time'])
+
+
+def measure_planning(cursor, name, sql, params, runs=10):
+    """Mean planning time (ms) ad hoc vs. prepared for one statement.
+
+    The prepared statement is executed ``runs`` times before measuring so
+    Postgres can settle on a cached generic plan, as it would on a pooled
+    connection that has served the template many times.
+    """
+    params = list(params)
+    adhoc = sum(_planning_ms(cursor, sql, params) for _ in range(runs)) / runs
+
+    statement = f'hot_{name}'
+    placeholders = ', '.join(['%s'] * len(params))
+    execute = f'EXECUTE {statement}({placeholders})' if params else f'EXECUTE {statement}'
+    cursor.execute(f'PREPARE {statement} AS {_positional(sql)}')
+    try:
+        for _ in range(runs):
+            cursor.execute(execute, params)
+        prepared = sum(_planning_ms(cursor, execute, params) for _ in range(runs)) / runs
+    finally:
+        cursor.execute(f'DEALLOCATE {statement}')
+    return adhoc, prepared
@@ -0,0 +1,117 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework import serializers
+
+from umami_api.catalog_snapshot import COMPOUND_COLUMNS
+
+# Storage variant -> (column SQL type, expression over the source column, scale)
+VARIANTS = {
+    'numeric': ('numeric(12,3)', '{column}::numeric(12,3)', 1),
+    'float8': ('float8', '{column}::float8', 1),
+    'scaled_int': ('bigint', 'round({column}::numeric * 1000)::bigint', 1000),
+}
+
+# Benchmark queries; thresholds are mg/100g and get multiplied by the scale
+QUERIES = {
+    'sort': 'SELECT ingredient_id FROM {table} ORDER BY umami_synergy DESC, umami_aa DESC LIMIT 24',
+    'full_sort': 'SELECT ingredient_id FROM {table} ORDER BY umami_synergy DESC, umami_aa DESC OFFSET 1000000',
+    'range': 'SELECT count(*) FROM {table} WHERE umami_aa >= {aa} AND umami_nuc <= {nuc} AND umami_synergy >= {syn}',
+    'aggregate': 'SELECT avg(umami_aa), max(umami_synergy), sum(glu), stddev(umami_nuc) FROM {table}',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark numeric vs. float8 vs. scaled-integer storage of chemistry values on copies of the '
+        'chemistry table: sorting, range filtering, aggregates and list serialization.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--copies',
+            type=int,
+            default=50,
+            help='Replicate the chemistry rows this many times for stable timings (default: 50)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=7,
+            help='Timed runs per measurement; the median is reported (default: 7)',
+        )
+
+    def handle(self, *args, **options):
+        copies, runs = options['copies'], options['runs']
+
+        with connection.cursor() as cursor:
+            for variant, (_, expression, _) in VARIANTS.items():
+                columns = ', '.join(
+                    f'{expression.format(column=column)} AS {column}' for column in COMPOUND_COLUMNS
+                )
+                cursor.execute(f'DROP TABLE IF EXISTS bench_chemistry_{variant}')
+                cursor.execute(
+                    f'CREATE TEMP TABLE bench_chemistry_{variant} AS '
+                    f'SELECT c.ingredient_id * %s + copy AS ingredient_id, {columns} '
+                    f'FROM chemistry c CROSS JOIN generate_series(0, %s) AS copy',
+                    [copies, copies - 1],
+                )
+                cursor.execute(f'ANALYZE bench_chemistry_{variant}')
+
+            cursor.execute('SELECT count(*) FROM bench_chemistry_numeric')
+            self.stdout.write(f'{cursor.fetchone()[0]} rows per variant, median of {runs} runs (ms)\n')
+
+            results = {variant: {} for variant in VARIANTS}
+            for variant, (_, _, scale) in VARIANTS.items():
+                table = f'bench_chemistry_{variant}'
+                for name, template in QUERIES.items():
+                    sql = template.format(table=table, aa=100 * scale, nuc=500 * scale, syn=10 * scale)
+                    results[variant][name] = statistics.median(
+                        self._execution_ms(cursor, sql) for _ in range(runs)
+                    )
+                results[variant]['serialize'] = statistics.median(
+                    self._serialize_ms(cursor, table, variant, scale) for _ in range(runs)
+                )
+
+            for variant in VARIANTS:
+                cursor.execute(f'DROP TABLE IF EXISTS bench_chemistry_{variant}')
+
+        measurements = list(QUERIES) + ['serialize']
+        self.stdout.write('variant      ' + ''.join(f'{name:>12}' for name in measurements))
+        for variant, timings in results.items():
+            self.stdout.write(f'{variant:<13}' + ''.join(f'{timings[name]:>12.2f}' for name in measurements))
+
+        baseline = results['numeric']
+        for variant in ('float8', 'scaled_int'):
+            speedups = ', '.join(
+                f'{name} x{baseline[name] / results[variant][name]:.2f}'
+                for name in measurements if results[variant][name] > 0
+            )
+            self.stdout.write(self.style.SUCCESS(f'{variant} vs numeric: {speedups}'))
+
+    def _execution_ms(self, cursor, sql):
+        cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return float(plan[0]['Execution Time'])
+
+    def _serialize_ms(self, cursor, table, variant, scale):
+        """Fetch every row and convert it to API (JSON-ready) values"""
+        if variant == 'numeric':
+            field = serializers.DecimalField(max_digits=12, decimal_places=3)
+            convert = field.to_representation
+        elif variant == 'float8':
+            convert = serializers.FloatField().to_representation
+        else:
+            def convert(value):
+                return value / scale
+
+        started = time.perf_counter()
+        cursor.execute(f"SELECT {', '.join(COMPOUND_COLUMNS)} FROM {table}")
+        for row in cursor.fetchall():
+            [convert(value) for value in row]
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from umami_api.catalog_snapshot import build_snapshot, write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Export the content-hashed, precompressed catalog snapshot served from STATIC_ROOT/catalog '
+        '(run after imports and collectstatic).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            help='Directory to write to (default: STATIC_ROOT/catalog)',
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=3,
+            help='Snapshots to keep for clients holding an older manifest (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        manifest = write_snapshot(build_snapshot(), options['output_dir'], keep=options['keep'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {manifest['file']} ({manifest['count']} ingredients, {manifest['bytes']} bytes)"
+        ))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from umami_api.distributions import HISTOGRAM_BINS, HISTOGRAM_METRICS, compute_histograms
+from umami_api.models import ChemistryHistogram, Ingredient
+
+
+class Command(BaseCommand):
+    help = 'Precompute per-filter-cell distributions of umami_aa/nuc/synergy for range sliders (run after imports).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bins',
+            type=int,
+            default=HISTOGRAM_BINS,
+            help=f'Log-spaced bins per metric (default: {HISTOGRAM_BINS})',
+        )
+
+    def handle(self, *args, **options):
+        rows = list(
+            Ingredient.objects
+            .filter(chemistry__isnull=False)
+            .values_list(
+                'category', 'flags__diet_class', 'flavor_role',
+                'chemistry__umami_aa', 'chemistry__umami_nuc', 'chemistry__umami_synergy',
+            )
+        )
+        edges, cells = compute_histograms(rows, bins=options['bins'])
+
+        histograms = [
+            ChemistryHistogram(
+                metric=metric,
+                category=category,
+                diet_class=diet_class,
+                flavor_role=flavor_role,
+                edges=[round(float(edge), 4) for edge in edges[metric]],
+                counts=[int(count) for count in counts],
+                zero=zero,
+                total=zero + int(counts.sum()),
+            )
+            for (category, diet_class, flavor_role), by_metric in cells.items()
+            for metric in HISTOGRAM_METRICS
+            for zero, counts in [by_metric[metric]]
+        ]
+
+        with transaction.atomic():
+            ChemistryHistogram.objects.all().delete()
+            ChemistryHistogram.objects.bulk_create(histograms, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {len(histograms)} histograms for {len(rows)} ingredients across {len(cells)} filter cells.'
+        ))
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from umami_api.models import Ingredient, Pairing
+from umami_api.pairings import (
+    DIET_SLICES,
+    compute_pairings,
+    diet_memberships,
+    pairing_slice_key,
+    weighted_profile,
+)
+
+
+class Command(BaseCommand):
+    help = 'Precompute top two-ingredient pairings by mixture EUC (run after imports).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=10,
+            help='Partners kept per ingredient (default: 10)',
+        )
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=50,
+            help='Pairs kept per category/dietary slice (default: 50)',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=512,
+            help='Ingredients per block edge; bounds memory to ~block_size^2 floats (default: 512)',
+        )
+
+    def handle(self, *args, **options):
+        rows = list(
+            Ingredient.objects
+            .filter(chemistry__isnull=False)
+            .order_by('id')
+            .values_list(
+                'id', 'category',
+                'chemistry__glu', 'chemistry__asp', 'chemistry__imp',
+                'chemistry__gmp', 'chemistry__amp',
+                'flags__diet_class',
+            )
+        )
+        if len(rows) < 2:
+            self.stdout.write(self.style.WARNING('Need at least two ingredients with chemistry data.'))
+            return
+
+        ids = [row[0] for row in rows]
+        compounds = np.array([[float(v or 0) for v in row[2:7]] for row in rows])
+        aa, nuc = weighted_profile(*compounds.T)
+
+        categories = [row[1] for row in rows]
+        diets = [diet_memberships(row[7]) for row in rows]
+
+        slices = {pairing_slice_key(): np.ones(len(rows), dtype=bool)}
+        for category in sorted({c for c in categories if c}):
+            in_category = np.array([c == category for c in categories])
+            slices[pairing_slice_key(category=category)] = in_category
+            for diet in DIET_SLICES:
+                in_diet = np.array([diet in d for d in diets])
+                slices[pairing_slice_key(category=category, diet=diet)] = in_category & in_diet
+        for diet in DIET_SLICES:
+            slices[pairing_slice_key(diet=diet)] = np.array([diet in d for d in diets])
+
+        self.stdout.write(
+            f'Scoring {len(rows) * (len(rows) - 1) // 2} pairs across {len(slices)} slices...'
+        )
+        per_ingredient, per_slice = compute_pairings(
+            aa, nuc, slices,
+            top_k=options['top_k'],
+            top_n=options['top_n'],
+            block_size=options['block_size'],
+        )
+
+        def to_decimal(value, places):
+            return Decimal(str(round(value, places)))
+
+        pairings = []
+        for i, partners in enumerate(per_ingredient):
+            for rank, (j, euc, share) in enumerate(partners, start=1):
+                pairings.append(Pairing(
+                    ingredient_id=ids[i], partner_id=ids[j], slice='', rank=rank,
+                    ratio=to_decimal(share, 2), euc=to_decimal(euc, 3),
+                ))
+        for key, pairs in per_slice.items():
+            for rank, (i, j, euc, share) in enumerate(pairs, start=1):
+                pairings.append(Pairing(
+                    ingredient_id=ids[i], partner_id=ids[j], slice=key, rank=rank,
+                    ratio=to_decimal(share, 2), euc=to_decimal(euc, 3),
+                ))
+
+        with transaction.atomic():
+            Pairing.objects.all().delete()
+            Pairing.objects.bulk_create(pairings, batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(f'Stored {len(pairings)} pairings.'))
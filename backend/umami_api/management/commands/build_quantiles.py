@@ -0,0 +1,63 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from umami_api.models import ChemistryQuantile, Ingredient
+from umami_api.quantiles import MIN_CATEGORY_SAMPLE, QUANTILE_METRICS, compute_quantiles, reset_quantile_table
+
+
+class Command(BaseCommand):
+    help = (
+        'Precompute p10-p99 of umami_aa/nuc/synergy globally and per category; these are the level '
+        'cut points used by filters, level columns and the frontend (run after imports). '
+        'Flavor roles, which depend on the p90 cut points, are reclassified afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-category-sample',
+            type=int,
+            default=MIN_CATEGORY_SAMPLE,
+            help=f'Non-zero values a category needs for its own cut points (default: {MIN_CATEGORY_SAMPLE})',
+        )
+
+    def handle(self, *args, **options):
+        rows = list(
+            Ingredient.objects
+            .filter(chemistry__isnull=False)
+            .values_list('category', *[f'chemistry__{metric}' for metric in QUANTILE_METRICS])
+        )
+
+        groups = {None: rows}
+        for row in rows:
+            if row[0]:
+                groups.setdefault(row[0], []).append(row)
+
+        quantiles = []
+        for category, members in groups.items():
+            for i, metric in enumerate(QUANTILE_METRICS, start=1):
+                values = [float(row[i] or 0) for row in members]
+                sample_size = sum(1 for value in values if value > 0)
+                if category is not None and sample_size < options['min_category_sample']:
+                    continue
+                cuts = compute_quantiles(values)
+                if cuts is None:
+                    continue
+                quantiles.append(ChemistryQuantile(
+                    metric=metric, category=category, quantiles=cuts, sample_size=sample_size,
+                ))
+
+        with transaction.atomic():
+            ChemistryQuantile.objects.all().delete()
+            ChemistryQuantile.objects.bulk_create(quantiles)
+        reset_quantile_table()
+
+        for metric in QUANTILE_METRICS:
+            global_cuts = next((q.quantiles for q in quantiles if q.metric == metric and q.category is None), None)
+            self.stdout.write(f'{metric}: {global_cuts}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {len(quantiles)} quantile rows ({len(groups) - 1} categories considered).'
+        ))
+
+        # high_umami roles are stored with the p90 cut points of their classification time
+        call_command('classify_flavor_roles', all=True, stdout=self.stdout, stderr=self.stderr)
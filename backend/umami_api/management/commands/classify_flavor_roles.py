@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from umami_api.flavor_roles import FLAVOR_ROLE_RULES_VERSION, classify_flavor_role, current_high_umami_thresholds
+from umami_api.models import Ingredient
+
+
+class Command(BaseCommand):
+    help = 'Precompute Ingredient.flavor_role for rows classified under older rules (or all with --all).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reclassify every ingredient, not only stale ones (build_quantiles does this after cut points change)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Ingredient.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(
+                ~Q(flavor_role_version=FLAVOR_ROLE_RULES_VERSION) | Q(flavor_role__isnull=True)
+            )
+
+        # High umami cut points come from the quantile table (run build_quantiles first)
+        thresholds = current_high_umami_thresholds()
+        updated = []
+        for row in queryset.values(
+            'id', 'base_name', 'display_name', 'category', 'flavor_role',
+            'chemistry__umami_aa', 'chemistry__umami_nuc', 'chemistry__umami_synergy',
+        ).iterator():
+            role = classify_flavor_role(
+                row['base_name'], row['display_name'], row['category'],
+                row['chemistry__umami_aa'], row['chemistry__umami_nuc'], row['chemistry__umami_synergy'],
+                thresholds,
+            )
+            updated.append(Ingredient(
+                id=row['id'], flavor_role=role, flavor_role_version=FLAVOR_ROLE_RULES_VERSION
+            ))
+
+        Ingredient.objects.bulk_update(updated, ['flavor_role', 'flavor_role_version'], batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(
+            f'Classified {len(updated)} ingredients (rules v{FLAVOR_ROLE_RULES_VERSION}).'
+        ))
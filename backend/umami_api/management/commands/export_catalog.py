@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from umami_api.catalog_export import EXPORT_FORMATS, ExportUnavailable, default_format, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Export the full catalog as Arrow IPC, Parquet or msgpack, streamed from a server-side cursor.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=list(EXPORT_FORMATS),
+            help='Output format (default: arrow if pyarrow is installed, else msgpack)',
+        )
+        parser.add_argument(
+            '--output',
+            help="File to write (default: catalog.<ext>; '-' for stdout)",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per record batch / row group (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or default_format()
+        output = options['output'] or f'catalog.{EXPORT_FORMATS[file_format][1]}'
+        try:
+            chunks = stream_export(file_format, batch_size=options['batch_size'])
+        except ExportUnavailable as exc:
+            raise CommandError(str(exc))
+
+        written = 0
+        handle = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            for chunk in chunks:
+                handle.write(chunk)
+                written += len(chunk)
+        finally:
+            if handle is not sys.stdout.buffer:
+                handle.close()
+
+        if output != '-':
+            self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes of {file_format} to {output}'))
@@ -1,38 +1,62 @@
 from django.core.management.base import BaseCommand
-from umami_api.models import Flags
-
-
-def normalize_token(s: str) -> str:
-    return (s or '').strip().lower().replace(' ', '_').replace('-', '_')
+from django.db import connection, transaction
+
+
+# Lowercase snake_case tokens (deduplicated, first occurrence wins), the
+# non_vegetarian backfill and the diet_class derivation of
+# models.derive_diet_class, for every row in one statement.
+NORMALIZE_SQL = """
+WITH tokens AS (
+    SELECT f.ingredient_id,
+           COALESCE((
+               SELECT jsonb_agg(token ORDER BY first_pos)
+               FROM (
+                   SELECT replace(replace(lower(btrim(e.tag)), ' ', '_'), '-', '_') AS token,
+                          MIN(e.pos) AS first_pos
+                   FROM jsonb_array_elements_text(f.dietary_restrictions) WITH ORDINALITY AS e(tag, pos)
+                   WHERE btrim(e.tag) <> ''
+                   GROUP BY 1
+               ) deduped
+           ), '[]'::jsonb) AS tags
+    FROM flags f
+    WHERE jsonb_typeof(f.dietary_restrictions) = 'array'
+),
+backfilled AS (
+    SELECT ingredient_id,
+           CASE
+               WHEN tags @> '["vegan"]' OR tags @> '["vegetarian"]' OR tags @> '["non_vegetarian"]' THEN tags
+               ELSE tags || '["non_vegetarian"]'::jsonb
+           END AS tags
+    FROM tokens
+),
+derived AS (
+    SELECT ingredient_id, tags,
+           CASE
+               WHEN tags @> '["vegan"]' THEN 'vegan'
+               WHEN tags @> '["vegetarian"]' THEN 'vegetarian'
+               WHEN tags @> '["pescatarian"]' THEN 'pescatarian'
+               WHEN jsonb_array_length(tags) > 0 THEN 'non_vegetarian'
+           END AS diet_class
+    FROM backfilled
+)
+UPDATE flags f
+SET dietary_restrictions = d.tags,
+    diet_class = d.diet_class
+FROM derived d
+WHERE f.ingredient_id = d.ingredient_id
+  AND (f.dietary_restrictions IS DISTINCT FROM d.tags OR f.diet_class IS DISTINCT FROM d.diet_class)
+"""
 
 
 class Command(BaseCommand):
-    help = 'Normalize dietary flags to lowercase snake_case and backfill non_vegetarian where appropriate.'
+    help = (
+        'Normalize dietary flags to lowercase snake_case, backfill non_vegetarian where appropriate '
+        'and derive the indexed diet_class column, in a single set-based UPDATE.'
+    )
 
     def handle(self, *args, **options):
-        updated = 0
-        for flags in Flags.objects.all().iterator():
-            original = flags.dietary_restrictions or []
-            norm = []
-            for item in original:
-                token = normalize_token(item)
-                if token:
-                    norm.append(token)
-            norm = list(dict.fromkeys(norm))  # dedupe, preserve order
-
-            is_vegan = 'vegan' in norm
-            is_vegetarian = 'vegetarian' in norm
-            is_pescatarian = 'pescatarian' in norm
-
-            # Backfill non_vegetarian unless vegan/vegetarian
-            if not is_vegan and not is_vegetarian and 'non_vegetarian' not in norm:
-                norm.append('non_vegetarian')
-
-            if norm != original:
-                flags.dietary_restrictions = norm
-                flags.save(update_fields=['dietary_restrictions'])
-                updated += 1
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(NORMALIZE_SQL)
+            updated = cursor.rowcount
 
         self.stdout.write(self.style.SUCCESS(f'Normalized dietary flags for {updated} items.'))
-
-
@@ -0,0 +1,116 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from umami_api.traffic_replay import LATE_MS, PERCENTILES, compare, load_records, replay, schedule_lag, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay traffic captured by TrafficCaptureMiddleware against a running server and '
+        'report latency percentiles per endpoint, optionally against a stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('capture', help='JSONL file written by TrafficCaptureMiddleware')
+        parser.add_argument(
+            '--base-url',
+            default='http://localhost:8000',
+            help='Server to drive (default: http://localhost:8000)',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=0,
+            help='Requests per second, 0 for as fast as the workers allow (default: 0)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Requests in flight at once (default: 8)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Replay only the first N captured requests',
+        )
+        parser.add_argument(
+            '--search-terms',
+            help='JSON file of {"latin": [...], "cjk": [...]} terms filling masked searches',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed for choosing search terms (default: 0)',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            help='Write the per-endpoint summary to this JSON file',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Compare against a summary saved with --save-baseline',
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=0.2,
+            help='Allowed slowdown of any percentile vs. the baseline as a fraction (default: 0.2)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            records = load_records(options['capture'], options['limit'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read capture: {exc}')
+        if not records:
+            raise CommandError('The capture file has no requests.')
+
+        terms = None
+        if options['search_terms']:
+            with open(options['search_terms'], encoding='utf-8') as handle:
+                terms = json.load(handle)
+
+        started = time.perf_counter()
+        results = replay(
+            records, options['base_url'], rate=options['rate'],
+            concurrency=options['concurrency'], terms=terms, seed=options['seed'],
+        )
+        elapsed = time.perf_counter() - started
+        summary = summarize(results)
+
+        for endpoint, stats in summary.items():
+            percentiles = '  '.join(f'p{p} {stats[f"p{p}"]:8.1f}' for p in PERCENTILES)
+            self.stdout.write(
+                f'{endpoint:45} n={stats["count"]:<6} errors={stats["errors"]:<4} late={stats["late"]:<4} {percentiles}  '
+                f'max {stats["max"]:8.1f} ms'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Replayed {len(results)} requests in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s).'
+        ))
+        late, max_lag = schedule_lag(results)
+        if late:
+            self.stdout.write(self.style.WARNING(
+                f'{late} requests ({late / len(results):.0%}) were sent more than {LATE_MS} ms behind schedule '
+                f'(max {max_lag:.1f} ms); latencies include that wait. Raise --concurrency if the server is not the bottleneck.'
+            ))
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w', encoding='utf-8') as handle:
+                json.dump(summary, handle, indent=2)
+            self.stdout.write(f'Baseline written to {options["save_baseline"]}')
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                baseline = json.load(handle)
+            regressions = compare(summary, baseline, options['max_regression'])
+            for endpoint, key, before, after in regressions:
+                self.stdout.write(self.style.WARNING(
+                    f'{endpoint} {key}: {before:.1f} -> {after:.1f} ms ({after / before - 1:+.0%})'
+                ))
+            if regressions:
+                raise CommandError(f'{len(regressions)} latency regression(s) vs. {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions vs. baseline.'))
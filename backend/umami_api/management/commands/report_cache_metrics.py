@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from umami_api.single_flight import COALESCED_EVENTS, METRIC_EVENTS, cache_metrics, reset_cache_metrics
+
+
+class Command(BaseCommand):
+    help = 'Report hit, recompute and coalescing counts of the single-flight response cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Zero the counters after reporting',
+        )
+
+    def handle(self, *args, **options):
+        for name, counts in cache_metrics().items():
+            total = sum(counts.values())
+            coalesced = sum(counts[event] for event in COALESCED_EVENTS)
+            detail = ', '.join(f'{event} {counts[event]}' for event in METRIC_EVENTS)
+            self.stdout.write(f'{name}: {total} requests ({detail}); {coalesced} coalesced')
+
+        if options['reset']:
+            reset_cache_metrics()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, transaction
+
+from umami_api.hot_queries import (
+    COMPLEMENTARY_AA_SQL,
+    COMPLEMENTARY_NUC_SQL,
+    HOT_LIST_SHAPES,
+    list_statement,
+    measure_planning,
+)
+from umami_api.models import Ingredient
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure planning time of the hot query templates ad hoc vs. as prepared statements '
+        'and report the planning time saved per list and detail request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=10,
+            help='Measurements per template (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        sample_id = Ingredient.objects.values_list('id', flat=True).first() or 0
+
+        templates = [(name, *list_statement(shape)) for name, shape in HOT_LIST_SHAPES.items()]
+        templates += [
+            ('complementary_nuc', COMPLEMENTARY_NUC_SQL, [sample_id]),
+            ('complementary_aa', COMPLEMENTARY_AA_SQL, [sample_id]),
+        ]
+
+        saved = {}
+        with connection.cursor() as cursor:
+            for name, sql, params in templates:
+                try:
+                    # A failed PREPARE must not poison the rest of the run
+                    with transaction.atomic():
+                        adhoc, prepared = measure_planning(cursor, name, sql, params, runs)
+                except DatabaseError as exc:
+                    self.stdout.write(self.style.WARNING(f'{name}: skipped ({exc})'))
+                    continue
+                saved[name] = adhoc - prepared
+                self.stdout.write(
+                    f'{name}: planning {adhoc:.3f} ms ad hoc, {prepared:.3f} ms prepared '
+                    f'({adhoc - prepared:.3f} ms saved)'
+                )
+
+        list_saved = [saved[name] for name in HOT_LIST_SHAPES if name in saved]
+        detail_saved = [saved[name] for name in ('complementary_nuc', 'complementary_aa') if name in saved]
+        if list_saved:
+            # A list request runs one list statement (plus its count query)
+            self.stdout.write(self.style.SUCCESS(
+                f'Saved per list request: ~{sum(list_saved) / len(list_saved):.3f} ms planning'
+            ))
+        if detail_saved:
+            # A detail request runs one of the two complementary lookups
+            self.stdout.write(self.style.SUCCESS(
+                f'Saved per detail request: ~{sum(detail_saved) / len(detail_saved):.3f} ms planning'
+            ))
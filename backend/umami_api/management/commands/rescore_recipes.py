@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from umami_api.models import SavedRecipe
+from umami_api.recipe_scoring import (
+    SCORE_FIELDS,
+    apply_scores,
+    load_chemistry,
+    prepare_recipe,
+    score_chunk,
+)
+
+
+class Command(BaseCommand):
+    help = 'Re-score saved recipes against current chemistry (run after imports).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Recipes scored per worker task (default: 2000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes; 1 scores in-process (default: CPU count)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-score recipes even if their inputs did not change',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        recipes = SavedRecipe.objects.only('id', 'items', 'chemistry_fingerprint').order_by('id')
+
+        ingredient_ids = set()
+        for items in recipes.values_list('items', flat=True).iterator(chunk_size=chunk_size):
+            ingredient_ids.update(item.get('ingredient_id') for item in items)
+        chemistry_by_id = load_chemistry(ingredient_ids)
+
+        pending = {}
+        chunks = []
+        chunk = []
+        skipped = 0
+        missing = 0
+        for recipe in recipes.iterator(chunk_size=chunk_size):
+            lines, fingerprint, missing_ids = prepare_recipe(recipe.items, chemistry_by_id)
+            if missing_ids:
+                missing += 1
+                self.stdout.write(self.style.WARNING(
+                    f'Recipe {recipe.id}: ingredients {missing_ids} no longer exist; scoring the rest'
+                ))
+            if fingerprint == recipe.chemistry_fingerprint and not options['force']:
+                skipped += 1
+                continue
+            pending[recipe.id] = (recipe, fingerprint)
+            chunk.append((recipe.id, lines))
+            if len(chunk) >= chunk_size:
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunks.append(chunk)
+
+        if not pending:
+            self.stdout.write(self.style.SUCCESS(f'All {skipped} recipes are up to date.'))
+            return
+
+        self.stdout.write(f'Scoring {len(pending)} recipes in {len(chunks)} chunks...')
+        if options['workers'] > 1 and len(chunks) > 1:
+            # Workers import umami_api (and its models) to unpickle score_chunk; under the
+            # spawn start method (macOS, Windows) they start without a configured Django
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+                results = pool.map(score_chunk, chunks)
+                self._write(results, pending)
+        else:
+            self._write(map(score_chunk, chunks), pending)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-scored {len(pending)} recipes, skipped {skipped} unchanged'
+            + (f', {missing} with missing ingredients.' if missing else '.')
+        ))
+
+    def _write(self, results, pending):
+        """Write each scored chunk back with one bulk update"""
+        for chunk_scores in results:
+            updated = []
+            for recipe_id, scores in chunk_scores:
+                recipe, fingerprint = pending[recipe_id]
+                apply_scores(recipe, scores, fingerprint)
+                updated.append(recipe)
+            SavedRecipe.objects.bulk_update(
+                updated, [*SCORE_FIELDS, 'chemistry_fingerprint', 'scored_at'], batch_size=500
+            )
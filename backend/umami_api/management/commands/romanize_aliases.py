@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from umami_api.models import Alias
+from umami_api.romanize import romanize
+
+
+class Command(BaseCommand):
+    help = (
+        'Store toneless pinyin search keys (Alias.romanized) for aliases with Chinese characters. '
+        'Needed after loaddata, which bypasses Alias.save.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every key, not only missing ones (needed after the pinyin table changes)',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Alias.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(romanized='')
+
+        updated = []
+        for alias in queryset.only('id', 'name', 'romanized').iterator():
+            key = romanize(alias.name)
+            if key != alias.romanized:
+                alias.romanized = key
+                updated.append(alias)
+
+        Alias.objects.bulk_update(updated, ['romanized'], batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f'Romanized {len(updated)} aliases.'))
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+
+from umami_api.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = (
+        'List slow queries captured by SlowQueryMiddleware, show one with its EXPLAIN plan, '
+        'or purge old entries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=float,
+            default=24,
+            help='Only queries captured in the last N hours (default: 24)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Rows to list (default: 20)',
+        )
+        parser.add_argument(
+            '--filter-key',
+            help='Only queries from requests with this canonical filter key (substring match)',
+        )
+        parser.add_argument(
+            '--by-filter',
+            action='store_true',
+            help='Group by canonical filter key instead of listing individual queries',
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            metavar='ID',
+            help='Print the full SQL, parameters and plan of one captured query',
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            help='Delete captured queries older than N days',
+        )
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['purge_days'])
+            deleted, _ = SlowQuery.objects.filter(created_at__lt=cutoff).delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} slow queries older than {cutoff:%Y-%m-%d %H:%M}.'))
+            return
+
+        if options['show'] is not None:
+            try:
+                query = SlowQuery.objects.get(pk=options['show'])
+            except SlowQuery.DoesNotExist:
+                raise CommandError(f'No slow query with id {options["show"]}.')
+            self.stdout.write(f'{query.duration_ms:.1f} ms on {query.database} at {query.created_at:%Y-%m-%d %H:%M:%S}')
+            self.stdout.write(f'Route:   {query.route}')
+            self.stdout.write(f'Filters: {query.filter_key or "-"}')
+            self.stdout.write(f'Params:  {query.params}')
+            self.stdout.write(f'\n{query.sql}\n')
+            if query.plan:
+                self.stdout.write(query.plan)
+            else:
+                self.stdout.write(self.style.WARNING(f'No plan captured: {query.plan_error or "unknown error"}'))
+            return
+
+        queries = SlowQuery.objects.filter(created_at__gte=timezone.now() - timedelta(hours=options['since']))
+        if options['filter_key']:
+            queries = queries.filter(filter_key__contains=options['filter_key'])
+
+        if options['by_filter']:
+            groups = (
+                queries.values('route', 'filter_key')
+                .annotate(count=Count('id'), avg_ms=Avg('duration_ms'), max_ms=Max('duration_ms'))
+                .order_by('-max_ms')[:options['limit']]
+            )
+            for group in groups:
+                self.stdout.write(
+                    f'n={group["count"]:<4} avg {group["avg_ms"]:8.1f}  max {group["max_ms"]:8.1f} ms  '
+                    f'{group["route"]:32} {group["filter_key"] or "-"}'
+                )
+        else:
+            for query in queries.order_by('-duration_ms')[:options['limit']]:
+                sql = ' '.join(query.sql.split())
+                self.stdout.write(
+                    f'#{query.pk:<6} {query.duration_ms:8.1f} ms  {query.created_at:%m-%d %H:%M}  '
+                    f'{query.route:32} {query.filter_key or "-"}\n         {sql[:160]}'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'{queries.count()} slow queries in the last {options["since"]:g}h; '
+            f'use --show ID for the SQL and plan.'
+        ))
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from umami_api.warmup import configured_requests, detail_requests, replay, requests_from_log
+
+
+class Command(BaseCommand):
+    help = (
+        'Warm Postgres buffers and caches by replaying the most common list/filter/search '
+        'requests and top detail pages through the full request stack.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log',
+            help='Access log or file of request paths to take the most frequent API requests from '
+                 '(default: CACHE_WARMUP_REQUESTS)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=50,
+            help='Most frequent logged requests to replay with --log (default: 50)',
+        )
+        parser.add_argument(
+            '--details',
+            type=int,
+            default=20,
+            help='Detail pages to warm, taken from the top of the landing list (default: 20)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Requests in flight at once (default: 4)',
+        )
+
+    def handle(self, *args, **options):
+        if options['log']:
+            try:
+                with open(options['log'], encoding='utf-8', errors='replace') as handle:
+                    paths = requests_from_log(handle, options['top'])
+            except OSError as exc:
+                raise CommandError(f'Cannot read request log: {exc}')
+        else:
+            paths = configured_requests()
+        paths += detail_requests(options['details'])
+        if not paths:
+            self.stdout.write(self.style.WARNING('No requests to replay.'))
+            return
+
+        started = time.perf_counter()
+        results = replay(paths, options['concurrency'])
+        elapsed = time.perf_counter() - started
+
+        failed = [(path, status) for path, status, _ in results if status >= 400]
+        for path, status in failed:
+            self.stdout.write(self.style.WARNING(f'{status} {path}'))
+        slowest = sorted(results, key=lambda result: result[2], reverse=True)[:5]
+        for path, status, ms in slowest:
+            self.stdout.write(f'{ms:8.1f} ms  {status} {path}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Warmed {len(results) - len(failed)}/{len(results)} requests in {elapsed:.2f}s '
+            f'({sum(ms for _, _, ms in results) / 1000:.2f}s of request time, '
+            f'concurrency {options["concurrency"]}).'
+        ))
@@ -0,0 +1,141 @@
+"""Prometheus metrics for the API, exposed at ``/metrics``.
+
+``MetricsMiddleware`` observes every ``/api/`` request, labelled by action
+(the route name, e.g. ``ingredient-list``, ``ingredient-compose-preview``),
+filter shape (which filter families are present, never their values) and
+sort:
+
+- ``umami_api_request_duration_seconds`` histogram (plus method and status class)
+- ``umami_api_db_queries`` histogram of SQL statements per request
+- ``umami_api_result_count`` histogram of ``count`` in paginated responses
+- ``umami_api_throttled_total`` counter of 429 responses
+- ``umami_api_response_cache_total`` counter of single-flight cache events
+  (hit ratio = hit / all events, coalesced = stale + waited)
+
+Under gunicorn set ``PROMETHEUS_MULTIPROC_DIR`` (``gunicorn.conf.py`` does)
+so every worker writes its samples to shared mmap files and ``/metrics``
+aggregates them. Without prometheus_client installed the middleware removes
+itself and ``/metrics`` answers 503.
+
+``/metrics`` requires ``Authorization: Bearer <METRICS_TOKEN>``; with no
+token configured it answers 403, so metrics are never public by accident.
+"""
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+
+from .filter_compiler import RANGE_FILTERS
+from .tokens import header_matches
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+METRICS_PREFIX = '/api/'
+
+# Query parameters that make up a request's filter shape (range bounds count as one family)
+SHAPE_PARAMS = {
+    'q': 'q', 'umami[]': 'umami', 'flavor[]': 'flavor', 'qi[]': 'qi', 'flavors[]': 'flavors',
+    'meridians[]': 'meridians', 'allergens_include[]': 'allergens_include',
+    'allergens_exclude[]': 'allergens_exclude', 'dietary[]': 'dietary', 'dietary': 'dietary',
+    'category[]': 'category', **{param: 'range' for param in RANGE_FILTERS},
+}
+SORTS = ('synergy', 'aa', 'nuc', 'alpha', 'relevance', 'tcm')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+RESULT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+if prometheus_client is not None:
+    REQUEST_DURATION = Histogram(
+        'umami_api_request_duration_seconds', 'API request latency',
+        ['action', 'shape', 'sort', 'method', 'status'], buckets=LATENCY_BUCKETS,
+    )
+    DB_QUERIES = Histogram(
+        'umami_api_db_queries', 'SQL statements executed per API request',
+        ['action', 'shape'], buckets=QUERY_BUCKETS,
+    )
+    RESULT_COUNT = Histogram(
+        'umami_api_result_count', 'Matching items in paginated API responses',
+        ['action', 'shape'], buckets=RESULT_BUCKETS,
+    )
+    THROTTLED = Counter('umami_api_throttled_total', 'API requests rejected by throttling', ['action'])
+    CACHE_EVENTS = Counter(
+        'umami_api_response_cache_total', 'Single-flight response cache events', ['computation', 'event'],
+    )
+
+
+def request_shape(params):
+    """``q+range+umami``-style label of the filter families present ('-' for none)"""
+    families = {SHAPE_PARAMS[key] for key in params if key in SHAPE_PARAMS}
+    return '+'.join(sorted(families)) or '-'
+
+
+def record_cache_event(computation, event):
+    if prometheus_client is not None:
+        CACHE_EVENTS.labels(computation, event).inc()
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if prometheus_client is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(METRICS_PREFIX):
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count_query))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        action = getattr(request.resolver_match, 'url_name', None) or 'unresolved'
+        shape = request_shape(request.GET)
+        sort = request.GET.get('sort', '')
+        sort = sort if sort in SORTS or not sort else 'other'
+        REQUEST_DURATION.labels(
+            action, shape, sort, request.method, f'{response.status_code // 100}xx'
+        ).observe(elapsed)
+        DB_QUERIES.labels(action, shape).observe(queries)
+        data = getattr(response, 'data', None)
+        if isinstance(data, dict) and isinstance(data.get('count'), int):
+            RESULT_COUNT.labels(action, shape).observe(data['count'])
+        if response.status_code == 429:
+            THROTTLED.labels(action).inc()
+        return response
+
+
+def metrics_view(request):
+    """Prometheus text exposition, aggregated across workers in multiprocess mode"""
+    if prometheus_client is None:
+        return JsonResponse({'error': 'prometheus_client is not installed'}, status=503)
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return JsonResponse({'error': 'Metrics are disabled until METRICS_TOKEN is set'}, status=403)
+    if not header_matches(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return HttpResponse(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0003_alter_chemistry_umami_aa_alter_chemistry_umami_nuc_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Pairing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slice', models.CharField(blank=True, default='', max_length=255)),
+                ('rank', models.PositiveIntegerField()),
+                ('ratio', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('euc', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pairings', to='umami_api.ingredient')),
+                ('partner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='umami_api.ingredient')),
+            ],
+            options={
+                'db_table': 'pairing',
+                'indexes': [models.Index(fields=['slice', 'rank'], name='idx_pairing_slice_rank'), models.Index(fields=['ingredient', 'slice', 'rank'], name='idx_pairing_ingredient_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0004_pairing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('items', models.JSONField(default=list)),
+                ('total_weight', models.DecimalField(decimal_places=3, default=0, max_digits=10)),
+                ('total_aa', models.DecimalField(decimal_places=3, default=0, max_digits=10)),
+                ('total_nuc', models.DecimalField(decimal_places=3, default=0, max_digits=10)),
+                ('total_synergy', models.DecimalField(decimal_places=3, default=0, max_digits=12)),
+                ('pui', models.DecimalField(decimal_places=3, default=0, max_digits=6)),
+                ('chemistry_fingerprint', models.CharField(blank=True, default='', max_length=64)),
+                ('scored_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'saved_recipe',
+            },
+        ),
+    ]
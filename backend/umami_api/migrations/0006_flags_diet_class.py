@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0005_saved_recipe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flags',
+            name='diet_class',
+            field=models.CharField(blank=True, choices=[('vegan', 'Vegan'), ('vegetarian', 'Vegetarian'), ('pescatarian', 'Pescatarian'), ('non_vegetarian', 'Non Vegetarian')], db_index=True, max_length=20, null=True),
+        ),
+        # Backfill existing rows in one statement; normalize_dietary_flags keeps it current afterwards
+        migrations.RunSQL(
+            sql="""
+            UPDATE flags f SET diet_class = CASE
+                WHEN t.tags @> '["vegan"]' THEN 'vegan'
+                WHEN t.tags @> '["vegetarian"]' THEN 'vegetarian'
+                WHEN t.tags @> '["pescatarian"]' THEN 'pescatarian'
+                WHEN jsonb_array_length(t.tags) > 0 THEN 'non_vegetarian'
+                ELSE NULL
+            END
+            FROM (
+                SELECT ingredient_id,
+                       COALESCE((
+                           SELECT jsonb_agg(replace(replace(lower(btrim(tag)), ' ', '_'), '-', '_'))
+                           FROM jsonb_array_elements_text(dietary_restrictions) AS tag
+                           WHERE btrim(tag) <> ''
+                       ), '[]'::jsonb) AS tags
+                FROM flags
+                WHERE jsonb_typeof(dietary_restrictions) = 'array'
+            ) t
+            WHERE f.ingredient_id = t.ingredient_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
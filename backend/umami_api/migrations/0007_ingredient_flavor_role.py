@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:30
+
+from django.db import migrations, models
+
+
+# The version 1 rules as they stood when this migration was written. They are
+# frozen here so later edits to umami_api.flavor_roles cannot change what this
+# migration does; rows it classifies are brought up to the current rules by
+# classify_flavor_roles, which recomputes any row with an older version.
+RULES_VERSION = 1
+HIGH_UMAMI_THRESHOLDS = {'umami_aa': 740, 'umami_nuc': 650, 'umami_synergy': 1900}
+STAPLE_TERMS = ('rice', 'bread', 'noodle', 'pasta', 'flour', 'wheat', 'grain')
+
+
+def classify(row):
+    values = {metric: row[f'chemistry__{metric}'] for metric in HIGH_UMAMI_THRESHOLDS}
+    if any(values[metric] is not None and values[metric] >= threshold
+           for metric, threshold in HIGH_UMAMI_THRESHOLDS.items()):
+        return 'high_umami'
+    text = ' '.join((row[field] or '').lower() for field in ('base_name', 'display_name', 'category'))
+    if any(term in text for term in STAPLE_TERMS):
+        return 'flavor_carrier'
+    return 'flavor_supporting'
+
+
+def classify_existing(apps, schema_editor):
+    Ingredient = apps.get_model('umami_api', 'Ingredient')
+    updated = []
+    for row in Ingredient.objects.values(
+        'id', 'base_name', 'display_name', 'category',
+        'chemistry__umami_aa', 'chemistry__umami_nuc', 'chemistry__umami_synergy',
+    ).iterator():
+        updated.append(Ingredient(id=row['id'], flavor_role=classify(row), flavor_role_version=RULES_VERSION))
+    Ingredient.objects.bulk_update(updated, ['flavor_role', 'flavor_role_version'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0006_flags_diet_class'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='flavor_role',
+            field=models.CharField(blank=True, choices=[('high_umami', 'High umami'), ('flavor_carrier', 'Flavor carrier'), ('flavor_supporting', 'Flavor supporting')], db_index=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='flavor_role_version',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(classify_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:38
+
+import umami_api.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0007_ingredient_flavor_role'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chemistry',
+            name='amp',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='asp',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='glu',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='gmp',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='imp',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='umami_aa',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='umami_nuc',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+        migrations.AlterField(
+            model_name='chemistry',
+            name='umami_synergy',
+            field=umami_api.models.FixedPrecisionFloatField(default=0, places=3),
+        ),
+    ]
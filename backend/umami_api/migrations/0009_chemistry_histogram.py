@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0008_chemistry_float8'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChemistryHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('category', models.CharField(blank=True, max_length=100, null=True)),
+                ('diet_class', models.CharField(blank=True, max_length=20, null=True)),
+                ('flavor_role', models.CharField(blank=True, max_length=20, null=True)),
+                ('edges', models.JSONField(default=list)),
+                ('counts', models.JSONField(default=list)),
+                ('zero', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'chemistry_histogram',
+                'indexes': [models.Index(fields=['metric', 'category'], name='idx_histogram_metric_category')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0009_chemistry_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChemistryQuantile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('category', models.CharField(blank=True, max_length=100, null=True)),
+                ('quantiles', models.JSONField(default=dict)),
+                ('sample_size', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'chemistry_quantile',
+            },
+        ),
+    ]
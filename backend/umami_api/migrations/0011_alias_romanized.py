@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:50
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+# Existing aliases are not backfilled here: the pinyin table lives in application
+# code, and a historical migration must not change when that code does. Run
+# `manage.py romanize_aliases` (the build scripts do) to fill Alias.romanized.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0010_chemistry_quantile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alias',
+            name='romanized',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='alias',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['romanized'], name='idx_alias_romanized_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='alias',
+            index=models.Index(fields=['romanized'], name='idx_alias_romanized_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('umami_api', '0011_alias_romanized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sql', models.TextField()),
+                ('params', models.JSONField(default=list)),
+                ('duration_ms', models.FloatField()),
+                ('database', models.CharField(default='default', max_length=50)),
+                ('route', models.CharField(blank=True, default='', max_length=100)),
+                ('filter_key', models.TextField(blank=True, default='')),
+                ('plan', models.TextField(blank=True, default='')),
+                ('plan_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'slow_query',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,7 +1,18 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 import json
 
+from . import flavor_roles
+
+
+FLAVOR_ROLE_CHOICES = [
+    (flavor_roles.HIGH_UMAMI, 'High umami'),
+    (flavor_roles.FLAVOR_CARRIER, 'Flavor carrier'),
+    (flavor_roles.FLAVOR_SUPPORTING, 'Flavor supporting'),
+]
+
 
 class Ingredient(models.Model):
     base_name = models.CharField(max_length=255)
@@ -10,6 +21,9 @@ class Ingredient(models.Model):
     extraction_temp = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     extraction_time = models.IntegerField(null=True, blank=True)
     cooking_overview = models.TextField(null=True, blank=True)
+    # Precomputed by flavor_roles; refreshed on save and by classify_flavor_roles
+    flavor_role = models.CharField(max_length=20, choices=FLAVOR_ROLE_CHOICES, null=True, blank=True, db_index=True)
+    flavor_role_version = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -19,30 +33,84 @@ class Ingredient(models.Model):
     def __str__(self):
         return self.base_name
 
+    def refresh_flavor_role(self):
+        """Recompute flavor_role; returns True if it changed"""
+        role = flavor_roles.classify_ingredient(self)
+        changed = (role, flavor_roles.FLAVOR_ROLE_RULES_VERSION) != (self.flavor_role, self.flavor_role_version)
+        self.flavor_role = role
+        self.flavor_role_version = flavor_roles.FLAVOR_ROLE_RULES_VERSION
+        return changed
+
+    def save(self, *args, **kwargs):
+        self.refresh_flavor_role()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'flavor_role', 'flavor_role_version'}
+        super().save(*args, **kwargs)
+
 
 class Alias(models.Model):
     ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='aliases')
     name = models.CharField(max_length=255)
     language = models.CharField(max_length=10, default='en')
+    # Toneless pinyin of the Chinese characters in name ('' if none); see romanize.py
+    romanized = models.CharField(max_length=255, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'alias'
+        indexes = [
+            GinIndex(fields=['romanized'], name='idx_alias_romanized_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['romanized'], name='idx_alias_romanized_prefix', opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.language})"
 
+    def save(self, *args, **kwargs):
+        from .romanize import romanize
+
+        self.romanized = romanize(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'romanized'}
+        super().save(*args, **kwargs)
+
+
+class FixedPrecisionFloatField(models.FloatField):
+    """float8 column rounded to ``places`` decimal places on write.
+
+    Keeps the precision the old numeric(.., 3) columns stored and the API
+    displays, while sorts, range filters and aggregates run on native
+    doubles and Python reads plain floats instead of Decimals.
+    """
+
+    def __init__(self, *args, places=3, **kwargs):
+        # Not named decimal_places: DRF would pass that on to serializers.FloatField
+        self.places = places
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['places'] = self.places
+        return name, path, args, kwargs
+
+    def get_db_prep_save(self, value, connection):
+        value = super().get_db_prep_save(value, connection)
+        return None if value is None else round(value, self.places)
+
 
 class Chemistry(models.Model):
     ingredient = models.OneToOneField(Ingredient, on_delete=models.CASCADE, primary_key=True)
-    glu = models.DecimalField(max_digits=8, decimal_places=3, default=0)
-    asp = models.DecimalField(max_digits=8, decimal_places=3, default=0)
-    imp = models.DecimalField(max_digits=8, decimal_places=3, default=0)
-    gmp = models.DecimalField(max_digits=8, decimal_places=3, default=0)
-    amp = models.DecimalField(max_digits=8, decimal_places=3, default=0)
-    umami_aa = models.DecimalField(max_digits=10, decimal_places=3, default=0)
-    umami_nuc = models.DecimalField(max_digits=10, decimal_places=3, default=0)
-    umami_synergy = models.DecimalField(max_digits=12, decimal_places=3, default=0)  # Can store up to 999,999,999.999
+    # All values are mg/100g, stored as float8 rounded to 3 decimal places
+    glu = FixedPrecisionFloatField(default=0)
+    asp = FixedPrecisionFloatField(default=0)
+    imp = FixedPrecisionFloatField(default=0)
+    gmp = FixedPrecisionFloatField(default=0)
+    amp = FixedPrecisionFloatField(default=0)
+    umami_aa = FixedPrecisionFloatField(default=0)
+    umami_nuc = FixedPrecisionFloatField(default=0)
+    umami_synergy = FixedPrecisionFloatField(default=0)  # Values reach ~450,000
 
     class Meta:
         db_table = 'chemistry'
@@ -50,6 +118,17 @@ class Chemistry(models.Model):
     def __str__(self):
         return f"Chemistry for {self.ingredient.base_name}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Flavor role depends on umami levels, so reclassify the ingredient
+        ingredient = self.ingredient
+        ingredient.chemistry = self
+        if ingredient.refresh_flavor_role():
+            Ingredient.objects.filter(pk=ingredient.pk).update(
+                flavor_role=ingredient.flavor_role,
+                flavor_role_version=ingredient.flavor_role_version,
+            )
+
 
 class TCM(models.Model):
     ingredient = models.OneToOneField(Ingredient, on_delete=models.CASCADE, primary_key=True)
@@ -66,15 +145,185 @@ class TCM(models.Model):
         return f"TCM for {self.ingredient.base_name}"
 
 
+class DietClass(models.TextChoices):
+    VEGAN = 'vegan'
+    VEGETARIAN = 'vegetarian'
+    PESCATARIAN = 'pescatarian'
+    NON_VEGETARIAN = 'non_vegetarian'
+
+
+# Diet classes matched by each dietary filter (inclusive: vegan food is vegetarian too)
+DIET_FILTER_CLASSES = {
+    'vegan': [DietClass.VEGAN],
+    'vegetarian': [DietClass.VEGAN, DietClass.VEGETARIAN],
+    'pescatarian': [DietClass.VEGAN, DietClass.VEGETARIAN, DietClass.PESCATARIAN],
+    'non_vegetarian': [DietClass.PESCATARIAN, DietClass.NON_VEGETARIAN],
+}
+
+
+def derive_diet_class(dietary_restrictions):
+    """Most permissive diet an ingredient fits, or None when it has no dietary info"""
+    tags = {
+        (tag or '').strip().lower().replace(' ', '_').replace('-', '_')
+        for tag in dietary_restrictions or []
+    }
+    tags.discard('')
+    for diet_class in (DietClass.VEGAN, DietClass.VEGETARIAN, DietClass.PESCATARIAN):
+        if diet_class.value in tags:
+            return diet_class.value
+    return DietClass.NON_VEGETARIAN.value if tags else None
+
+
 class Flags(models.Model):
     ingredient = models.OneToOneField(Ingredient, on_delete=models.CASCADE, primary_key=True)
     allergens = models.JSONField(default=list, blank=True)
     dietary_restrictions = models.JSONField(default=list, blank=True)
     umami_tags = models.JSONField(default=list, blank=True)
     flavor_tags = models.JSONField(default=list, blank=True)
+    # Derived from dietary_restrictions on save and by normalize_dietary_flags
+    diet_class = models.CharField(max_length=20, choices=DietClass.choices, null=True, blank=True, db_index=True)
 
     class Meta:
         db_table = 'flags'
 
     def __str__(self):
-        return f"Flags for {self.ingredient.base_name}"
\ No newline at end of file
+        return f"Flags for {self.ingredient.base_name}"
+
+    def save(self, *args, **kwargs):
+        self.diet_class = derive_diet_class(self.dietary_restrictions)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'dietary_restrictions' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'diet_class'}
+        super().save(*args, **kwargs)
+
+
+class Pairing(models.Model):
+    """Precomputed two-ingredient pairing scored by mixture EUC.
+
+    Rows with an empty ``slice`` are an ingredient's top partners; rows with
+    a slice key (see ``pairings.pairing_slice_key``) are the global top pairs
+    for that category/dietary slice. ``ratio`` is ``ingredient``'s share of
+    the mixture by weight.
+    """
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='pairings')
+    partner = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='+')
+    slice = models.CharField(max_length=255, blank=True, default='')
+    rank = models.PositiveIntegerField()
+    ratio = models.DecimalField(max_digits=4, decimal_places=2)
+    euc = models.DecimalField(max_digits=12, decimal_places=3)
+
+    class Meta:
+        db_table = 'pairing'
+        indexes = [
+            models.Index(fields=['slice', 'rank'], name='idx_pairing_slice_rank'),
+            models.Index(fields=['ingredient', 'slice', 'rank'], name='idx_pairing_ingredient_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.ingredient.base_name} + {self.partner.base_name} ({self.euc})"
+
+
+class SavedRecipe(models.Model):
+    """A persisted composition and its last computed scores.
+
+    ``items`` uses the compose_preview payload shape. ``chemistry_fingerprint``
+    hashes the items together with their ingredients' chemistry at scoring
+    time, so re-scoring can skip recipes whose inputs did not change.
+    Recipes belong to the user who created them (``owner``).
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, related_name='saved_recipes'
+    )
+    name = models.CharField(max_length=255)
+    items = models.JSONField(default=list)
+    total_weight = models.DecimalField(max_digits=10, decimal_places=3, default=0)
+    total_aa = models.DecimalField(max_digits=10, decimal_places=3, default=0)
+    total_nuc = models.DecimalField(max_digits=10, decimal_places=3, default=0)
+    total_synergy = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    pui = models.DecimalField(max_digits=6, decimal_places=3, default=0)
+    chemistry_fingerprint = models.CharField(max_length=64, blank=True, default='')
+    scored_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'saved_recipe'
+
+    def __str__(self):
+        return self.name
+
+
+class ChemistryHistogram(models.Model):
+    """Precomputed distribution of one chemistry metric for one filter cell.
+
+    A cell is one (category, diet_class, flavor_role) combination, the finest
+    partition of the categorical list filters, so the histogram for any
+    combination of those filters is the sum of its cells' ``counts``. All
+    cells of a metric share the same log-spaced ``edges``; ``zero`` counts
+    ingredients whose value is exactly 0. Rebuilt by ``build_histograms``.
+    """
+    metric = models.CharField(max_length=20)
+    category = models.CharField(max_length=100, null=True, blank=True)
+    diet_class = models.CharField(max_length=20, null=True, blank=True)
+    flavor_role = models.CharField(max_length=20, null=True, blank=True)
+    edges = models.JSONField(default=list)
+    counts = models.JSONField(default=list)
+    zero = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'chemistry_histogram'
+        indexes = [
+            models.Index(fields=['metric', 'category'], name='idx_histogram_metric_category'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} histogram ({self.category}, {self.diet_class}, {self.flavor_role})"
+
+
+class ChemistryQuantile(models.Model):
+    """Quantile cut points of one chemistry metric, globally or per category.
+
+    ``category`` is null for the global row. ``quantiles`` maps ``p10`` ...
+    ``p99`` to mg/100g values over the ingredients with a non-zero value
+    (zero is its own level). Rebuilt by ``build_quantiles`` and read
+    through ``quantiles.get_quantile_table()``.
+    """
+    metric = models.CharField(max_length=20)
+    category = models.CharField(max_length=100, null=True, blank=True)
+    quantiles = models.JSONField(default=dict)
+    sample_size = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'chemistry_quantile'
+
+    def __str__(self):
+        return f"{self.metric} quantiles ({self.category or 'global'})"
+
+
+class SlowQuery(models.Model):
+    """A SQL statement that exceeded ``SLOW_QUERY_THRESHOLD_MS`` during a request.
+
+    ``filter_key`` is the request's ``canonical_filter_key``; ``plan`` is the
+    ``EXPLAIN (ANALYZE, BUFFERS)`` output for SELECTs and plain ``EXPLAIN``
+    for anything else. Recorded by ``slow_queries.SlowQueryMiddleware`` and
+    inspected with the ``slow_queries`` command.
+    """
+    sql = models.TextField()
+    params = models.JSONField(default=list)
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=50, default='default')
+    route = models.CharField(max_length=100, blank=True, default='')
+    filter_key = models.TextField(blank=True, default='')
+    plan = models.TextField(blank=True, default='')
+    plan_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'slow_query'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms {self.route or 'query'} ({self.created_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,157 @@
+"""Blocked all-pairs synergy computation for two-ingredient pairings.
+
+Every ingredient pair is scored by the EUC of a two-ingredient mixture at a
+few standard weight ratios, keeping the best ratio per pair. The pair matrix
+is never materialised: it is walked in ``block_size`` x ``block_size`` tiles
+and only the running top-K partners per ingredient and top-N pairs per slice
+(all / category / diet / category+diet) are kept between tiles.
+"""
+import numpy as np
+
+from .composition import AA_WEIGHTS, NUC_WEIGHTS, SYNERGY_CONSTANT
+from .models import DIET_FILTER_CLASSES
+
+# Share of the first ingredient in the mixture, by weight
+STANDARD_RATIOS = (0.25, 0.5, 0.75)
+
+# Every diet the list filters accept (dietary[]) has its own slice
+DIET_SLICES = tuple(DIET_FILTER_CLASSES)
+
+
+def pairing_slice_key(category=None, diet=None):
+    """Key under which the global top pairings for a slice are stored"""
+    parts = []
+    if category:
+        parts.append(f'category:{category}')
+    if diet:
+        parts.append(f'diet:{diet.lower()}')
+    return '|'.join(parts) or 'all'
+
+
+def diet_memberships(diet_class):
+    """Diet slices an ingredient with ``diet_class`` belongs to (inclusive filter logic)"""
+    return {diet for diet in DIET_SLICES if diet_class in DIET_FILTER_CLASSES[diet]}
+
+
+def weighted_profile(glu, asp, imp, gmp, amp):
+    """Weighted AA and Nuc in mg/100g for arrays of compound values"""
+    aa = glu * AA_WEIGHTS['glu'] + asp * AA_WEIGHTS['asp']
+    nuc = imp * NUC_WEIGHTS['imp'] + gmp * NUC_WEIGHTS['gmp'] + amp * NUC_WEIGHTS['amp']
+    return aa, nuc
+
+
+def _pair_block(aa_i, nuc_i, aa_j, nuc_j):
+    """Best EUC (mg/100g) over STANDARD_RATIOS and the ratio that achieves it"""
+    k = SYNERGY_CONSTANT / 1000.0
+    best = None
+    best_ratio = None
+    for share in STANDARD_RATIOS:
+        aa = share * aa_i[:, None] + (1 - share) * aa_j[None, :]
+        nuc = share * nuc_i[:, None] + (1 - share) * nuc_j[None, :]
+        euc = aa + k * aa * nuc
+        if best is None:
+            best = euc
+            best_ratio = np.full(euc.shape, share)
+        else:
+            better = euc > best
+            best = np.where(better, euc, best)
+            best_ratio = np.where(better, share, best_ratio)
+    return best, best_ratio
+
+
+def _merge_top(scores, cols, ratios, new_scores, new_cols, new_ratios, k):
+    """Merge candidate (score, column, ratio) rows and keep the k best per row"""
+    scores = np.concatenate([scores, new_scores], axis=1)
+    cols = np.concatenate([cols, new_cols], axis=1)
+    ratios = np.concatenate([ratios, new_ratios], axis=1)
+    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return (
+        np.take_along_axis(scores, keep, axis=1),
+        np.take_along_axis(cols, keep, axis=1),
+        np.take_along_axis(ratios, keep, axis=1),
+    )
+
+
+def _row_top(block, ratio, col_offset, k):
+    """Top-k columns of each block row as (scores, global columns, ratios)"""
+    kk = min(k, block.shape[1])
+    idx = np.argpartition(-block, kk - 1, axis=1)[:, :kk]
+    return (
+        np.take_along_axis(block, idx, axis=1),
+        idx + col_offset,
+        np.take_along_axis(ratio, idx, axis=1),
+    )
+
+
+def compute_pairings(aa, nuc, slices, top_k=10, top_n=50, block_size=512):
+    """Score all ingredient pairs in blocks.
+
+    ``aa`` and ``nuc`` are weighted mg/100g arrays indexed by position.
+    ``slices`` maps a slice key to a boolean membership mask; a pair belongs
+    to a slice when both ingredients do.
+
+    Returns ``(per_ingredient, per_slice)``:
+    - ``per_ingredient[i]`` is a list of ``(partner, euc, share_of_i)``
+    - ``per_slice[key]`` is a list of ``(i, j, euc, share_of_i)`` with i < j
+    Both lists are sorted by EUC descending.
+    """
+    n = len(aa)
+    aa = np.asarray(aa, dtype=float)
+    nuc = np.asarray(nuc, dtype=float)
+
+    # Running per-ingredient top-K, padded with -inf until filled
+    top_scores = np.full((n, top_k), -np.inf)
+    top_cols = np.zeros((n, top_k), dtype=np.int64)
+    top_ratios = np.zeros((n, top_k))
+
+    slice_best = {key: [] for key in slices}
+
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        for j0 in range(i0, n, block_size):
+            j1 = min(j0 + block_size, n)
+            block, ratio = _pair_block(aa[i0:i1], nuc[i0:i1], aa[j0:j1], nuc[j0:j1])
+
+            # Only pairs with i < j are scored once; mask the rest out
+            rows = np.arange(i0, i1)[:, None]
+            cols = np.arange(j0, j1)[None, :]
+            block = np.where(rows < cols, block, -np.inf)
+
+            # Rows of this block see partners j; columns see partners i
+            r_scores, r_cols, r_ratios = _row_top(block, ratio, j0, top_k)
+            c_scores, c_cols, c_ratios = _row_top(block.T, 1 - ratio.T, i0, top_k)
+
+            for lo, hi, scores, cols_, ratios in (
+                (i0, i1, r_scores, r_cols, r_ratios),
+                (j0, j1, c_scores, c_cols, c_ratios),
+            ):
+                top_scores[lo:hi], top_cols[lo:hi], top_ratios[lo:hi] = _merge_top(
+                    top_scores[lo:hi], top_cols[lo:hi], top_ratios[lo:hi],
+                    scores, cols_, ratios, top_k
+                )
+
+            for key, mask in slices.items():
+                in_slice = mask[i0:i1][:, None] & mask[j0:j1][None, :]
+                masked = np.where(in_slice, block, -np.inf).ravel()
+                take = min(top_n, masked.size)
+                idx = np.argpartition(-masked, take - 1)[:take]
+                idx = idx[np.isfinite(masked[idx])]
+                width = j1 - j0
+                candidates = [
+                    (i0 + int(flat // width), j0 + int(flat % width), float(masked[flat]),
+                     float(ratio.ravel()[flat]))
+                    for flat in idx
+                ]
+                merged = slice_best[key] + candidates
+                merged.sort(key=lambda pair: pair[2], reverse=True)
+                slice_best[key] = merged[:top_n]
+
+    per_ingredient = []
+    for i in range(n):
+        order = np.argsort(-top_scores[i])
+        per_ingredient.append([
+            (int(top_cols[i, c]), float(top_scores[i, c]), float(top_ratios[i, c]))
+            for c in order if np.isfinite(top_scores[i, c])
+        ])
+
+    return per_ingredient, slice_best
@@ -0,0 +1,119 @@
+"""Top-k partner search over a sorted (weighted_aa, weighted_nuc) index.
+
+Mixing a fixed ingredient X (share s of the mixture) with a candidate P gives
+
+    AA  = s·aa_x + (1-s)·aa_p        Nuc = s·nuc_x + (1-s)·nuc_p
+    EUC = AA + 1.218·AA·Nuc          (all in mg/100g)
+
+All terms are non-negative, so EUC is monotone in both aa_p and nuc_p. That
+lets a threshold algorithm walk two lists sorted by aa and by nuc from the
+top: the EUC of (next unseen aa, next unseen nuc) bounds every unseen
+candidate, and the search stops as soon as the k-th best seen beats it.
+Usually only a small prefix of each list is touched.
+"""
+import heapq
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .composition import SYNERGY_CONSTANT
+from .models import Chemistry
+from .pairings import weighted_profile
+
+_index = None
+
+
+class PartnerIndex:
+    """Weighted AA/Nuc for every ingredient plus both descending sort orders"""
+
+    def __init__(self, ids, aa, nuc):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.aa = np.asarray(aa, dtype=float)
+        self.nuc = np.asarray(nuc, dtype=float)
+        self.by_aa = np.argsort(-self.aa, kind='stable')
+        self.by_nuc = np.argsort(-self.nuc, kind='stable')
+        self.position = {int(ingredient_id): i for i, ingredient_id in enumerate(self.ids)}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        rows = list(Chemistry.objects.values_list('ingredient_id', 'glu', 'asp', 'imp', 'gmp', 'amp'))
+        if not rows:
+            return cls([], [], [])
+        ids = [row[0] for row in rows]
+        compounds = np.array([[float(v or 0) for v in row[1:]] for row in rows])
+        aa, nuc = weighted_profile(*compounds.T)
+        return cls(ids, aa, nuc)
+
+
+def get_partner_index():
+    """Per-process index, rebuilt after ``PARTNER_INDEX_TTL`` seconds"""
+    global _index
+    ttl = getattr(settings, 'PARTNER_INDEX_TTL', 300)
+    if _index is None or time.monotonic() - _index.built_at > ttl:
+        _index = PartnerIndex.build()
+    return _index
+
+
+def _mixture_euc(aa_x, nuc_x, share_x, aa_p, nuc_p):
+    aa = share_x * aa_x + (1 - share_x) * aa_p
+    nuc = share_x * nuc_x + (1 - share_x) * nuc_p
+    return aa + (SYNERGY_CONSTANT / 1000.0) * aa * nuc
+
+
+def top_partners(index, ingredient_id, share_x, k=10, allowed=None, batch_size=256):
+    """Exact top-k partners of ``ingredient_id`` by mixture EUC.
+
+    ``allowed`` is an optional callable that takes a list of candidate
+    ingredient ids and returns the subset passing the active filters; it is
+    called once per batch of candidates pulled from the sorted lists.
+    Returns ``(results, examined)`` where results are
+    ``(ingredient_id, euc, weighted_aa, weighted_nuc)`` sorted by EUC.
+    """
+    x = index.position.get(int(ingredient_id))
+    if x is None:
+        return [], 0
+    aa_x, nuc_x = index.aa[x], index.nuc[x]
+    n = len(index.ids)
+
+    heap = []  # min-heap of (euc, position)
+    seen = {x}
+    cursor = 0
+    while cursor < n:
+        end = min(cursor + batch_size, n)
+        batch = [
+            int(p) for p in np.concatenate([index.by_aa[cursor:end], index.by_nuc[cursor:end]])
+            if int(p) not in seen
+        ]
+        batch = list(dict.fromkeys(batch))
+        seen.update(batch)
+        if batch and allowed is not None:
+            passing = set(allowed([int(index.ids[p]) for p in batch]))
+            batch = [p for p in batch if int(index.ids[p]) in passing]
+
+        if batch:
+            positions = np.array(batch)
+            scores = _mixture_euc(aa_x, nuc_x, share_x, index.aa[positions], index.nuc[positions])
+            for p, score in zip(batch, scores):
+                if len(heap) < k:
+                    heapq.heappush(heap, (float(score), p))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (float(score), p))
+
+        cursor = end
+        if cursor >= n:
+            break
+        # Best EUC any unseen candidate could still reach
+        threshold = _mixture_euc(
+            aa_x, nuc_x, share_x,
+            index.aa[index.by_aa[cursor]], index.nuc[index.by_nuc[cursor]],
+        )
+        if len(heap) == k and heap[0][0] >= threshold:
+            break
+
+    results = [
+        (int(index.ids[p]), score, float(index.aa[p]), float(index.nuc[p]))
+        for score, p in sorted(heap, reverse=True)
+    ]
+    return results, len(seen) - 1
@@ -0,0 +1,376 @@
+"""Offline Mandarin readings for characters common in ingredient names.
+
+One line per toneless pinyin syllable followed by the characters read that
+way (ü is written ``v``, as pinyin keyboards do). Polyphonic characters are
+listed once, under their reading in food names (干 gan, 参 shen, 卜 bo,
+芥 jie, 茄 qie, 蛤 ge, 芫 yan, 豉 chi). Used when pypinyin is not installed.
+"""
+
+PINYIN_SYLLABLES = """
+a 阿
+ai 艾
+an 安鹌岸
+ao 奥澳鳌
+ba 八巴芭菝把霸扒
+bai 白百柏摆
+ban 板半斑瓣
+bang 蚌棒
+bao 包宝鲍煲苞爆饱
+bei 北贝杯背焙
+ben 本
+bi 荸碧笔蓖鼻比毕壁
+bian 扁鞭边蝙变
+biao 鳔膘标
+bie 鳖别
+bin 槟滨
+bing 冰饼丙并炳兵
+bo 菠薄波钵博卜
+bu 布不补部步
+cai 菜彩采材财
+can 蚕餐残
+cang 苍仓
+cao 草糙槽
+ce 侧策
+cha 茶查叉茬
+chai 柴豺
+chan 蝉蟾缠产
+chang 长肠常昌鲳菖尝
+chao 炒潮巢朝
+che 车
+chen 陈沉辰
+cheng 橙成城程澄蛏
+chi 翅豉赤池匙吃齿尺
+chong 虫冲
+chou 臭稠抽
+chu 出初楮除厨雏
+chuan 川穿串船传
+chui 锤垂
+chun 春椿莼纯醇鹑
+ci 茨慈刺瓷雌次
+cong 葱丛苁
+cu 醋粗
+cui 脆翠
+cun 村寸
+da 大打达答
+dai 带袋黛玳代
+dan 蛋丹淡单胆担
+dang 当党档
+dao 稻刀岛道
+deng 灯登
+di 地蒂笛滴底帝迪
+dian 点甸淀滇
+diao 鲷雕吊
+ding 丁顶鼎定
+dong 冬东冻洞
+dou 豆斗兜蔸
+du 杜独肚蠹毒渡
+duan 段短断
+dui 对堆
+dun 炖盾墩
+duo 朵多剁
+e 鹅额鳄莪俄
+er 耳儿二洱
+fa 发法乏
+fan 番饭繁蕃反
+fang 方芳房防坊舫
+fei 菲肥绯飞非榧
+fen 粉分芬焚
+feng 蜂风枫凤丰峰
+fo 佛
+fu 腐茯福芙麸覆腹釜浮蝠伏附富复夫
+gai 盖钙改
+gan 干甘柑橄肝杆赶感
+gang 岗钢缸港
+gao 糕高膏藁
+ge 鸽葛蛤哥格割阁革
+gen 根跟
+geng 羹庚耕
+gong 贡宫公工功
+gou 枸狗钩构
+gu 菇谷骨姑鼓古股顾固鸪菰
+gua 瓜刮挂
+guai 拐怪
+guan 冠罐关观管官灌
+guang 光广
+gui 桂龟鲑贵鬼归
+gun 滚棍
+guo 果锅国裹粿过
+ha 哈
+hai 海孩亥
+han 汉寒韩旱含汗
+hang 杭航
+hao 蚝蒿好豪号耗
+he 荷核禾河和鹤合盒
+hei 黑
+hong 红虹洪烘鸿宏
+hou 猴厚后鲎候
+hu 胡葫湖虎糊壶狐斛瑚护户乎
+hua 花华滑化画桦
+huai 怀槐淮
+huan 换环欢獾
+huang 黄皇鳇蝗凰
+hui 茴灰回徽烩会卉
+hun 馄荤混浑
+huo 火藿活或货
+ji 鸡姬鲫芨荠蕺吉极季积急脊基寄棘稷鲚
+jia 家加佳荚甲假夹嘉
+jian 尖煎剑碱茧坚间建箭鉴健检
+jiang 姜酱江豇僵浆疆
+jiao 椒角胶饺茭蕉娇脚焦交搅窖
+jie 芥结节介洁截姐接街秸蚧
+jin 金筋锦津堇紧近晋
+jing 京精井茎鲸晶粳经景静荆
+jiu 韭酒九久旧救灸
+ju 菊桔橘苣局巨居蒟举具聚
+juan 卷娟鹃
+jue 蕨决爵
+jun 菌君骏军
+ka 咖卡
+kai 开凯
+kan 砍看
+kang 糠康抗
+kao 烤考靠
+ke 可壳蝌颗客科克柯
+kong 空孔控
+kou 口扣蔻寇
+ku 苦枯库酷
+kua 夸跨
+kuai 块快筷脍
+kuan 宽款
+kuang 矿筐框
+kui 葵魁奎
+kun 昆坤鲲
+kuo 阔扩括
+la 辣腊蜡拉
+lai 莱来赖籁
+lan 蓝兰榄澜烂懒篮
+lang 狼郎浪琅
+lao 老酪捞劳涝醪
+le 勒乐
+lei 雷蕾类肋垒
+leng 冷棱
+li 梨李栗荔鲤藜粒力里利立丽蛎莉狸蜊理礼沥砺犁篱黎厘
+lian 莲连镰脸炼链鲢恋练
+liang 凉粮良梁量两亮辆粱
+liao 料蓼辽疗寥
+lie 列烈猎裂
+lin 林鳞淋磷临麟霖
+ling 菱灵苓羚玲零岭凌铃龄领翎鲮
+liu 榴柳流硫留六刘瘤
+long 龙笼隆垄珑聋
+lou 楼漏蒌
+lu 芦鹿卤露鲈炉路陆禄橹鸬卢庐
+lv 绿驴铝旅律虑
+luan 卵乱鸾峦
+lve 略
+lun 轮伦论
+luo 萝螺罗洛骆落裸锣箩
+ma 麻马蚂玛妈嘛蟆
+mai 麦卖埋买脉
+man 蔓鳗馒曼满慢漫蛮
+mang 芒忙莽盲
+mao 毛茅猫帽茂卯貌
+mei 梅玫莓美煤眉枚霉媒妹每镁
+men 门闷们
+meng 蒙萌猛檬孟梦锰
+mi 米蜜迷糜秘密觅弥咪
+mian 面棉绵免冕眠
+miao 苗秒妙庙
+mie 灭篾
+min 民敏闽皿鳘
+ming 明名茗鸣螟命
+mo 蘑墨磨魔末茉沫模摩膜莫馍
+mou 某牟
+mu 木牡母目苜穆幕沐牧亩姆
+na 纳拿那娜
+nai 奶乃耐柰萘
+nan 南难男楠
+nao 脑闹挠瑙
+nei 内
+nen 嫩
+neng 能
+ni 泥你尼拟逆腻妮
+nian 年粘鲶黏念碾
+niang 酿娘
+niao 鸟尿
+nie 捏聂镍
+ning 柠宁凝拧
+niu 牛纽扭钮
+nong 农浓脓弄
+nu 奴努怒
+nv 女
+nuan 暖
+nuo 糯诺挪
+ou 藕欧鸥偶
+pa 爬帕怕琶杷
+pai 排牌派
+pan 盘潘蟠攀判
+pang 胖螃旁庞
+pao 泡炮袍跑刨
+pei 培配佩陪赔
+pen 盆喷
+peng 蓬膨棚朋鹏澎
+pi 皮枇啤脾琵披劈疲屁匹蚍
+pian 片偏篇骗
+piao 漂飘瓢票
+pin 品频拼贫
+ping 苹平瓶萍评屏
+po 婆坡破珀泼魄
+pu 葡蒲浦普铺仆扑朴圃谱瀑
+qi 七期奇芪脐鳍漆齐骑棋旗杞起气汽器其琪祁蕲芑岐麒
+qia 恰掐
+qian 千芡前钱铅茜浅签谦迁潜牵欠
+qiang 枪腔强墙蔷羌呛
+qiao 荞桥乔巧翘敲俏鞘
+qie 茄切且窃
+qin 芹秦琴禽勤亲钦沁擒檎
+qing 青清轻情晴鲭请庆卿氢蜻
+qiong 琼穷穹
+qiu 秋球鳅蚯求丘囚
+qu 曲去取区渠驱趣蛆瞿麴
+quan 全泉拳犬权圈券
+que 雀缺确鹊却
+qun 裙群
+ran 然燃染冉
+rang 瓤让壤嚷
+rao 饶绕扰
+re 热
+ren 人仁任忍刃壬韧
+ri 日
+rong 茸蓉荣榕绒容融溶熔
+rou 肉柔揉
+ru 乳如儒入茹蠕汝
+ruan 软阮
+rui 蕊瑞锐芮
+run 润闰
+ruo 弱若蒻箬
+sa 萨撒洒
+sai 赛塞腮鳃
+san 三散伞叁糁
+sang 桑丧嗓
+sao 骚扫嫂臊
+se 色涩瑟
+sen 森
+sha 沙砂鲨杀纱莎傻
+shai 晒筛
+shan 山杉珊扇鳝膳衫善闪陕汕蟮芟
+shang 上商伤尚赏裳
+shao 烧勺少稍芍韶哨绍
+she 蛇舌麝社射设奢舍涉
+shen 参深神肾身申沈甚椹葚莘
+sheng 生升圣胜盛笙绳省牲声
+shi 石食柿莳十时实士市世师诗施湿狮虱使史事氏示式试室饰视拾鲥
+shou 手首寿瘦收守兽授售
+shu 薯蔬鼠黍菽叔书舒熟蜀树术束述数属署暑殊梳输疏
+shua 刷耍
+shuai 摔帅甩
+shuan 涮拴
+shuang 双霜爽
+shui 水睡税谁
+shun 顺瞬
+shuo 硕说朔
+si 丝四斯司私思寺死似嘶饲撕
+song 松宋送颂菘嵩
+sou 搜艘馊
+su 苏酥素粟速宿塑肃诉俗溯
+suan 酸蒜算
+sui 穗碎岁随髓隋遂燧
+sun 笋孙损榫
+suo 梭缩锁所索蓑
+ta 塔他她它獭踏挞鳎
+tai 台太泰苔胎抬汰肽钛
+tan 炭碳谈坛滩潭檀摊痰探叹贪毯坦
+tang 糖汤塘唐堂棠膛躺烫螳
+tao 桃陶涛淘逃萄套讨韬掏
+te 特
+teng 藤腾疼誊
+ti 提蹄梯体替题剔啼醍涕
+tian 甜天田填恬添舔钿
+tiao 条调跳挑眺
+tie 铁贴帖
+ting 亭庭停挺听廷艇
+tong 同铜桐童通筒桶茼统痛彤瞳
+tou 头投透偷
+tu 土兔图涂突途徒吐屠秃菟
+tuan 团湍
+tui 腿推退褪蜕
+tun 豚屯吞臀饨
+tuo 托脱驼鸵拖陀妥拓沱砣坨
+wa 蛙瓦挖娃袜洼
+wai 外歪
+wan 豌丸碗湾晚万弯玩完婉皖莞腕
+wang 王网往旺望忘汪亡
+wei 味胃尾维威微围苇韦卫魏未位唯伟委薇鲔为巍
+wen 文温蚊纹闻稳问吻
+weng 翁瓮蕹
+wo 窝莴蜗我卧沃握
+wu 五乌无吴梧武物雾芜蜈屋午舞务误悟坞鹜巫污伍戊
+xi 西溪犀稀锡习喜细席夕吸希息戏洗系膝熙曦蜥硒栖惜昔析袭隙禧玺徙晰嬉熹樨
+xia 虾夏下峡霞侠狭辖瞎匣暇
+xian 鲜咸苋仙先线县现限贤纤弦闲显险献馅腺蚬涎娴衔
+xiang 香湘相象橡乡箱享响想向项祥详翔巷镶
+xiao 小硝肖晓孝效校消销宵萧笑哮潇筱
+xie 蟹薤鞋协斜谢写歇泻邪胁携卸屑蝎械榭燮
+xin 心新辛薪欣信芯锌馨鑫忻昕
+xing 杏星腥行形兴醒幸性姓刑型邢荇猩
+xiong 熊胸雄兄凶芎
+xiu 秀绣锈修休羞袖嗅朽
+xu 须虚需许续絮蓄序叙畜旭徐墟胥绪
+xuan 萱宣悬选旋玄炫轩璇眩
+xue 雪血学穴薛鳕
+xun 蕈熏寻训迅巡询循鲟荀旬讯驯殉汛
+ya 鸭牙芽亚压雅崖哑鸦丫蚜涯衙讶押
+yan 盐燕烟岩言颜眼演艳宴延研沿炎焰雁咽腌鼹砚谚檐胭阎堰鄢彦芫
+yang 羊洋阳杨养样氧仰央秧鸯漾痒扬
+yao 药要腰摇瑶遥窑咬耀姚尧肴鳐邀谣钥
+ye 叶野椰夜业页液耶爷冶也
+yi 一衣医依薏疑移遗仪乙已以蚁椅亿义艺忆议异易益意翼溢姨宜怡彝贻饴胰翌逸毅裔亦抑役疫谊倚伊壹揖铱漪
+yin 银音阴因印引饮隐尹茵吟殷寅荫淫蚓
+ying 樱鹰英应营迎影硬映莹萤颖盈瑛缨婴鹦蝇
+yong 用永勇涌泳拥庸雍佣蛹甬
+you 油柚鱿有友右幼优尤由游邮犹悠忧酉莜又佑釉诱幽
+yu 鱼玉芋榆余雨语羽宇域育欲预遇御愈誉渔于予娱愉逾虞舆与屿禹浴郁狱峪毓豫蓣鹬鹆瑜竽昱煜钰寓裕驭喻愚隅渝俞萸
+yuan 圆元原园源远院愿猿缘员援苑冤渊鸳袁垣橼
+yue 月越粤悦阅岳跃约
+yun 云芸运韵孕晕允匀耘蕴陨
+za 杂砸
+zai 在再栽载灾宰
+zan 赞攒暂簪
+zang 脏藏葬
+zao 枣早藻灶皂造燥糟凿澡蚤
+ze 泽则责择
+zeng 增赠曾
+zha 炸渣扎榨闸眨诈栅蚱鲊札
+zhai 宅窄摘寨斋债
+zhan 战站展占詹斩盏毡湛蘸栈
+zhang 张章樟獐掌涨丈帐杖障彰璋蟑
+zhao 照找召兆赵罩爪沼昭招
+zhe 蔗这者折哲浙遮蛰蜇鹧赭
+zhen 针真珍榛贞枕阵震镇振诊臻甄斟箴
+zheng 蒸正整争征郑症政证筝睁峥狰
+zhi 芝枝汁脂纸指只直植止至志制质治智置致知支织稚痔蜘栀枳趾执值职掷炙挚
+zhong 中钟种重忠终肿仲众盅
+zhou 粥舟州周洲轴皱宙昼咒肘骤
+zhu 猪竹珠朱煮柱主助注住祝著筑逐铸蛛诸烛株茱苎箸
+zhua 抓
+zhuan 专砖转赚
+zhuang 庄装壮状撞桩妆
+zhui 追坠锥缀椎
+zhun 准
+zhuo 桌卓浊啄灼茁酌琢
+zi 紫子籽姿资自字孜梓滋兹咨仔
+zong 棕粽宗综总纵踪鬃
+zou 走奏揍邹
+zu 足组族祖租阻卒
+zuan 钻纂
+zui 最醉嘴罪
+zun 尊遵鳟
+zuo 做作坐左座昨佐柞
+"""
+
+PINYIN = {
+    char: syllable
+    for line in PINYIN_SYLLABLES.strip().splitlines()
+    for syllable, chars in [line.split()]
+    for char in chars
+}
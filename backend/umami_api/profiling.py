@@ -0,0 +1,195 @@
+"""On-demand sampling profiler for API requests.
+
+With ``PROFILING_OUTPUT_DIR`` set, ``ProfilingMiddleware`` profiles an
+``/api/`` request when it carries ``X-Umami-Profile: <PROFILING_TOKEN>`` or
+falls in the ``PROFILING_SAMPLE_RATE`` fraction. Otherwise the middleware
+removes itself at startup, so a disabled profiler costs nothing.
+
+A background thread samples the request thread's Python stack every
+``PROFILING_INTERVAL`` seconds of wall time, so time spent waiting on the
+database shows up under the view or serializer frame that issued the query,
+next to CPU time in Python. Each profile is written as speedscope JSON
+(open at https://www.speedscope.app) and as collapsed stacks for
+flamegraph.pl, with the request's metadata (route, normalised query, status,
+duration; no headers or search text).
+
+Profiles are written by a background thread after the response has been
+handed back, and only the newest ``PROFILING_MAX_FILES`` profiles are kept in
+the output directory, so a sample rate cannot fill the disk.
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .tokens import header_matches
+from .traffic_capture import normalize_query
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_UMAMI_PROFILE'
+PROFILED_PREFIX = '/api/'
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+PROFILE_SUFFIXES = ('.speedscope.json', '.collapsed')
+
+
+class StackSampler:
+    """Samples one thread's stack from a daemon thread until stopped"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.frames = {}  # (name, file, line) -> index
+        self.samples = []
+        self.weights = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _frame_index(self, code):
+        key = (getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno)
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_index(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()  # root first
+            self.samples.append(stack)
+            self.weights.append(now - last)
+            last = now
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+
+    def speedscope(self, name, metadata):
+        frames = [{'name': n, 'file': f, 'line': line} for n, f, line in self.frames]
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': name,
+            'exporter': 'umami_api.profiling',
+            'metadata': metadata,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.duration,
+                'samples': self.samples,
+                'weights': self.weights,
+            }],
+        }
+
+    def collapsed(self):
+        """flamegraph.pl input: ``root;...;leaf <microseconds>`` per distinct stack"""
+        names = [f'{n} ({os.path.basename(f)}:{line})' for n, f, line in self.frames]
+        totals = {}
+        for stack, weight in zip(self.samples, self.weights):
+            key = ';'.join(names[index] for index in stack)
+            totals[key] = totals.get(key, 0) + weight
+        return ''.join(f'{stack} {round(seconds * 1e6)}\n' for stack, seconds in totals.items())
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.output_dir = getattr(settings, 'PROFILING_OUTPUT_DIR', '')
+        if not self.output_dir:
+            raise MiddlewareNotUsed
+        self.token = getattr(settings, 'PROFILING_TOKEN', '')
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.interval = getattr(settings, 'PROFILING_INTERVAL', 0.005)
+        self.max_files = getattr(settings, 'PROFILING_MAX_FILES', 200)
+        self.get_response = get_response
+        self._write_lock = threading.Lock()
+
+    def _trigger(self, request):
+        if not request.path.startswith(PROFILED_PREFIX):
+            return None
+        if header_matches(request.META.get(PROFILE_HEADER), self.token):
+            return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+
+        route = getattr(request.resolver_match, 'url_name', None) or 'unresolved'
+        name = f'{request.method} {route} {sampler.duration * 1000:.0f}ms'
+        metadata = {
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'query': normalize_query(request.GET),
+            'status': response.status_code,
+            'duration_ms': round(sampler.duration * 1000, 2),
+            'samples': len(sampler.samples),
+            'interval_s': self.interval,
+            'trigger': trigger,
+            'pid': os.getpid(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{uuid.uuid4().hex[:8]}"
+        threading.Thread(target=self._write, args=(sampler, stem, name, metadata), daemon=True).start()
+
+        if trigger == 'header':
+            response['X-Umami-Profile-File'] = f'{stem}.speedscope.json'
+        return response
+
+    def _write(self, sampler, stem, name, metadata):
+        try:
+            # One writer at a time per worker keeps pruning consistent
+            with self._write_lock:
+                os.makedirs(self.output_dir, exist_ok=True)
+                with open(os.path.join(self.output_dir, f'{stem}.speedscope.json'), 'w') as handle:
+                    json.dump(sampler.speedscope(name, metadata), handle)
+                with open(os.path.join(self.output_dir, f'{stem}.collapsed'), 'w') as handle:
+                    handle.write(sampler.collapsed())
+                self._prune()
+        except Exception:
+            logger.exception('Writing profile %s failed', stem)
+
+    def _prune(self):
+        """Delete all but the newest ``max_files`` profiles (both files of each)"""
+        profiles = sorted(
+            (entry for entry in os.scandir(self.output_dir) if entry.name.endswith(PROFILE_SUFFIXES[0])),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+        for entry in profiles[self.max_files:]:
+            stem = entry.path[:-len(PROFILE_SUFFIXES[0])]
+            for suffix in PROFILE_SUFFIXES:
+                try:
+                    os.remove(stem + suffix)
+                except FileNotFoundError:
+                    pass
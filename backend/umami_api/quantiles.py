@@ -0,0 +1,129 @@
+"""Data-driven level cut points from the precomputed quantile table.
+
+``build_quantiles`` stores p10-p99 of each chemistry metric, globally and
+per category, in ``ChemistryQuantile``. Workers hold the table in memory
+(refreshed every ``QUANTILE_TABLE_TTL`` seconds) and every level consumer
+reads the same cut points from it:
+
+- level 0-6: 0 is level 0, then the upper bounds of levels 1-5 are
+  p25/p50/p75/p90/p95 (``level_cuts``), as in frontend umamiLevels6.ts
+- "High" (umami[] filters and the high_umami flavor role): value >= p90
+
+Per-category cut points apply where a single category is in context: the
+umami[] filter when exactly one category[] is selected, and the frontend's
+level bars for such a result list. Everything else (flavor roles, level
+columns, compositions) uses the global cut points.
+
+Until the table is built the former hard-coded cut points apply.
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+
+QUANTILE_METRICS = ('umami_aa', 'umami_nuc', 'umami_synergy')
+QUANTILE_PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+LEVEL_PERCENTILES = (25, 50, 75, 90, 95)
+HIGH_PERCENTILE = 90
+
+# Categories with fewer non-zero values than this use the global cut points
+MIN_CATEGORY_SAMPLE = 20
+
+# Cut points used before the first build (the former hard-coded levels)
+DEFAULT_QUANTILES = {
+    'umami_aa': {'p25': 13.0, 'p50': 50.0, 'p75': 260.0, 'p90': 740.0, 'p95': 1330.0},
+    'umami_nuc': {'p25': 15.0, 'p50': 75.0, 'p75': 290.0, 'p90': 650.0, 'p95': 870.0},
+    'umami_synergy': {'p25': 16.0, 'p50': 76.0, 'p75': 400.0, 'p90': 1900.0, 'p95': 11800.0},
+}
+
+_table = None
+
+
+def compute_quantiles(values):
+    """``{'p10': ..., 'p99': ...}`` over the non-zero ``values``, or None if there are none"""
+    values = np.asarray(values, dtype=float)
+    positive = values[values > 0]
+    if not len(positive):
+        return None
+    cuts = np.percentile(positive, QUANTILE_PERCENTILES)
+    return {f'p{p}': round(float(cut), 3) for p, cut in zip(QUANTILE_PERCENTILES, cuts)}
+
+
+def umami_level(value, cuts):
+    """Level 0-6 of ``value`` given the upper bounds of levels 1-5"""
+    if not value:
+        return 0
+    return 1 + sum(1 for cut in cuts if value > cut)
+
+
+class QuantileTable:
+    """In-memory copy of ChemistryQuantile keyed by (metric, category)"""
+
+    def __init__(self, rows):
+        self.quantiles = {(metric, category): quantiles for metric, category, quantiles in rows}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        from .models import ChemistryQuantile
+
+        return cls(ChemistryQuantile.objects.values_list('metric', 'category', 'quantiles'))
+
+    def get(self, metric, category=None):
+        """Quantiles for ``metric`` in ``category``, falling back to global, then defaults"""
+        if category is not None and (metric, category) in self.quantiles:
+            return self.quantiles[(metric, category)]
+        return self.quantiles.get((metric, None)) or DEFAULT_QUANTILES[metric]
+
+    def level_cuts(self, metric, category=None):
+        quantiles = self.get(metric, category)
+        return tuple(quantiles[f'p{p}'] for p in LEVEL_PERCENTILES)
+
+    def high_threshold(self, metric, category=None):
+        return self.get(metric, category)[f'p{HIGH_PERCENTILE}']
+
+    def category_level_cuts(self):
+        """``{metric: {category: level cuts}}`` for categories with their own quantiles"""
+        return {
+            metric: {
+                category: list(self.level_cuts(metric, category))
+                for (row_metric, category) in sorted(self.quantiles, key=lambda key: key[1] or '')
+                if row_metric == metric and category is not None
+            }
+            for metric in QUANTILE_METRICS
+        }
+
+    def high_umami_thresholds(self):
+        return {metric: self.high_threshold(metric) for metric in QUANTILE_METRICS}
+
+    def as_dict(self):
+        """Global and per-category quantiles plus level cuts, for API clients"""
+        categories = sorted({category for _, category in self.quantiles if category is not None})
+        category_cuts = self.category_level_cuts()
+        return {
+            metric: {
+                'quantiles': self.get(metric),
+                'level_cuts': list(self.level_cuts(metric)),
+                'high_threshold': self.high_threshold(metric),
+                'by_category': {
+                    category: self.quantiles[(metric, category)]
+                    for category in categories if (metric, category) in self.quantiles
+                },
+                'level_cuts_by_category': category_cuts[metric],
+            }
+            for metric in QUANTILE_METRICS
+        }
+
+
+def get_quantile_table():
+    """Per-process table, reloaded after ``QUANTILE_TABLE_TTL`` seconds"""
+    global _table
+    ttl = getattr(settings, 'QUANTILE_TABLE_TTL', 300)
+    if _table is None or time.monotonic() - _table.built_at > ttl:
+        _table = QuantileTable.build()
+    return _table
+
+
+def reset_quantile_table():
+    global _table
+    _table = None
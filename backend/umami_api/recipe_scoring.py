@@ -0,0 +1,83 @@
+"""Scoring of saved recipes against current ingredient chemistry.
+
+``prepare_recipe`` turns a recipe's items into plain (grams, chemistry)
+tuples plus a fingerprint of those inputs, and ``score_chunk`` scores a
+chunk of prepared recipes with the vectorised kernel. ``score_chunk`` takes
+and returns only plain data so it can run in worker processes.
+"""
+import hashlib
+import json
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .composition import COMPOUNDS, convert_to_grams, score_compositions
+from .models import Chemistry
+
+SCORE_FIELDS = ('total_weight', 'total_aa', 'total_nuc', 'total_synergy', 'pui')
+
+
+def load_chemistry(ingredient_ids):
+    """Map ingredient id -> tuple of compound values (mg/100g) as strings"""
+    return {
+        row[0]: tuple(str(value) for value in row[1:])
+        for row in Chemistry.objects.filter(ingredient_id__in=ingredient_ids)
+        .values_list('ingredient_id', *COMPOUNDS)
+    }
+
+
+def prepare_recipe(items, chemistry_by_id):
+    """Return ``(lines, fingerprint, missing_ids)`` for a recipe's items"""
+    lines = []
+    fingerprint_input = []
+    missing = []
+    for item in items:
+        ingredient_id = item.get('ingredient_id')
+        chemistry = chemistry_by_id.get(ingredient_id)
+        if chemistry is None:
+            missing.append(ingredient_id)
+            continue
+        grams = convert_to_grams(float(item.get('quantity', 0)), item.get('unit', 'g'))
+        lines.append((grams, tuple(float(value) for value in chemistry)))
+        fingerprint_input.append([ingredient_id, str(item.get('quantity')), item.get('unit'), chemistry])
+
+    digest = hashlib.sha256(json.dumps(fingerprint_input, sort_keys=True).encode()).hexdigest()
+    return lines, digest, missing
+
+
+def score_chunk(chunk):
+    """Score ``[(recipe_id, lines), ...]`` and return ``[(recipe_id, scores), ...]``"""
+    recipe_index, grams, chemistry = [], [], []
+    for position, (_, lines) in enumerate(chunk):
+        for line_grams, line_chemistry in lines:
+            recipe_index.append(position)
+            grams.append(line_grams)
+            chemistry.append(line_chemistry)
+
+    scores = score_compositions(recipe_index, grams, chemistry, len(chunk))
+    return [
+        (recipe_id, {field: float(scores[field][position]) for field in SCORE_FIELDS})
+        for position, (recipe_id, _) in enumerate(chunk)
+    ]
+
+
+def score_values(scores, fingerprint):
+    """SavedRecipe field values for float scores and their fingerprint"""
+    values = {field: Decimal(str(round(scores[field], 3))) for field in SCORE_FIELDS}
+    values['chemistry_fingerprint'] = fingerprint
+    values['scored_at'] = timezone.now()
+    return values
+
+
+def apply_scores(recipe, scores, fingerprint):
+    """Copy float scores onto a SavedRecipe instance (without saving)"""
+    for field, value in score_values(scores, fingerprint).items():
+        setattr(recipe, field, value)
+
+
+def score_items(items):
+    """SavedRecipe field values scoring ``items`` in-process, e.g. before an API save"""
+    ingredient_ids = {item.get('ingredient_id') for item in items}
+    lines, fingerprint, _ = prepare_recipe(items, load_chemistry(ingredient_ids))
+    [(_, scores)] = score_chunk([(None, lines)])
+    return score_values(scores, fingerprint)
@@ -0,0 +1,69 @@
+"""Toneless pinyin search keys for Chinese aliases.
+
+``romanize('香菇')`` gives ``'xianggu'``: the syllables of every CJK
+character run together, lowercase, with ü as ``v``. Readings come from
+pypinyin when it is installed and otherwise from the bundled table in
+``pinyin_table.py``; characters neither knows are skipped. Keys are stored
+on ``Alias.romanized`` when an alias is saved and by ``romanize_aliases``.
+"""
+import re
+import unicodedata
+
+from .cjk_search import CJK_RUN
+from .pinyin_table import PINYIN
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+MIN_QUERY_LENGTH = 2
+
+# Queries that can be pinyin: latin letters, spaces, apostrophes, hyphens
+_PINYIN_QUERY = re.compile(r"^[a-z' \-]+$")
+
+# Syllables a stored key can be made of; a query must split into these
+SYLLABLES = frozenset(PINYIN.values())
+_MAX_SYLLABLE = max(map(len, SYLLABLES))
+
+
+def _syllables(run):
+    if lazy_pinyin is not None:
+        return [syllable for syllable in lazy_pinyin(run) if syllable.isascii() and syllable.isalpha()]
+    return [PINYIN[char] for char in run if char in PINYIN]
+
+
+def is_pinyin(key):
+    """Whether ``key`` splits into pinyin syllables (a trailing partial syllable is allowed)"""
+    reachable = [True] + [False] * len(key)
+    for end in range(1, len(key) + 1):
+        reachable[end] = any(
+            reachable[start] and key[start:end] in SYLLABLES
+            for start in range(max(0, end - _MAX_SYLLABLE), end)
+        )
+    # A prefix search may stop mid-syllable ("xiangg"): accept if the tail starts a syllable
+    return any(
+        reachable[start] and any(syllable.startswith(key[start:]) for syllable in SYLLABLES)
+        for start in range(max(0, len(key) - _MAX_SYLLABLE), len(key) + 1)
+    )
+
+
+def romanize(text):
+    """Search key for the Chinese characters in ``text`` ('' if there are none)"""
+    return ''.join(syllable for run in CJK_RUN.findall(text or '') for syllable in _syllables(run)).lower()
+
+
+def romanized_query(query):
+    """``query`` normalised like a stored key, or '' if it cannot be pinyin.
+
+    Tone marks are dropped (xiānggū -> xianggu) and separators removed
+    (xiang gu, xi'an), so typed pinyin compares directly with ``romanize``.
+    Queries that do not split into pinyin syllables give ''.
+    """
+    text = unicodedata.normalize('NFD', (query or '').strip().lower()).replace('u\u0308', 'v')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    if not _PINYIN_QUERY.match(text):
+        return ''
+    key = re.sub(r"[' \-]", '', text)
+    # English words that are not syllable sequences ("tomato", "miso") skip pinyin matching
+    return key if len(key) >= MIN_QUERY_LENGTH and is_pinyin(key) else ''
@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Ingredient, Alias, Chemistry, TCM, Flags
+from .models import Ingredient, Alias, Chemistry, TCM, Flags, Pairing, SavedRecipe
+from .hot_queries import COMPLEMENTARY_AA_SQL, COMPLEMENTARY_NUC_SQL
+from .composition import convert_to_grams
 
 
 class AliasSerializer(serializers.ModelSerializer):
@@ -26,6 +28,22 @@ class FlagsSerializer(serializers.ModelSerializer):
         fields = ['allergens', 'dietary_restrictions', 'umami_tags', 'flavor_tags']
 
 
+class PairingSerializer(serializers.ModelSerializer):
+    """Serializer for precomputed two-ingredient pairings"""
+    ingredient_name = serializers.SerializerMethodField()
+    partner_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Pairing
+        fields = ['rank', 'ingredient', 'ingredient_name', 'partner', 'partner_name', 'ratio', 'euc']
+
+    def get_ingredient_name(self, obj):
+        return obj.ingredient.display_name or obj.ingredient.base_name
+
+    def get_partner_name(self, obj):
+        return obj.partner.display_name or obj.partner.base_name
+
+
 class IngredientListSerializer(serializers.ModelSerializer):
     """Serializer for ingredient list view with essential data"""
     chemistry = ChemistrySerializer(read_only=True)
@@ -84,7 +102,7 @@ class IngredientDetailSerializer(serializers.ModelSerializer):
 
     def get_complementary(self, obj):
         """Get complementary ingredients (high AA with high Nuc, TCM balance)"""
-        from django.db import connection
+        from django.db import connections, router
         
         # Simple complementary logic: if this ingredient is high AA, find high Nuc
         # and vice versa, with some TCM balance considerations
@@ -93,33 +111,14 @@ class IngredientDetailSerializer(serializers.ModelSerializer):
             
         chemistry = obj.chemistry
         
-        with connection.cursor() as cursor:
+        # Raw SQL follows the same read routing as the ORM (replica or primary)
+        with connections[router.db_for_read(Ingredient)].cursor() as cursor:
             if chemistry.umami_aa > chemistry.umami_nuc:
                 # This is AA-heavy, find Nuc-heavy
-                cursor.execute("""
-                    SELECT i2.id, i2.base_name, i2.display_name,
-                           c2.umami_nuc, c2.umami_synergy
-                    FROM ingredient i2
-                    JOIN chemistry c2 ON i2.id = c2.ingredient_id
-                    WHERE i2.id != %s 
-                      AND c2.umami_nuc > c2.umami_aa
-                      AND c2.umami_nuc > 0
-                    ORDER BY c2.umami_nuc DESC, c2.umami_synergy DESC
-                    LIMIT 5
-                """, [obj.id])
+                cursor.execute(COMPLEMENTARY_NUC_SQL, [obj.id])
             else:
                 # This is Nuc-heavy or balanced, find AA-heavy
-                cursor.execute("""
-                    SELECT i2.id, i2.base_name, i2.display_name,
-                           c2.umami_aa, c2.umami_synergy
-                    FROM ingredient i2
-                    JOIN chemistry c2 ON i2.id = c2.ingredient_id
-                    WHERE i2.id != %s 
-                      AND c2.umami_aa > c2.umami_nuc
-                      AND c2.umami_aa > 0
-                    ORDER BY c2.umami_aa DESC, c2.umami_synergy DESC
-                    LIMIT 5
-                """, [obj.id])
+                cursor.execute(COMPLEMENTARY_AA_SQL, [obj.id])
             
             results = []
             for row in cursor.fetchall():
@@ -140,19 +139,120 @@ class CompositionIngredientSerializer(serializers.Serializer):
     unit = serializers.CharField(max_length=10)
 
 
+class CompositionDeltaSerializer(serializers.Serializer):
+    """Serializer for a single composition session delta operation"""
+    OPS = ('add', 'remove', 'update')
+
+    op = serializers.ChoiceField(choices=OPS)
+    ingredient_id = serializers.IntegerField()
+    quantity = serializers.DecimalField(max_digits=8, decimal_places=3, required=False)
+    unit = serializers.CharField(max_length=10, required=False, default='g')
+
+    def validate(self, attrs):
+        if attrs['op'] in ('add', 'update') and 'quantity' not in attrs:
+            raise serializers.ValidationError({'quantity': f"This field is required for '{attrs['op']}'."})
+        return attrs
+
+
 class CompositionResultSerializer(serializers.Serializer):
-    """Serializer for composition calculation results"""
-    total_aa = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_nuc = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_synergy = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_glu = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_asp = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_imp = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_gmp = serializers.DecimalField(max_digits=10, decimal_places=3)
-    total_amp = serializers.DecimalField(max_digits=10, decimal_places=3)
+    """Serializer for composition calculation results
+
+    Totals are JSON numbers (not DRF's default Decimal strings) so both
+    compose_preview precisions share one schema.
+    """
+    total_aa = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_nuc = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_synergy = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_glu = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_asp = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_imp = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_gmp = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
+    total_amp = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False)
     pui = serializers.FloatField(required=False, allow_null=True)
     aa_nuc_ratio = serializers.FloatField(required=False, allow_null=True)
     synergy_zone = serializers.CharField(required=False, allow_null=True)
     synergy_suggestion = serializers.CharField(required=False, allow_null=True)
     ingredients = serializers.ListField()
     chart_data = serializers.DictField()
+
+
+class RoundedFloatField(serializers.FloatField):
+    """Float output rounded to a fixed number of decimal places"""
+
+    def __init__(self, decimal_places, **kwargs):
+        self.decimal_places = decimal_places
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return round(float(value), self.decimal_places)
+
+
+class FloatCompositionResultSerializer(CompositionResultSerializer):
+    """``CompositionResultSerializer`` for float64 results, without Decimal round-trips.
+
+    Totals are rounded to the same 3 decimal places the Decimal fields display.
+    """
+    total_aa = RoundedFloatField(decimal_places=3)
+    total_nuc = RoundedFloatField(decimal_places=3)
+    total_synergy = RoundedFloatField(decimal_places=3)
+    total_glu = RoundedFloatField(decimal_places=3)
+    total_asp = RoundedFloatField(decimal_places=3)
+    total_imp = RoundedFloatField(decimal_places=3)
+    total_gmp = RoundedFloatField(decimal_places=3)
+    total_amp = RoundedFloatField(decimal_places=3)
+
+
+class CompositionAnalysisSerializer(serializers.Serializer):
+    """Serializer for per-ingredient composition sensitivity results"""
+    total_weight = serializers.FloatField()
+    total_synergy = serializers.FloatField()
+    pui = serializers.FloatField()
+    items = serializers.ListField()
+
+
+# Keep total_weight (numeric(10,3), < 10,000 kg) in range: at most
+# MAX_RECIPE_ITEMS items of up to MAX_RECIPE_ITEM_GRAMS each
+MAX_RECIPE_ITEMS = 100
+MAX_RECIPE_ITEM_GRAMS = 50_000
+
+
+class SavedRecipeSerializer(serializers.ModelSerializer):
+    """Serializer for saved recipes; scores are computed on save"""
+    items = CompositionIngredientSerializer(many=True)
+
+    class Meta:
+        model = SavedRecipe
+        fields = [
+            'id', 'name', 'items',
+            'total_weight', 'total_aa', 'total_nuc', 'total_synergy', 'pui',
+            'scored_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'total_weight', 'total_aa', 'total_nuc', 'total_synergy', 'pui',
+            'scored_at', 'created_at', 'updated_at'
+        ]
+
+    def validate_items(self, items):
+        if len(items) > MAX_RECIPE_ITEMS:
+            raise serializers.ValidationError(f'A recipe can have at most {MAX_RECIPE_ITEMS} items.')
+        for item in items:
+            grams = convert_to_grams(float(item['quantity']), item['unit'])
+            if not 0 <= grams <= MAX_RECIPE_ITEM_GRAMS:
+                raise serializers.ValidationError(
+                    f"Quantity of ingredient {item['ingredient_id']} must be between 0 and {MAX_RECIPE_ITEM_GRAMS} g."
+                )
+        # Stored as JSON, so keep quantities as plain floats
+        return [
+            {'ingredient_id': item['ingredient_id'], 'quantity': float(item['quantity']), 'unit': item['unit']}
+            for item in items
+        ]
+
+    # items is a nested serializer stored as a JSON column, which ModelSerializer won't write itself
+    def create(self, validated_data):
+        return SavedRecipe.objects.create(**validated_data)
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save()
+        return instance
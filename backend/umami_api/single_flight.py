@@ -0,0 +1,125 @@
+"""Cached API computations with single-flight recomputation.
+
+List pages, histogram facets and detail payloads are cached in the Django
+cache (Redis) for ``RESPONSE_CACHE_TTL`` seconds and kept ``RESPONSE_CACHE_STALE_TTL``
+seconds longer as a stale copy. When an entry goes stale or missing, the
+first worker to take the entry's lease (an atomic ``cache.add``, i.e. Redis
+``SET NX`` with an expiry) recomputes it. Meanwhile the other workers either
+serve the stale copy or, if there is none, poll for up to
+``RESPONSE_CACHE_WAIT`` seconds for the leaseholder's result. Only if that
+result does not arrive in time do they compute it themselves.
+
+Outcomes are counted per computation in the cache so every worker reports
+into the same counters (``cache_metrics``, ``report_cache_metrics``; also
+exported to Prometheus as ``umami_api_response_cache_total``):
+``hit``, ``miss`` (computed, nothing cached), ``refresh`` (recomputed a stale
+entry), ``stale`` and ``waited`` (coalesced onto another worker's
+computation) and ``wait_timeout``.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import record_cache_event
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'single_flight:'
+METRIC_EVENTS = ('hit', 'miss', 'refresh', 'stale', 'waited', 'wait_timeout')
+COALESCED_EVENTS = ('stale', 'waited')
+COMPUTATIONS = ('list', 'histograms', 'detail')
+WAIT_POLL_INTERVAL = 0.05
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def request_key(request):
+    """Cache key part for a GET request: host, path and order-insensitive query"""
+    query = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    raw = f'{request.get_host()}{request.path}?{query}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _cache_call(method, *args, default=None):
+    # The cache is an optimisation; a Redis outage must not fail the request
+    try:
+        return getattr(cache, method)(*args)
+    except Exception as exc:
+        logger.warning('single-flight cache %s failed: %s', method, exc)
+        return default
+
+
+def _count(name, event):
+    record_cache_event(name, event)
+    key = f'{CACHE_PREFIX}metrics:{name}:{event}'
+    _cache_call('add', key, 0, None)
+    _cache_call('incr', key)
+
+
+def coalesced(name, key, compute):
+    """``compute()``'s value for ``key``, recomputed by at most one worker at a time"""
+    ttl = _setting('RESPONSE_CACHE_TTL', 60)
+    if ttl <= 0:
+        return compute()
+
+    cache_key = f'{CACHE_PREFIX}{name}:{key}'
+    entry = _cache_call('get', cache_key)
+    if entry is not None and entry[1] > time.time():
+        _count(name, 'hit')
+        return entry[0]
+
+    lease_key = f'{cache_key}:lease'
+    token = uuid.uuid4().hex
+    if _cache_call('add', lease_key, token, _setting('RESPONSE_CACHE_LEASE', 30), default=True):
+        try:
+            value = compute()
+            _cache_call(
+                'set', cache_key, (value, time.time() + ttl),
+                ttl + _setting('RESPONSE_CACHE_STALE_TTL', 600),
+            )
+        finally:
+            # Only release our own lease; an expired one may belong to another worker now
+            if _cache_call('get', lease_key) == token:
+                _cache_call('delete', lease_key)
+        _count(name, 'refresh' if entry is not None else 'miss')
+        return value
+
+    if entry is not None:
+        _count(name, 'stale')
+        return entry[0]
+
+    deadline = time.monotonic() + _setting('RESPONSE_CACHE_WAIT', 2.0)
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_INTERVAL)
+        entry = _cache_call('get', cache_key)
+        if entry is not None:
+            _count(name, 'waited')
+            return entry[0]
+    _count(name, 'wait_timeout')
+    return compute()
+
+
+def cache_metrics():
+    """``{computation: {event: count}}`` across all workers"""
+    keys = {
+        f'{CACHE_PREFIX}metrics:{name}:{event}': (name, event)
+        for name in COMPUTATIONS for event in METRIC_EVENTS
+    }
+    values = _cache_call('get_many', list(keys), default={})
+    metrics = {name: dict.fromkeys(METRIC_EVENTS, 0) for name in COMPUTATIONS}
+    for key, count in values.items():
+        name, event = keys[key]
+        metrics[name][event] = count
+    return metrics
+
+
+def reset_cache_metrics():
+    _cache_call('delete_many', [
+        f'{CACHE_PREFIX}metrics:{name}:{event}' for name in COMPUTATIONS for event in METRIC_EVENTS
+    ])
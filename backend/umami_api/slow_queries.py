@@ -0,0 +1,200 @@
+"""Slow query log with automatic EXPLAIN capture.
+
+``SlowQueryMiddleware`` times every SQL statement an ``/api/`` request
+issues. Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are recorded as
+``SlowQuery`` rows with their parameters, the request's route and
+``canonical_filter_key``, and a plan: ``EXPLAIN (ANALYZE, BUFFERS)`` for
+SELECTs, plain ``EXPLAIN`` for anything else (ANALYZE would execute the
+write again). Inspect them with ``manage.py slow_queries``.
+
+Plans are captured after the response has been built, in a background
+thread on its own connection to the same database, inside a rolled-back
+transaction bounded by ``SLOW_QUERY_EXPLAIN_TIMEOUT_MS``. Re-running a slow
+query is itself expensive, so capture is rate-limited twice: a statement
+template is captured at most once per ``SLOW_QUERY_DEDUP_SECONDS`` across
+all workers (an atomic ``cache.add``), and each worker captures at most
+``SLOW_QUERY_MAX_PER_MINUTE`` statements per minute.
+
+Free-text search is kept out of the log as it is out of traffic captures:
+the stored filter key has ``q`` replaced by its ``<q:script:length>``
+placeholder, and stored parameters carrying the search text (the trigram
+and LIKE arguments) are masked the same way. EXPLAIN still runs with the
+real parameters; only what is stored is masked.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, transaction
+
+from .filter_compiler import MAX_QUERY_LENGTH, canonical_filter_key
+from .romanize import romanized_query
+from .traffic_capture import FREE_TEXT_PARAMS, search_placeholder
+
+logger = logging.getLogger(__name__)
+
+CAPTURED_PREFIX = '/api/'
+CACHE_PREFIX = 'slow_query:'
+
+
+def sql_fingerprint(alias, sql):
+    """Stable key of a statement template (Django SQL keeps parameters as ``%s``)"""
+    return hashlib.sha1(f'{alias}:{" ".join(sql.split())}'.encode()).hexdigest()
+
+
+def search_terms(params):
+    """Lower-cased search text of a request, as it can appear in statement parameters"""
+    terms = set()
+    for key in FREE_TEXT_PARAMS:
+        for value in params.getlist(key):
+            value = value[:MAX_QUERY_LENGTH].strip()
+            if value:
+                terms.add(value.lower())
+                terms.add(romanized_query(value))
+    terms.discard('')
+    return terms
+
+
+def masked_filter_key(params):
+    """``canonical_filter_key`` with free-text values replaced by placeholders"""
+    params = params.copy()
+    for key in FREE_TEXT_PARAMS:
+        params.setlist(key, [search_placeholder(value) for value in params.getlist(key) if value.strip()])
+    return canonical_filter_key(params)
+
+
+def mask_search_params(params, terms):
+    """Statement parameters with every string containing a search term masked"""
+    def mask(value):
+        if not isinstance(value, str):
+            return value
+        # LIKE arguments carry % wildcards and backslash escapes around the text
+        text = value.replace('\\', '')
+        if any(term in text.lower() for term in terms):
+            return search_placeholder(text.strip('%'))
+        return value
+
+    if not terms or params is None:
+        return params
+    if isinstance(params, dict):
+        return {key: mask(value) for key, value in params.items()}
+    return [mask(value) for value in params]
+
+
+def _json_params(params):
+    # Round-trip through JSON so dates, decimals and UUIDs are stored as strings
+    if params is None:
+        return []
+    return json.loads(json.dumps(list(params) if isinstance(params, (list, tuple)) else params, default=str))
+
+
+def explain(alias, sql, params, timeout_ms):
+    """``(plan, error)`` for ``sql`` on database ``alias``; nothing it runs is committed"""
+    analyze = sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+    prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+    try:
+        with transaction.atomic(using=alias):
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f'SET LOCAL statement_timeout = {int(timeout_ms)}')
+                cursor.execute(prefix + sql, params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            transaction.set_rollback(True, using=alias)
+        return plan, ''
+    except Exception as exc:
+        return '', f'{type(exc).__name__}: {exc}'.strip()
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 1000) / 1000
+        if self.threshold <= 0:
+            raise MiddlewareNotUsed
+        self.dedup_seconds = getattr(settings, 'SLOW_QUERY_DEDUP_SECONDS', 300)
+        self.max_per_minute = getattr(settings, 'SLOW_QUERY_MAX_PER_MINUTE', 5)
+        self.explain_timeout_ms = getattr(settings, 'SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 30000)
+        self.get_response = get_response
+        self._lock = threading.Lock()
+        self._window = (0, 0)  # (minute, captures in it)
+
+    def _take_slot(self, alias, sql):
+        # Reserve this worker's slot before claiming the shared dedup key: a key
+        # claimed by a capped worker would suppress the statement everywhere
+        minute = int(time.time() // 60)
+        with self._lock:
+            window, used = self._window
+            used = used + 1 if window == minute else 1
+            if used > self.max_per_minute:
+                return False
+            self._window = (minute, used)
+        key = f'{CACHE_PREFIX}{sql_fingerprint(alias, sql)}'
+        try:
+            if cache.add(key, 1, self.dedup_seconds):
+                return True
+        except Exception as exc:
+            # Without the shared cache only the per-worker cap applies
+            logger.warning('slow query dedup cache failed: %s', exc)
+            return True
+        # Another worker captured it recently; give the slot back
+        with self._lock:
+            window, used = self._window
+            if window == minute:
+                self._window = (minute, used - 1)
+        return False
+
+    def __call__(self, request):
+        if not request.path.startswith(CAPTURED_PREFIX):
+            return self.get_response(request)
+
+        slow = []
+
+        def time_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                elapsed = time.perf_counter() - started
+                if elapsed >= self.threshold and not many:
+                    slow.append((context['connection'].alias, sql, params, elapsed))
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(time_query))
+            response = self.get_response(request)
+
+        captures = [query for query in slow if self._take_slot(query[0], query[1])]
+        if captures:
+            route = getattr(request.resolver_match, 'url_name', None) or 'unresolved'
+            threading.Thread(
+                target=self._record,
+                args=(captures, route, masked_filter_key(request.GET), search_terms(request.GET)),
+                daemon=True,
+            ).start()
+        return response
+
+    def _record(self, captures, route, filter_key, terms):
+        from .models import SlowQuery
+
+        try:
+            for alias, sql, params, elapsed in captures:
+                plan, error = explain(alias, sql, params, self.explain_timeout_ms)
+                SlowQuery.objects.create(
+                    sql=sql,
+                    params=_json_params(mask_search_params(params, terms)),
+                    duration_ms=round(elapsed * 1000, 2),
+                    database=alias,
+                    route=route,
+                    filter_key=filter_key,
+                    plan=plan,
+                    plan_error=error,
+                )
+                logger.warning('Slow query (%.0f ms) on %s [%s]', elapsed * 1000, route, filter_key)
+        except Exception:
+            logger.exception('Recording slow queries failed')
+        finally:
+            connections.close_all()
@@ -0,0 +1,160 @@
+"""The float64 compose path agrees with the Decimal reference to the displayed precision"""
+import json
+import random
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from umami_api.composition import (
+    COMPOUNDS,
+    build_composition_result,
+    build_composition_result_float,
+    build_line_item,
+    build_line_item_float,
+    serialize_line_item,
+)
+from umami_api.serializers import CompositionResultSerializer, FloatCompositionResultSerializer
+
+DISPLAYED_PLACES = 3
+SERIALIZED_TOTALS = ('total_aa', 'total_nuc', 'total_synergy', 'total_glu', 'total_asp', 'total_imp', 'total_gmp', 'total_amp')
+# Largest random quantity per unit, so totals stay within the reference serializer's 10 digits
+MAX_QUANTITY = {'g': 2000, 'oz': 70, 'tsp': 400, 'tbsp': 130, 'cup': 8}
+UNITS = tuple(MAX_QUANTITY)
+
+
+# Upper end of the catalog's mg/100g values per compound
+MAX_CHEMISTRY = {'glu': 3000, 'asp': 1000, 'imp': 800, 'gmp': 400, 'amp': 400}
+
+
+def random_chemistry(rng, zero=()):
+    # Stored chemistry has 3 decimal places; mix trace amounts with values up to the catalog maximum
+    return {
+        compound: 0.0 if compound in zero else round(rng.choice((rng.uniform(0, 5), rng.uniform(0, MAX_CHEMISTRY[compound]))), 3)
+        for compound in COMPOUNDS
+    }
+
+
+def compose(items):
+    """``(decimal_result, float_result)`` for ``[(chemistry, quantity, unit)]`` via both paths"""
+    decimal_totals = {compound: Decimal('0') for compound in COMPOUNDS}
+    float_totals = {compound: 0.0 for compound in COMPOUNDS}
+    decimal_weight, float_weight = Decimal('0'), 0.0
+    decimal_items, float_items = [], []
+    for index, (chemistry, quantity, unit) in enumerate(items):
+        ingredient = {'id': index, 'name': f'ingredient {index}'}
+        decimal_line = build_line_item(ingredient, chemistry, quantity, unit)
+        float_line = build_line_item_float(ingredient, chemistry, quantity, unit)
+        decimal_weight += decimal_line['quantity_grams']
+        float_weight += float_line['quantity_grams']
+        for compound in COMPOUNDS:
+            decimal_totals[compound] += decimal_line['contributions'][compound]
+            float_totals[compound] += float_line['contributions'][compound]
+        decimal_items.append(serialize_line_item(decimal_line))
+        float_items.append(float_line)
+    return (
+        build_composition_result(decimal_totals, decimal_weight, decimal_items),
+        build_composition_result_float(float_totals, float_weight, float_items),
+    )
+
+
+class CompositionPrecisionTests(SimpleTestCase):
+    def assertDisplayedEqual(self, value, reference, label, displayed=None):
+        """``value`` shows the same ``DISPLAYED_PLACES`` decimals as ``reference``.
+
+        ``displayed`` is the reference as serialized (defaults to ``reference``
+        rounded). A float can land on the other side of a rounding tie that the
+        exact Decimal sits on, so a one-unit difference is accepted only there.
+        """
+        quantum = Decimal(1).scaleb(-DISPLAYED_PLACES)
+        reference = Decimal(str(reference))
+        expected = Decimal(str(displayed if displayed is not None else reference)).quantize(quantum, rounding=ROUND_HALF_EVEN)
+        actual = Decimal(str(value)).quantize(quantum, rounding=ROUND_HALF_EVEN)
+        if actual == expected:
+            return
+        self.assertLessEqual(abs(actual - expected), quantum, f'{label}: {value} vs reference {reference}')
+        tie_distance = abs(abs(reference - reference.quantize(quantum, rounding=ROUND_HALF_EVEN)) - quantum / 2)
+        self.assertLess(
+            tie_distance, Decimal('1e-9') * max(1, abs(reference)),
+            f'{label}: float {value} displays as {actual}, reference {reference} as {expected}',
+        )
+
+    def assertPathsAgree(self, items):
+        decimal_result, float_result = compose(items)
+        decimal_data = CompositionResultSerializer(decimal_result).data
+        float_data = FloatCompositionResultSerializer(float_result).data
+
+        for field in SERIALIZED_TOTALS:
+            self.assertDisplayedEqual(float_data[field], decimal_result[field], field, decimal_data[field])
+        for field in ('total_weight', 'pui', 'aa_nuc_ratio'):
+            self.assertDisplayedEqual(float_result[field], decimal_result[field], field)
+        for key, value in decimal_result['concentrations'].items():
+            self.assertDisplayedEqual(float_result['concentrations'][key], value, key)
+        self.assertEqual(float_data['synergy_zone'], decimal_data['synergy_zone'])
+        return decimal_data, float_data
+
+    def test_random_compositions(self):
+        rng = random.Random(20240601)
+        for _ in range(2000):
+            items = []
+            for _ in range(rng.randint(1, 12)):
+                unit = rng.choice(UNITS)
+                quantity = Decimal(str(round(rng.uniform(0.001, MAX_QUANTITY[unit]), 3)))
+                items.append((random_chemistry(rng), quantity, unit))
+            self.assertPathsAgree(items)
+
+    def test_single_item(self):
+        rng = random.Random(7)
+        for unit in UNITS:
+            self.assertPathsAgree([(random_chemistry(rng), Decimal('100'), unit)])
+
+    def test_smallest_quantity(self):
+        rng = random.Random(11)
+        self.assertPathsAgree([(random_chemistry(rng), Decimal('0.001'), 'g')])
+
+    def test_zero_weight_item_contributes_nothing(self):
+        rng = random.Random(13)
+        kept = (random_chemistry(rng), Decimal('250'), 'g')
+        _, with_zero = self.assertPathsAgree([kept, (random_chemistry(rng), Decimal('0'), 'g')])
+        _, without = self.assertPathsAgree([kept])
+        for field in SERIALIZED_TOTALS + ('pui', 'aa_nuc_ratio', 'synergy_zone'):
+            self.assertEqual(with_zero[field], without[field], field)
+
+    def test_both_paths_render_the_same_json_types(self):
+        rng = random.Random(29)
+        decimal_data, float_data = self.assertPathsAgree([(random_chemistry(rng), Decimal('120'), 'g')])
+        decimal_json = json.loads(JSONRenderer().render(decimal_data))
+        float_json = json.loads(JSONRenderer().render(float_data))
+        for field in SERIALIZED_TOTALS:
+            self.assertIsInstance(decimal_json[field], float, field)
+            self.assertIsInstance(float_json[field], float, field)
+
+    def test_zero_total_weight_is_rejected_by_both_paths(self):
+        # Callers (compose_preview, sessions) check for this; neither path may return a result
+        chemistry = random_chemistry(random.Random(17))
+        with self.assertRaises((ZeroDivisionError, InvalidOperation)):
+            compose([(chemistry, Decimal('0'), 'g')])
+        with self.assertRaises(ZeroDivisionError):
+            build_composition_result_float(dict.fromkeys(COMPOUNDS, 0.0), 0.0, [])
+
+    def test_all_zero_nucleotides(self):
+        rng = random.Random(19)
+        items = [(random_chemistry(rng, zero=('imp', 'gmp', 'amp')), Decimal('80'), 'g') for _ in range(3)]
+        decimal_data, float_data = self.assertPathsAgree(items)
+        self.assertEqual(float_data['total_nuc'], 0.0)
+        self.assertEqual(float_data['synergy_zone'], 'needs_nuc')
+
+    def test_all_zero_amino_acids(self):
+        rng = random.Random(23)
+        items = [(random_chemistry(rng, zero=('glu', 'asp')), Decimal('80'), 'g') for _ in range(3)]
+        decimal_data, float_data = self.assertPathsAgree(items)
+        self.assertEqual(float_data['total_aa'], 0.0)
+        self.assertEqual(float_data['total_synergy'], 0.0)
+        self.assertEqual(float_data['pui'], 0.0)
+
+    def test_all_zero_chemistry(self):
+        items = [(dict.fromkeys(COMPOUNDS, 0.0), Decimal('100'), 'g'), (dict.fromkeys(COMPOUNDS, 0.0), Decimal('1'), 'cup')]
+        _, float_data = self.assertPathsAgree(items)
+        self.assertEqual(float_data['total_synergy'], 0.0)
+        self.assertEqual(float_data['aa_nuc_ratio'], 0.0)
+        self.assertEqual(float_data['synergy_zone'], 'needs_aa')
@@ -0,0 +1,100 @@
+"""Plan regression tests: compiled list queries never de-duplicate result rows.
+
+Filters on aliases are EXISTS semi-joins and the one-to-one relations are
+plain joins, so no filter combination can repeat an ingredient and the list
+query needs no DISTINCT. A Unique or (Hash)Aggregate node over the
+ingredient rows means a filter went back to a multiplying join.
+"""
+import json
+
+from django.db import connection
+from django.test import TestCase
+
+from umami_api.hot_queries import list_queryset
+from umami_api.models import TCM, Alias, Chemistry, Flags, Ingredient
+
+# Representative list query shapes, including the alias search and OR-ed
+# relation filters that used to need DISTINCT
+PLAN_SHAPES = [
+    '',
+    'q=kombu',
+    'q=shiitake&sort=relevance',
+    'umami[]=umami_aa&umami[]=umami_nuc',
+    'flavor[]=flavor_supporting&meridians[]=Spleen&meridians[]=Lung&q=mushroom',
+    'qi[]=Warm&qi[]=Cool&flavors[]=Sweet&flavors[]=Salty',
+    'allergens_include[]=fish&allergens_include[]=shellfish',
+    'allergens_exclude[]=soy&dietary[]=vegetarian',
+    'dietary[]=non_vegetarian&category[]=Seafood',
+    'aa_min=100&nuc_max=500&syn_min=10&sort=alpha',
+]
+
+
+def _plan_problems(node, on_spine=True):
+    """Find DISTINCT/aggregation on the plan's spine.
+
+    The spine is the chain of single-child nodes from the root (Limit, Sort,
+    Unique, ...), where a DISTINCT over the result rows would sit. Unique or
+    aggregate nodes further down, e.g. de-duplicating the inner side of a
+    semi-join, are fine.
+    """
+    problems = []
+    if on_spine and node.get('Node Type') in ('Unique', 'Aggregate'):
+        strategy = node.get('Strategy', '')
+        problems.append(f"{node['Node Type']} ({strategy or 'plain'}) node over the result rows (DISTINCT)")
+
+    children = node.get('Plans', [])
+    for child in children:
+        if child.get('Parent Relationship') in ('SubPlan', 'InitPlan'):
+            continue
+        problems.extend(_plan_problems(child, on_spine and len(children) == 1))
+    return problems
+
+
+class ListQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Every ingredient matches several aliases and both values of each OR-ed
+        # filter, so a multiplying join would return it more than once
+        rows = [
+            ('Kombu', 'Seaweed', ['Cool', 'Warm'], ['Salty', 'Sweet'], ['fish', 'shellfish'], 'vegan'),
+            ('Dried shiitake mushroom', 'Mushroom', ['Warm', 'Cool'], ['Sweet', 'Salty'], ['soy'], 'vegan'),
+            ('Anchovy', 'Seafood', ['Warm'], ['Salty'], ['fish', 'shellfish'], 'pescatarian'),
+            ('Parmesan', 'Dairy', ['Cool'], ['Sweet'], [], 'vegetarian'),
+        ]
+        for index, (name, category, qi, flavors, allergens, diet) in enumerate(rows):
+            ingredient = Ingredient.objects.create(base_name=name, display_name=name, category=category)
+            for alias in ('kombu', 'kombu kelp', 'shiitake', 'shiitake mushroom', 'mushroom'):
+                Alias.objects.create(ingredient=ingredient, name=f'{alias} {index}')
+            TCM.objects.create(ingredient=ingredient, four_qi=qi, five_flavors=flavors, meridians=['Spleen', 'Lung'])
+            Flags.objects.create(ingredient=ingredient, allergens=allergens, dietary_restrictions=[diet])
+            Chemistry.objects.create(
+                ingredient=ingredient, glu=2000, asp=300, imp=200, gmp=150, amp=50,
+                umami_aa=1500 + index, umami_nuc=400 + index, umami_synergy=20000 + index,
+            )
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def test_no_distinct_over_result_rows(self):
+        for shape in PLAN_SHAPES:
+            with self.subTest(shape=shape or '(no filters)'):
+                root = self.explain(list_queryset(shape))
+                self.assertEqual(_plan_problems(root), [], json.dumps(root, indent=2))
+
+    def test_no_repeated_ingredients(self):
+        for shape in PLAN_SHAPES:
+            with self.subTest(shape=shape or '(no filters)'):
+                ids = list(list_queryset(shape).values_list('id', flat=True))
+                self.assertEqual(len(ids), len(set(ids)))
+
+    def test_shapes_match_ingredients(self):
+        # Guards the fixture: a shape matching nothing would pass the other tests vacuously
+        for shape in ('q=kombu', 'meridians[]=Spleen&meridians[]=Lung', 'allergens_include[]=fish&allergens_include[]=shellfish'):
+            with self.subTest(shape=shape):
+                self.assertTrue(list_queryset(shape).exists())
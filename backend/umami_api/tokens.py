@@ -0,0 +1,14 @@
+"""Constant-time comparison of request header values with configured secrets."""
+import hmac
+
+
+def header_matches(value, expected):
+    """True if header ``value`` equals ``expected``, compared in constant time.
+
+    WSGI hands headers over as latin-1 decoded str and ``hmac.compare_digest``
+    raises TypeError for non-ASCII str, so both sides are compared as bytes:
+    the header's original bytes against the UTF-8 encoded secret.
+    """
+    if not value or not expected:
+        return False
+    return hmac.compare_digest(value.encode('latin-1'), expected.encode())
@@ -0,0 +1,124 @@
+"""Opt-in, privacy-safe capture of ingredient API traffic for load replay.
+
+With ``TRAFFIC_CAPTURE_PATH`` set, ``TrafficCaptureMiddleware`` appends one
+JSON line per sampled ``/api/ingredients/`` request (``TRAFFIC_CAPTURE_SAMPLE_RATE``).
+Each line records the method, path, route name, normalised query
+parameters, the compose payload's shape, status and duration. Nothing
+identifying is kept:
+
+- no headers, cookies, client addresses or user
+- only query parameters the API understands, with values truncated
+- free-text search (``q``) replaced by a placeholder recording only its
+  script and length (``<q:latin:8>``), filled in again at replay
+- compose payloads reduced to ``ingredient_id``/``quantity``/``unit`` items
+
+Without the setting the middleware removes itself at startup.
+``replay_traffic`` drives a server with the captured mix.
+"""
+import json
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .cjk_search import contains_cjk
+from .filter_compiler import RANGE_FILTERS
+
+CAPTURED_PREFIX = '/api/ingredients/'
+COMPOSE_ACTIONS = ('compose_preview/', 'compose_analysis/')
+FREE_TEXT_PARAMS = ('q',)
+MAX_VALUE_LENGTH = 100
+MAX_BODY_ITEMS = 100
+
+# Query parameters understood by IngredientViewSet; everything else is dropped
+KNOWN_PARAMS = {
+    'umami[]', 'flavor[]', 'qi[]', 'flavors[]', 'meridians[]', 'allergens_include[]',
+    'allergens_exclude[]', 'dietary[]', 'dietary', 'category[]', 'category', 'metric[]', 'metric',
+    'sort', 'page', 'page_size', 'precision', 'output', 'chunk_size', 'limit', 'k',
+    'quantity', 'unit', 'partner_quantity', 'partner_unit',
+    *RANGE_FILTERS,
+}
+
+
+def search_placeholder(text):
+    """``<q:<script>:<length>>`` standing in for a free-text query"""
+    text = text.strip()
+    script = 'cjk' if contains_cjk(text) else ('latin' if text.isascii() else 'other')
+    return f'<q:{script}:{len(text)}>'
+
+
+def normalize_query(params):
+    """Sorted ``[key, value]`` pairs of the known parameters, search text masked"""
+    pairs = []
+    for key, values in params.lists():
+        if key not in KNOWN_PARAMS and key not in FREE_TEXT_PARAMS:
+            continue
+        for value in values:
+            if key in FREE_TEXT_PARAMS:
+                value = search_placeholder(value)
+            pairs.append([key, value[:MAX_VALUE_LENGTH]])
+    return sorted(pairs)
+
+
+def normalize_compose_body(raw):
+    """Compose payload reduced to its items' ingredient, quantity and unit"""
+    try:
+        items = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(items, list):
+        return None
+    shape = []
+    for item in items[:MAX_BODY_ITEMS]:
+        if not isinstance(item, dict):
+            continue
+        shape.append({
+            'ingredient_id': item.get('ingredient_id'),
+            'quantity': item.get('quantity'),
+            'unit': str(item.get('unit', ''))[:10],
+        })
+    return shape
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, get_response):
+        self.path = getattr(settings, 'TRAFFIC_CAPTURE_PATH', '')
+        if not self.path:
+            raise MiddlewareNotUsed
+        self.sample_rate = getattr(settings, 'TRAFFIC_CAPTURE_SAMPLE_RATE', 1.0)
+        self.get_response = get_response
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        if not request.path.startswith(CAPTURED_PREFIX) or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        body = None
+        if request.method == 'POST' and request.path.endswith(COMPOSE_ACTIONS):
+            # Read before the view consumes the stream; Django keeps it for DRF
+            body = normalize_compose_body(request.body)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        record = {
+            'ts': int(time.time()),
+            'method': request.method,
+            'path': request.path,
+            'route': getattr(request.resolver_match, 'url_name', None),
+            'query': normalize_query(request.GET),
+            'body': body,
+            'status': response.status_code,
+            'ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+        self.write(record)
+        return response
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        # One file per worker process when the path contains {pid}
+        path = self.path.format(pid=os.getpid())
+        with self.lock, open(path, 'a', encoding='utf-8') as handle:
+            handle.write(line)
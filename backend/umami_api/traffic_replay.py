@@ -0,0 +1,168 @@
+"""Replay captured traffic against a running server and summarise latency.
+
+Records come from ``traffic_capture``. Search placeholders are filled with
+terms of the same script and similar length, requests are issued at a fixed
+rate (open loop, so a slow server builds a backlog as it would in
+production) or as fast as the workers allow, and latencies are grouped per
+endpoint (method + route name). A summary saved as a baseline can be
+compared with later runs.
+
+At a fixed rate, latency is measured from each request's scheduled send
+time, not from when a worker got to it: if every worker is busy, the time a
+request spends waiting for one is part of what a real client would see
+(coordinated omission otherwise hides exactly the slow periods). Requests
+sent more than ``LATE_MS`` behind schedule are counted as late; many late
+requests mean ``concurrency`` is too low for the rate, not only that the
+server is slow.
+"""
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+# A request sent this long after its scheduled time counts as late
+LATE_MS = 10
+
+DEFAULT_SEARCH_TERMS = {
+    'latin': [
+        'miso', 'kombu', 'tomato', 'shiitake', 'anchovy', 'parmesan', 'soy sauce', 'fish sauce',
+        'xianggu', 'kunbu', 'nori', 'katsuobushi', 'mushroom', 'cheese', 'seaweed', 'bonito',
+    ],
+    'cjk': ['菇', '香菇', '昆布', '海带', '番茄', '味噌', '干香菇', '鲣鱼干', '帕玛森'],
+}
+
+_PLACEHOLDER = re.compile(r'^<q:(\w+):(\d+)>$')
+
+
+def load_records(path, limit=None):
+    records = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+            if limit and len(records) >= limit:
+                break
+    return records
+
+
+def endpoint_name(record):
+    return f"{record['method']} {record.get('route') or record['path']}"
+
+
+def fill_search(value, terms, rng):
+    """A search term matching the placeholder's script and (roughly) its length"""
+    match = _PLACEHOLDER.match(value)
+    if not match:
+        return value
+    script, length = match.group(1), int(match.group(2))
+    candidates = terms.get(script) or terms['latin']
+    distance = min(abs(len(term) - length) for term in candidates)
+    return rng.choice([term for term in candidates if abs(len(term) - length) == distance])
+
+
+def build_request(record, terms, rng):
+    """``(method, path with query, body bytes or None)`` for a captured record"""
+    query = [(key, fill_search(value, terms, rng) if key == 'q' else value) for key, value in record['query']]
+    path = record['path'] + (f'?{urlencode(query)}' if query else '')
+    body = None
+    if record.get('body') is not None:
+        body = json.dumps(record['body']).encode()
+    return record['method'], path, body
+
+
+def replay(records, base_url, rate=0, concurrency=8, timeout=30, terms=None, seed=0):
+    """Issue every record; returns ``[(endpoint, status, ms, lag ms)]`` (status None on errors)
+
+    With ``rate``, ``ms`` runs from the scheduled send time and ``lag ms`` is how
+    far behind schedule the request was actually sent (0 without a rate).
+    """
+    rng = random.Random(seed)
+    terms = terms or DEFAULT_SEARCH_TERMS
+    requests = [(endpoint_name(record), *build_request(record, terms, rng)) for record in records]
+    base_url = base_url.rstrip('/')
+    started = time.perf_counter()
+    lock = threading.Lock()
+    results = []
+
+    def send(position, request):
+        endpoint, method, path, body = request
+        sent = time.perf_counter()
+        scheduled = sent
+        if rate:
+            # Open loop: each request has a fixed send time regardless of earlier latency
+            scheduled = started + position / rate
+            if scheduled > sent:
+                time.sleep(scheduled - sent)
+            sent = time.perf_counter()
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            http_request = urllib.request.Request(base_url + path, data=body, method=method, headers=headers)
+            with urllib.request.urlopen(http_request, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        except (urllib.error.URLError, OSError):
+            status = None
+        # Measured from the schedule, so time spent queued behind busy workers counts
+        with lock:
+            results.append((
+                endpoint, status, (time.perf_counter() - scheduled) * 1000, max(0.0, sent - scheduled) * 1000,
+            ))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(send, position, request) for position, request in enumerate(requests)]
+    for future in futures:
+        # Connection errors are results; anything else is a bug and must not vanish in the pool
+        future.result()
+    return results
+
+
+def summarize(results):
+    """``{endpoint: {count, errors, late, p50, p90, p99, max}}`` with latencies in ms"""
+    grouped = {}
+    for endpoint, status, ms, lag in results:
+        grouped.setdefault(endpoint, []).append((status, ms, lag))
+    summary = {}
+    for endpoint, entries in sorted(grouped.items()):
+        latencies = np.array([ms for _, ms, _ in entries])
+        stats = {
+            'count': len(entries),
+            'errors': sum(1 for status, _, _ in entries if status is None or status >= 500),
+            'late': sum(1 for _, _, lag in entries if lag > LATE_MS),
+        }
+        for p, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+            stats[f'p{p}'] = round(float(value), 2)
+        stats['max'] = round(float(latencies.max()), 2)
+        summary[endpoint] = stats
+    return summary
+
+
+def schedule_lag(results):
+    """``(late requests, max lag ms)`` over all results"""
+    lags = [lag for _, _, _, lag in results]
+    return sum(1 for lag in lags if lag > LATE_MS), max(lags, default=0.0)
+
+
+def compare(summary, baseline, max_regression):
+    """``[(endpoint, percentile, baseline ms, current ms)]`` slower than allowed"""
+    regressions = []
+    for endpoint, stats in summary.items():
+        before = baseline.get(endpoint)
+        if not before:
+            continue
+        for p in PERCENTILES:
+            key = f'p{p}'
+            if before.get(key) and stats[key] > before[key] * (1 + max_regression):
+                regressions.append((endpoint, key, before[key], stats[key]))
+    return regressions
@@ -1,9 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import IngredientViewSet
+from .views import IngredientViewSet, CatalogViewSet, CompositionSessionViewSet, SavedRecipeViewSet
 
 router = DefaultRouter()
 router.register(r'ingredients', IngredientViewSet, basename='ingredient')
+router.register(r'catalog', CatalogViewSet, basename='catalog')
+router.register(r'composition-sessions', CompositionSessionViewSet, basename='composition-session')
+router.register(r'recipes', SavedRecipeViewSet, basename='recipe')
 
 urlpatterns = [
     path('', include(router.urls)),
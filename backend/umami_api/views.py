@@ -1,22 +1,66 @@
-from django.db import connection
-from django.db.models import Q, F
-from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection, router
+from django.http import FileResponse, StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.core.cache import cache
 import json
+import math
+import numpy as np
 from decimal import Decimal
 
-from .models import Ingredient, Alias, Chemistry, TCM, Flags
+from .models import (
+    DIET_FILTER_CLASSES,
+    Ingredient,
+    ChemistryHistogram,
+    Pairing,
+    SavedRecipe,
+)
 from .serializers import (
     IngredientListSerializer, 
     IngredientDetailSerializer,
     CompositionIngredientSerializer,
-    CompositionResultSerializer
+    CompositionDeltaSerializer,
+    CompositionResultSerializer,
+    FloatCompositionResultSerializer,
+    CompositionAnalysisSerializer,
+    PairingSerializer,
+    SavedRecipeSerializer
+)
+from .composition import (
+    COMPOUNDS,
+    convert_to_grams,
+    build_line_item,
+    build_line_item_float,
+    build_composition_result,
+    build_composition_result_float,
+    serialize_line_item,
+    analyze_composition,
+)
+from .composition_sessions import CompositionSession, CompositionSessionError, session_lease
+from .pairings import DIET_SLICES, pairing_slice_key
+from .partner_search import get_partner_index, top_partners
+from .recipe_scoring import score_items
+from .filter_compiler import FLAVOR_ROLES, IngredientFilterCompiler
+from .distributions import HISTOGRAM_METRICS, approximate_quantiles
+from .quantiles import get_quantile_table
+from .db_router import replica_reads
+from .single_flight import coalesced, request_key
+from .catalog_snapshot import SNAPSHOT_NAME_PATTERN, read_manifest, snapshot_files
+from .catalog_export import (
+    EXPORT_FORMATS,
+    ExportUnavailable,
+    check_format,
+    default_format,
+    stream_export,
+    stream_ndjson,
 )
 
+# Query parameters of the partners action that are not get_queryset filters
+PARTNER_SEARCH_PARAMS = {'quantity', 'unit', 'partner_quantity', 'partner_unit', 'k', 'sort', 'page', 'page_size'}
+
 
 class CustomPagination(PageNumberPagination):
     page_size = 24
@@ -34,22 +78,26 @@ class CustomPagination(PageNumberPagination):
         })
 
 
-def convert_to_grams(quantity: float, unit: str) -> float:
-    """Convert quantity to grams based on unit"""
-    unit_conversions = {
-        'g': 1.0,
-        'oz': 28.35,
-        'tsp': 5.0,  # assuming water density
-        'tbsp': 15.0,  # assuming water density
-        'cup': 240.0,  # assuming water density
-    }
-    return quantity * unit_conversions.get(unit.lower(), 1.0)
-
-
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.select_related('chemistry', 'tcm', 'flags').prefetch_related('aliases')
     pagination_class = CustomPagination
 
+    def dispatch(self, request, *args, **kwargs):
+        # Every action here is read-only, so the whole request may use a replica
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Pages are cached per query; concurrent misses share one computation
+        compute = super().list
+        data = coalesced('list', request_key(request), lambda: compute(request, *args, **kwargs).data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        data = coalesced('detail', request_key(request), lambda: compute(request, *args, **kwargs).data)
+        return Response(data)
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return IngredientDetailSerializer
@@ -57,300 +105,14 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        
-        # Get filter parameters
-        query = self.request.query_params.get('q', '')
-        
-        # Validate query length to prevent abuse
-        if len(query) > 200:
-            query = query[:200]
         sort_by = self.request.query_params.get('sort', 'synergy')
-        
-        # Umami filters
-        umami_filters = self.request.query_params.getlist('umami[]')
-        
-        # Flavor role filters  
-        flavor_filters = self.request.query_params.getlist('flavor[]')
-        
-        # TCM filters
-        qi_filters = self.request.query_params.getlist('qi[]')
-        flavor_tcm_filters = self.request.query_params.getlist('flavors[]')  # TCM Five Tastes
-        meridian_filters = self.request.query_params.getlist('meridians[]')
-        
-        # Allergen filters
-        allergens_include = self.request.query_params.getlist('allergens_include[]')
-        allergens_exclude = self.request.query_params.getlist('allergens_exclude[]')
-        
-        # Dietary filters
-        dietary_filters = self.request.query_params.getlist('dietary[]') or self.request.query_params.getlist('dietary')
-        
-        # Category filters
-        category_filters = self.request.query_params.getlist('category[]')
-        
-        # Range filters
-        aa_min = self.request.query_params.get('aa_min')
-        aa_max = self.request.query_params.get('aa_max')
-        nuc_min = self.request.query_params.get('nuc_min')
-        nuc_max = self.request.query_params.get('nuc_max')
-        syn_min = self.request.query_params.get('syn_min')
-        syn_max = self.request.query_params.get('syn_max')
-
-        # Apply fuzzy search if query provided
-        if query.strip():
-            queryset = self._apply_fuzzy_search(queryset, query)
-
-        # Apply filters
-        if umami_filters:
-            queryset = self._apply_umami_filters(queryset, umami_filters)
-        
-        if flavor_filters:
-            queryset = self._apply_flavor_filters(queryset, flavor_filters)
-        
-        if qi_filters:
-            queryset = self._apply_qi_filters(queryset, qi_filters)
-            
-        if flavor_tcm_filters:
-            queryset = self._apply_tcm_flavor_filters(queryset, flavor_tcm_filters)
-            
-        if meridian_filters:
-            queryset = self._apply_meridian_filters(queryset, meridian_filters)
-        
-        if allergens_include:
-            queryset = self._apply_allergen_include_filters(queryset, allergens_include)
-            
-        if allergens_exclude:
-            queryset = self._apply_allergen_exclude_filters(queryset, allergens_exclude)
-        
-        if dietary_filters:
-            queryset = self._apply_dietary_filters(queryset, dietary_filters)
-            
-        if category_filters:
-            queryset = self._apply_category_filters(queryset, category_filters)
-
-        # Apply range filters
-        if aa_min is not None:
-            queryset = queryset.filter(chemistry__umami_aa__gte=aa_min)
-        if aa_max is not None:
-            queryset = queryset.filter(chemistry__umami_aa__lte=aa_max)
-        if nuc_min is not None:
-            queryset = queryset.filter(chemistry__umami_nuc__gte=nuc_min)
-        if nuc_max is not None:
-            queryset = queryset.filter(chemistry__umami_nuc__lte=nuc_max)
-        if syn_min is not None:
-            queryset = queryset.filter(chemistry__umami_synergy__gte=syn_min)
-        if syn_max is not None:
-            queryset = queryset.filter(chemistry__umami_synergy__lte=syn_max)
-
-        # Apply sorting
-        queryset = self._apply_sorting(queryset, sort_by)
-
-        return queryset.distinct()
-
-    def _apply_fuzzy_search(self, queryset, query):
-        """Apply trigram similarity across names and aliases with weighted score"""
-        # Compute trigram similarity for base/display names
-        qs = queryset.annotate(
-            sim_base=TrigramSimilarity('base_name', query),
-            sim_display=TrigramSimilarity('display_name', query),
-        )
-        # Best name similarity
-        qs = qs.annotate(sim_name=F('sim_base') + F('sim_display'))
-
-        # Approximate alias similarity using EXISTS filter; we can't aggregate easily without GROUP BY, so
-        # we boost items that have any alias containing the query, and otherwise rely on name similarity.
-        alias_match = Q(aliases__name__icontains=query)
-        qs = qs.annotate(
-            sim_alias=F('sim_name')  # placeholder to keep types
-        )
-        # Filter low-similarity quickly
-        qs = qs.filter(Q(sim_name__gt=0.05) | alias_match | Q(base_name__icontains=query) | Q(display_name__icontains=query))
-
-        # Weighted score: names weighted higher than alias presence
-        qs = qs.annotate(
-            score=F('sim_name') * 0.9 + F('sim_base') * 0.1
-        ).order_by('-score')
-
-        return qs
-
-    def _apply_umami_filters(self, queryset, umami_filters):
-        """Apply umami-related filters based on chart levels (level 4+ = High)
-        Level 4 thresholds based on weighted values at ~P90:
-        - AA: 740 mg/100g (weighted)
-        - Nuc: 650 mg/100g (weighted) 
-        - Synergy: 1900 mg/100g (EUC)
-        """
-        umami_query = Q()
-        for filter_type in umami_filters:
-            if filter_type == 'umami_aa':
-                # Level 4+ for AA: >= 740 mg/100g (weighted)
-                umami_query |= Q(chemistry__umami_aa__gte=740)
-            elif filter_type == 'umami_nuc':
-                # Level 4+ for Nuc: >= 650 mg/100g (weighted)
-                umami_query |= Q(chemistry__umami_nuc__gte=650)
-            elif filter_type == 'umami_synergy':
-                # Level 4+ for Synergy: >= 1900 mg/100g (EUC)
-                umami_query |= Q(chemistry__umami_synergy__gte=1900)
-        
-        return queryset.filter(umami_query)
-
-    def _apply_flavor_filters(self, queryset, flavor_filters):
-        """Apply flavor role filters based on ingredient type and umami levels
-        - High Umami: AA >= 740 OR Nuc >= 650 OR Synergy >= 1900 (level 4+)
-        - Flavor Carrier: Staple foods (rice, bread, noodles, pasta, flour, wheat, grain)
-        - Flavor Supporting: Everything else
-        """
-        flavor_query = Q()
-        
-        for filter_type in flavor_filters:
-            if filter_type == 'high_umami':
-                # Level 4+ on any metric (weighted values)
-                flavor_query |= (
-                    Q(chemistry__umami_aa__gte=740) |
-                    Q(chemistry__umami_nuc__gte=650) |
-                    Q(chemistry__umami_synergy__gte=1900)
-                )
-            elif filter_type == 'flavor_carrier':
-                # Staple foods - search in name and category
-                staples_query = Q()
-                staple_terms = ['rice', 'bread', 'noodle', 'pasta', 'flour', 'wheat', 'grain']
-                for term in staple_terms:
-                    staples_query |= (
-                        Q(base_name__icontains=term) |
-                        Q(display_name__icontains=term) |
-                        Q(category__icontains=term)
-                    )
-                # Exclude high umami items
-                staples_query &= ~(
-                    Q(chemistry__umami_aa__gte=740) |
-                    Q(chemistry__umami_nuc__gte=650) |
-                    Q(chemistry__umami_synergy__gte=1900)
-                )
-                flavor_query |= staples_query
-                
-            elif filter_type == 'flavor_supporting':
-                # Everything that's not high umami and not a carrier
-                high_umami = (
-                    Q(chemistry__umami_aa__gte=740) |
-                    Q(chemistry__umami_nuc__gte=650) |
-                    Q(chemistry__umami_synergy__gte=1900)
-                )
-                staples = Q()
-                staple_terms = ['rice', 'bread', 'noodle', 'pasta', 'flour', 'wheat', 'grain']
-                for term in staple_terms:
-                    staples |= (
-                        Q(base_name__icontains=term) |
-                        Q(display_name__icontains=term) |
-                        Q(category__icontains=term)
-                    )
-                # Not high umami AND not carrier
-                flavor_query |= (~high_umami & ~staples)
-        
-        return queryset.filter(flavor_query)
-
-    def _apply_qi_filters(self, queryset, qi_filters):
-        """Apply TCM Four Qi filters (OR within group)"""
-        qi_query = Q()
-        for qi in qi_filters:
-            qi_query |= Q(tcm__four_qi__contains=[qi])
-        
-        return queryset.filter(qi_query)
-
-    def _apply_tcm_flavor_filters(self, queryset, flavor_filters):
-        """Apply TCM Five Tastes filters (OR within group)"""
-        flavor_query = Q()
-        for flavor in flavor_filters:
-            flavor_query |= Q(tcm__five_flavors__contains=[flavor])
-        
-        return queryset.filter(flavor_query)
-
-    def _apply_meridian_filters(self, queryset, meridian_filters):
-        """Apply TCM Meridian filters (OR within group)"""
-        meridian_query = Q()
-        for meridian in meridian_filters:
-            meridian_query |= Q(tcm__meridians__contains=[meridian])
-        
-        return queryset.filter(meridian_query)
-
-    def _apply_allergen_include_filters(self, queryset, allergen_filters):
-        """Include ingredients with specific allergens"""
-        allergen_query = Q()
-        for allergen in allergen_filters:
-            allergen_query |= Q(flags__allergens__contains=[allergen])
-        
-        return queryset.filter(allergen_query)
 
-    def _apply_allergen_exclude_filters(self, queryset, allergen_filters):
-        """Exclude ingredients with specific allergens"""
-        for allergen in allergen_filters:
-            queryset = queryset.exclude(flags__allergens__contains=[allergen])
-        
-        return queryset
-
-    def _apply_dietary_filters(self, queryset, dietary_filters):
-        """Apply dietary restriction filters with inclusive logic
-        vegan -> vegan
-        vegetarian -> vegetarian OR vegan
-        pescatarian -> pescatarian OR vegetarian OR vegan
-        non_vegetarian -> pescatarian OR (not vegan AND not vegetarian AND not pescatarian)
-        """
-        if not dietary_filters:
-            return queryset
-
-        # Special-case when only Non-vegetarian is selected to avoid OR-inflation
-        normalized = { (f or '').lower() for f in dietary_filters }
-        if normalized == {'non_vegetarian'}:
-            return (
-                queryset
-                .exclude(flags__dietary_restrictions__contains=['vegan'])
-                .exclude(flags__dietary_restrictions__contains=['vegetarian'])
-                .filter(
-                    Q(flags__dietary_restrictions__contains=['pescatarian']) |
-                    Q(flags__dietary_restrictions__contains=['non_vegetarian'])
-                )
-            )
-
-        combined_query = Q()
-
-        def contains_any(values):
-            q = Q()
-            for v in values:
-                q |= Q(flags__dietary_restrictions__contains=[v])
-            return q
-
-        for flt in dietary_filters:
-            key = (flt or '').lower()
-            vegan = ['vegan', 'Vegan', 'VEGAN']
-            vegetarian = ['vegetarian', 'Vegetarian', 'VEGETARIAN']
-            pescatarian = ['pescatarian', 'Pescatarian', 'PESCATARIAN']
-
-            if key == 'vegan':
-                combined_query |= contains_any(vegan)
-            elif key == 'vegetarian':
-                combined_query |= (contains_any(vegetarian) | contains_any(vegan))
-            elif key == 'pescatarian':
-                combined_query |= (contains_any(pescatarian) | contains_any(vegetarian) | contains_any(vegan))
-            elif key == 'non_vegetarian':
-                combined_query |= (
-                    # include pescatarian explicitly
-                    contains_any(pescatarian) |
-                    # include items that have dietary info and are not vegan/vegetarian/pescatarian
-                    (
-                        ~contains_any(vegan) &
-                        ~contains_any(vegetarian) &
-                        ~contains_any(pescatarian) &
-                        Q(flags__dietary_restrictions__isnull=False) &
-                        ~Q(flags__dietary_restrictions=[])  # exclude unknown/unspecified
-                    )
-                )
-            else:
-                # Fallback to exact contains for any unknown tag
-                combined_query |= Q(flags__dietary_restrictions__contains=[flt])
-
-        return queryset.filter(combined_query)
+        # Relation predicates compile to joins on one-to-one relations and
+        # EXISTS on aliases, so rows are never duplicated and DISTINCT is unneeded
+        queryset = IngredientFilterCompiler(self.request.query_params).compile(queryset)
 
-    def _apply_category_filters(self, queryset, category_filters):
-        """Apply category filters (OR within group)"""
-        return queryset.filter(category__in=category_filters)
+        # Apply sorting
+        return self._apply_sorting(queryset, sort_by)
 
     def _apply_sorting(self, queryset, sort_by):
         """Apply sorting based on sort parameter and umami filters
@@ -399,21 +161,23 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['post'])
     def compose_preview(self, request):
-        """Calculate composition preview for given ingredients and quantities"""
+        """Calculate composition preview for given ingredients and quantities
+
+        Uses the float64 fast path by default; ``?precision=decimal`` runs the
+        Decimal reference implementation instead.
+        """
         serializer = CompositionIngredientSerializer(data=request.data, many=True)
         
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         composition_data = serializer.validated_data
+        use_decimal = request.query_params.get('precision') == 'decimal'
         
         # Calculate totals
-        total_glu = Decimal('0')
-        total_asp = Decimal('0')
-        total_imp = Decimal('0')
-        total_gmp = Decimal('0')
-        total_amp = Decimal('0')
-        total_weight = Decimal('0')
+        zero = Decimal('0') if use_decimal else 0.0
+        totals = {compound: zero for compound in COMPOUNDS}
+        total_weight = zero
         
         ingredients_data = []
         
@@ -426,39 +190,18 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
                 ingredient = Ingredient.objects.select_related('chemistry').get(id=ingredient_id)
                 chemistry = ingredient.chemistry
 
-                # Convert to grams
-                quantity_grams = Decimal(str(convert_to_grams(float(quantity), unit)))
-                total_weight += quantity_grams
-
-                # Calculate contribution (assuming chemistry values are per 100g)
-                factor = quantity_grams / Decimal('100')
-
-                contrib_glu = chemistry.glu * factor
-                contrib_asp = chemistry.asp * factor
-                contrib_imp = chemistry.imp * factor
-                contrib_gmp = chemistry.gmp * factor
-                contrib_amp = chemistry.amp * factor
-
-                total_glu += contrib_glu
-                total_asp += contrib_asp
-                total_imp += contrib_imp
-                total_gmp += contrib_gmp
-                total_amp += contrib_amp
-
-                ingredients_data.append({
-                    'id': ingredient.id,
-                    'name': ingredient.display_name or ingredient.base_name,
-                    'quantity': quantity,
-                    'unit': unit,
-                    'quantity_grams': float(quantity_grams),
-                    'contributions': {
-                        'glu': float(contrib_glu),
-                        'asp': float(contrib_asp),
-                        'imp': float(contrib_imp),
-                        'gmp': float(contrib_gmp),
-                        'amp': float(contrib_amp),
-                    }
-                })
+                ingredient_info = {'id': ingredient.id, 'name': ingredient.display_name or ingredient.base_name}
+                chemistry_per_100g = {compound: getattr(chemistry, compound) for compound in COMPOUNDS}
+                if use_decimal:
+                    line_item = build_line_item(ingredient_info, chemistry_per_100g, quantity, unit)
+                else:
+                    line_item = build_line_item_float(ingredient_info, chemistry_per_100g, quantity, unit)
+
+                total_weight += line_item['quantity_grams']
+                for compound in COMPOUNDS:
+                    totals[compound] += line_item['contributions'][compound]
+
+                ingredients_data.append(serialize_line_item(line_item) if use_decimal else line_item)
 
             except Ingredient.DoesNotExist:
                 return Response(
@@ -466,140 +209,408 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
                     status=status.HTTP_404_NOT_FOUND
                 )
         
-        # Calculate derived values using EUC formula
-        # EUC = Σ(ai·bi) + 1218 × (Σ(ai·bi)) × (Σ(aj·bj))
-        # where ai = amino acid concentrations (g/100g)
-        #       aj = nucleotide concentrations (g/100g)
-        #       bi = relative umami weights for amino acids (Glu=1, Asp=0.077)
-        #       bj = relative umami weights for nucleotides (IMP=1, GMP=2.3, AMP=0.18)
-        #       1218 = synergistic constant
-        
         if total_weight == 0:
             return Response(
                 {'error': 'Total weight must be greater than zero'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        def mg_per_100g(total_mg: Decimal) -> Decimal:
-            return (total_mg / total_weight) * Decimal('100')
-
-        glu_mg_per_100g = mg_per_100g(total_glu)
-        asp_mg_per_100g = mg_per_100g(total_asp)
-        imp_mg_per_100g = mg_per_100g(total_imp)
-        gmp_mg_per_100g = mg_per_100g(total_gmp)
-        amp_mg_per_100g = mg_per_100g(total_amp)
-
-        glu_g_per_100g = glu_mg_per_100g / Decimal('1000')
-        asp_g_per_100g = asp_mg_per_100g / Decimal('1000')
-        imp_g_per_100g = imp_mg_per_100g / Decimal('1000')
-        gmp_g_per_100g = gmp_mg_per_100g / Decimal('1000')
-        amp_g_per_100g = amp_mg_per_100g / Decimal('1000')
-
-        # Apply relative weights to each compound for umami-equivalent calculations
-        # Relative umami intensity: Glu=1.0, Asp=0.077, IMP=1.0, GMP=2.3, AMP=0.18
-        weighted_aa_g = glu_g_per_100g * Decimal('1.0') + asp_g_per_100g * Decimal('0.077')
-        weighted_nuc_g = (
-            imp_g_per_100g * Decimal('1.0') +
-            gmp_g_per_100g * Decimal('2.3') +
-            amp_g_per_100g * Decimal('0.18')
-        )
-        
-        # Convert weighted values to mg/100g for display
-        weighted_aa_mg = weighted_aa_g * Decimal('1000')
-        weighted_nuc_mg = weighted_nuc_g * Decimal('1000')
-        
-        # Calculate EUC (Equivalent Umami Concentration)
-        # Formula: EUC = weighted_AA + 1218 × weighted_AA × weighted_Nuc
-        if weighted_aa_g > 0 and weighted_nuc_g > 0:
-            euc_g = weighted_aa_g + Decimal('1218') * weighted_aa_g * weighted_nuc_g
+        if use_decimal:
+            result_serializer = CompositionResultSerializer(
+                build_composition_result(totals, total_weight, ingredients_data)
+            )
         else:
-            # If no nucleotides, synergy = just the amino acids
-            euc_g = weighted_aa_g if weighted_aa_g > 0 else Decimal('0')
-        
-        euc_mg = euc_g * Decimal('1000')
+            result_serializer = FloatCompositionResultSerializer(
+                build_composition_result_float(totals, total_weight, ingredients_data)
+            )
+        return Response(result_serializer.data)
 
-        # Calculate PUI (Perceived Umami Index)
-        # P_AA = 1 / (1 + (K_AA / AA_weighted_mg)^n)  where K_AA=80, n=1.4
-        # B_Nuc = 1 + α * (Nuc_weighted_mg / (Nuc_weighted_mg + K_Nuc))  where α=1.5, K_Nuc=30
-        # PUI = min(P_AA * B_Nuc, 1) * 100
-        # Using float for pow operation for better compatibility
-        
-        if weighted_aa_mg > 0:
-            ratio = float(Decimal('80') / weighted_aa_mg)
-            p_aa = Decimal(str(1.0 / (1.0 + pow(ratio, 1.4))))
-        else:
-            p_aa = Decimal('0')
-        
-        if weighted_nuc_mg > 0:
-            b_nuc = Decimal('1') + Decimal('1.5') * (weighted_nuc_mg / (weighted_nuc_mg + Decimal('30')))
-        else:
-            b_nuc = Decimal('1')
-        
-        pui_raw = p_aa * b_nuc
-        pui = min(float(pui_raw), 1.0) * 100
-        
-        # Calculate AA:Nuc ratio for synergy dial (using weighted values)
-        epsilon = Decimal('0.001')
-        aa_nuc_ratio = weighted_aa_mg / max(weighted_nuc_mg, epsilon)
-        
-        # Determine synergy zone
-        if aa_nuc_ratio < Decimal('0.6'):
-            synergy_zone = 'needs_aa'
-            synergy_suggestion = 'Add amino-rich ingredient (tomato, cheese, soy sauce).'
-        elif aa_nuc_ratio <= Decimal('1.6'):
-            synergy_zone = 'optimal'
-            synergy_suggestion = 'Optimal synergy ratio achieved.'
-        else:
-            synergy_zone = 'needs_nuc'
-            synergy_suggestion = 'Add nucleotide-rich ingredient (mushrooms, seafood, seaweed).'
-
-        # Return weighted values in mg/100g for frontend display
-        total_aa = weighted_aa_mg
-        total_nuc = weighted_nuc_mg
-        total_synergy = euc_mg
-
-        # Prepare chart data
-        chart_data = {
-            'umami_aa': {
-                'glu': float(glu_mg_per_100g),
-                'asp': float(asp_mg_per_100g)
-            },
-            'umami_nuc': {
-                'imp': float(imp_mg_per_100g),
-                'gmp': float(gmp_mg_per_100g),
-                'amp': float(amp_mg_per_100g)
-            },
-            'breakdown': {
-                'total_aa': float(weighted_aa_mg),
-                'total_nuc': float(weighted_nuc_mg),
-                'total_synergy': float(euc_mg)
-            }
+    @action(detail=False, methods=['post'])
+    def compose_analysis(self, request):
+        """Per-ingredient marginal EUC/PUI per gram and leave-one-out deltas
+
+        Takes the same payload as compose_preview and answers "which
+        ingredient is driving my EUC?" in one closed-form pass.
+        """
+        serializer = CompositionIngredientSerializer(data=request.data, many=True)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        composition_data = serializer.validated_data
+        ingredient_ids = {item['ingredient_id'] for item in composition_data}
+        ingredients = Ingredient.objects.select_related('chemistry').in_bulk(ingredient_ids)
+
+        line_items = []
+        for item in composition_data:
+            ingredient = ingredients.get(item['ingredient_id'])
+            if ingredient is None:
+                return Response(
+                    {'error': f"Ingredient with id {item['ingredient_id']} not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            line_items.append({
+                'id': ingredient.id,
+                'name': ingredient.display_name or ingredient.base_name,
+                'quantity_grams': convert_to_grams(float(item['quantity']), item['unit']),
+                'chemistry': {compound: getattr(ingredient.chemistry, compound) for compound in COMPOUNDS},
+            })
+
+        if sum(line_item['quantity_grams'] for line_item in line_items) <= 0:
+            return Response(
+                {'error': 'Total weight must be greater than zero'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        result = analyze_composition(line_items)
+        return Response(CompositionAnalysisSerializer(result).data)
+
+    def _pairing_limit(self, default):
+        try:
+            return max(1, min(int(self.request.query_params.get('limit', default)), 100))
+        except ValueError:
+            return default
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the full catalog as Arrow IPC, Parquet or msgpack (?output=)"""
+        file_format = request.query_params.get('output') or default_format()
+        try:
+            check_format(file_format)
+        except ExportUnavailable as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The body is generated after dispatch returns, outside replica_reads(),
+        # so pin the database this request was routed to
+        using = router.db_for_read(Ingredient)
+        content_type, extension = EXPORT_FORMATS[file_format]
+        response = StreamingHttpResponse(stream_export(file_format, using=using), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="catalog.{extension}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def stream(self, request):
+        """Stream every ingredient matching the list filters as NDJSON"""
+        try:
+            chunk_size = max(100, min(int(request.query_params.get('chunk_size', 2000)), 10000))
+        except ValueError:
+            chunk_size = 2000
+
+        # Same filters and ordering as the list, without pagination or the
+        # alias prefetch the list serializer never reads; pinned to the routed
+        # database because the body is generated after dispatch returns
+        queryset = self.get_queryset().prefetch_related(None).using(router.db_for_read(Ingredient))
+        return StreamingHttpResponse(
+            stream_ndjson(queryset, IngredientListSerializer, chunk_size),
+            content_type='application/x-ndjson',
+        )
+
+    @action(detail=False, methods=['get'])
+    def histograms(self, request):
+        """Binned distributions of umami_aa/nuc/synergy for the range sliders
+
+        Conditional on the categorical filters (category[], dietary[], flavor[]);
+        summed from the per-cell histograms precomputed by build_histograms.
+        """
+        params = request.query_params
+        metrics = params.getlist('metric[]') or params.getlist('metric') or list(HISTOGRAM_METRICS)
+        unknown = [metric for metric in metrics if metric not in HISTOGRAM_METRICS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown metric(s): {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(coalesced(
+            'histograms', request_key(request), lambda: self._histogram_data(params, metrics)
+        ))
+
+    def _histogram_data(self, params, metrics):
+        histograms = ChemistryHistogram.objects.filter(metric__in=metrics)
+        categories = params.getlist('category[]')
+        if categories:
+            histograms = histograms.filter(category__in=categories)
+        dietary = params.getlist('dietary[]') or params.getlist('dietary')
+        diet_classes = {
+            diet_class
+            for diet in dietary
+            for diet_class in DIET_FILTER_CLASSES.get((diet or '').lower(), ())
         }
+        if diet_classes:
+            histograms = histograms.filter(diet_class__in=diet_classes)
+        roles = [role for role in params.getlist('flavor[]') if role in FLAVOR_ROLES]
+        if roles:
+            histograms = histograms.filter(flavor_role__in=roles)
+
+        results = {}
+        for histogram in histograms.values('metric', 'edges', 'counts', 'zero'):
+            entry = results.setdefault(histogram['metric'], {
+                'edges': histogram['edges'],
+                'counts': np.zeros(len(histogram['counts']), dtype=np.int64),
+                'zero': 0,
+            })
+            entry['counts'] += np.asarray(histogram['counts'], dtype=np.int64)
+            entry['zero'] += histogram['zero']
+
+        for metric in metrics:
+            entry = results.get(metric)
+            if entry is None:
+                results[metric] = {'edges': [], 'counts': [], 'zero': 0, 'total': 0, 'quantiles': {}}
+                continue
+            entry['quantiles'] = approximate_quantiles(entry['edges'], entry['counts'], entry['zero'])
+            entry['total'] = entry['zero'] + int(entry['counts'].sum())
+            entry['counts'] = entry['counts'].tolist()
+
+        return results
+
+    @action(detail=False, methods=['get'])
+    def levels(self, request):
+        """Quantile cut points behind the level 0-6 scale and the High filters"""
+        return Response(get_quantile_table().as_dict())
+
+    @action(detail=False, methods=['get'])
+    def top_pairings(self, request):
+        """Best precomputed 2-ingredient pairings, optionally for a category/diet slice"""
+        diet = request.query_params.get('dietary')
+        if diet and diet.lower() not in DIET_SLICES:
+            return Response(
+                {'error': f"Unsupported dietary value '{diet}'; use one of {', '.join(DIET_SLICES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        key = pairing_slice_key(category=request.query_params.get('category'), diet=diet)
+        pairings = (
+            Pairing.objects
+            .filter(slice=key)
+            .select_related('ingredient', 'partner')
+            .order_by('rank')[:self._pairing_limit(20)]
+        )
+        return Response({
+            'slice': key,
+            'results': PairingSerializer(pairings, many=True).data,
+        })
+
+    @action(detail=True, methods=['get'])
+    def pairings(self, request, pk=None):
+        """Precomputed top partners for one ingredient"""
+        try:
+            ingredient_id = int(pk)
+        except ValueError:
+            return Response(
+                {'error': f'Ingredient with id {pk} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        pairings = (
+            Pairing.objects
+            .filter(ingredient_id=ingredient_id, slice='')
+            .select_related('ingredient', 'partner')
+            .order_by('rank')[:self._pairing_limit(10)]
+        )
+        return Response(PairingSerializer(pairings, many=True).data)
 
-        result = {
-            'total_weight': float(total_weight),
-            'total_aa': float(total_aa),
-            'total_nuc': float(total_nuc),
-            'total_synergy': float(total_synergy),
-            'total_glu': float(total_glu),
-            'total_asp': float(total_asp),
-            'total_imp': float(total_imp),
-            'total_gmp': float(total_gmp),
-            'total_amp': float(total_amp),
-            'ingredients': ingredients_data,
-            'chart_data': chart_data,
-            'concentrations': {
-                'aa_mg_per_100g': float(weighted_aa_mg),
-                'nuc_mg_per_100g': float(weighted_nuc_mg),
-                'aa_g_per_100g': float(weighted_aa_g),
-                'nuc_g_per_100g': float(weighted_nuc_g),
-                'synergy_mg_per_100g': float(euc_mg)
+    @action(detail=True, methods=['get'])
+    def partners(self, request, pk=None):
+        """Top-k partners maximizing mixture EUC with this ingredient
+
+        ``quantity``/``unit`` set this ingredient's amount and
+        ``partner_quantity``/``partner_unit`` the partner's (both default to
+        100 g). Any get_queryset filter (dietary[], allergens_exclude[], ...)
+        restricts the candidates.
+        """
+        params = request.query_params
+        try:
+            ingredient_id = int(pk)
+        except ValueError:
+            return Response(
+                {'error': f'Ingredient with id {pk} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            quantity = convert_to_grams(float(params.get('quantity', 100)), params.get('unit', 'g'))
+            partner_quantity = convert_to_grams(
+                float(params.get('partner_quantity', 100)), params.get('partner_unit', 'g')
+            )
+            k = max(1, min(int(params.get('k', 10)), 50))
+        except ValueError:
+            return Response(
+                {'error': 'quantity, partner_quantity and k must be numeric'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # float() accepts 'nan' and 'inf', which would poison every score
+        if not (math.isfinite(quantity) and math.isfinite(partner_quantity)) or quantity <= 0 or partner_quantity <= 0:
+            return Response(
+                {'error': 'Quantities must be finite and greater than zero'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        index = get_partner_index()
+        if ingredient_id not in index.position:
+            return Response(
+                {'error': f'Ingredient with id {pk} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        allowed = None
+        if any(key not in PARTNER_SEARCH_PARAMS for key in params):
+            def allowed(candidate_ids):
+                return self.get_queryset().filter(id__in=candidate_ids).order_by().values_list('id', flat=True)
+
+        share = quantity / (quantity + partner_quantity)
+        results, examined = top_partners(index, ingredient_id, share, k=k, allowed=allowed)
+
+        names = Ingredient.objects.in_bulk([result[0] for result in results])
+        return Response({
+            'ingredient': ingredient_id,
+            'share': share,
+            'examined': examined,
+            'results': [
+                {
+                    'id': partner_id,
+                    'base_name': names[partner_id].base_name,
+                    'display_name': names[partner_id].display_name,
+                    'euc': euc,
+                    'umami_aa': aa,
+                    'umami_nuc': nuc,
+                }
+                for partner_id, euc, aa, nuc in results
+                if partner_id in names
+            ],
+        })
+
+
+class CatalogViewSet(viewsets.ViewSet):
+    """Points clients at the current static catalog snapshot and serves it.
+
+    GET /catalog/manifest/          hash and URL of the snapshot to filter locally
+    GET /catalog/snapshot/{file}/   the content-hashed snapshot (gzip/brotli when accepted)
+    """
+
+    @action(detail=False, methods=['get'])
+    def manifest(self, request):
+        manifest = read_manifest()
+        if manifest is None:
+            return Response({'error': 'Catalog snapshot has not been built'}, status=status.HTTP_404_NOT_FOUND)
+        response = Response(manifest)
+        # The manifest changes on rebuild; the hashed file it names never does
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    @action(detail=False, methods=['get'], url_path=f'snapshot/(?P<name>{SNAPSHOT_NAME_PATTERN})')
+    def snapshot(self, request, name=None):
+        # Read from disk per request: whitenoise would only see snapshots present at startup
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for path, encoding in snapshot_files(name):
+            if encoding is None or encoding in accepted:
+                response = FileResponse(open(path, 'rb'), content_type='application/json', filename=name)
+                if encoding:
+                    response['Content-Encoding'] = encoding
+                response['Vary'] = 'Accept-Encoding'
+                response['Cache-Control'] = 'public, max-age=31536000, immutable'
+                return response
+        return Response({'error': f'Catalog snapshot {name} not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class CompositionSessionViewSet(viewsets.ViewSet):
+    """Stateful composition sessions that accept delta operations.
+
+    POST   /composition-sessions/              create from a compose_preview payload
+    GET    /composition-sessions/{id}/         current result
+    POST   /composition-sessions/{id}/apply/   apply one delta or a list of deltas
+    DELETE /composition-sessions/{id}/         discard the session
+    """
+
+    def _respond(self, session, status_code=status.HTTP_200_OK):
+        result = session.result()
+        return Response(
+            {
+                'session_id': session.session_id,
+                'result': FloatCompositionResultSerializer(result).data if result is not None else None,
             },
-            'pui': float(pui),
-            'aa_nuc_ratio': float(aa_nuc_ratio),
-            'synergy_zone': synergy_zone,
-            'synergy_suggestion': synergy_suggestion
-        }
+            status=status_code,
+        )
 
-        result_serializer = CompositionResultSerializer(result)
-        return Response(result_serializer.data)
+    def _get_session(self, pk):
+        session = CompositionSession.load(pk)
+        if session is None:
+            return None, Response(
+                {'error': f'Composition session {pk} not found or expired'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return session, None
+
+    def create(self, request):
+        serializer = CompositionIngredientSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        session = CompositionSession()
+        try:
+            for item in serializer.validated_data:
+                session.add(item['ingredient_id'], item['quantity'], item['unit'])
+        except CompositionSessionError as exc:
+            return Response({'error': str(exc)}, status=exc.status_code)
+
+        session.save()
+        return self._respond(session, status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        session, error = self._get_session(pk)
+        if error:
+            return error
+        return self._respond(session)
+
+    def destroy(self, request, pk=None):
+        try:
+            # Under the lease so an in-flight apply cannot save the session back
+            with session_lease(pk):
+                session, error = self._get_session(pk)
+                if error:
+                    return error
+                session.delete()
+        except CompositionSessionError as exc:
+            return Response({'error': str(exc)}, status=exc.status_code)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def apply(self, request, pk=None):
+        """Apply add/remove/update deltas; totals change by the delta only"""
+        many = isinstance(request.data, list)
+        serializer = CompositionDeltaSerializer(data=request.data, many=many)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        deltas = serializer.validated_data if many else [serializer.validated_data]
+        try:
+            # Load, apply and save under the lease so overlapping requests cannot lose updates
+            with session_lease(pk):
+                session, error = self._get_session(pk)
+                if error:
+                    return error
+                for delta in deltas:
+                    session.apply(delta)
+                session.save()
+        except CompositionSessionError as exc:
+            # Nothing is saved, so a failed batch leaves the cached session untouched
+            return Response({'error': str(exc)}, status=exc.status_code)
+
+        return self._respond(session)
+
+
+class SavedRecipeViewSet(viewsets.ModelViewSet):
+    """The signed-in user's persisted compositions.
+
+    Scores are refreshed on every save and by rescore_recipes.
+    """
+    serializer_class = SavedRecipeSerializer
+    pagination_class = CustomPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedRecipe.objects.filter(owner=self.request.user).order_by('-updated_at')
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user, **score_items(serializer.validated_data['items']))
+
+    def perform_update(self, serializer):
+        # A partial update without items rescores the stored ones
+        items = serializer.validated_data.get('items', serializer.instance.items)
+        serializer.save(**score_items(items))
@@ -0,0 +1,114 @@
+"""Cache warm-up by replaying common requests through the full request stack.
+
+After a deploy or an import the first visitors pay for cold Postgres
+buffers and empty caches. ``warm_caches`` replays the most common list,
+filter and search requests plus the detail pages of the top-ranked
+ingredients with Django's test client, so every request goes through the
+middleware, routing, views and serializers exactly as live traffic does.
+
+Requests come from ``CACHE_WARMUP_REQUESTS`` (or ``DEFAULT_WARMUP_REQUESTS``)
+or, with ``--log``, from a recorded request log.
+
+Throttling is switched off for the replay: every request comes from the
+same client address, so ``AnonRateThrottle`` would start answering 429
+(warming nothing) once a long list passes the anon rate, and the replay
+would use up that address's allowance for real clients.
+"""
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.views import APIView
+
+from .hot_queries import HOT_LIST_SHAPES, list_queryset
+
+API_PREFIX = '/api/'
+
+# Landing list, the default sorts and facets, and the hot query shapes
+DEFAULT_WARMUP_REQUESTS = [
+    f'{API_PREFIX}ingredients/',
+    f'{API_PREFIX}ingredients/?sort=aa',
+    f'{API_PREFIX}ingredients/?sort=nuc',
+    f'{API_PREFIX}ingredients/?sort=alpha',
+    *(f'{API_PREFIX}ingredients/?{query}' for query in HOT_LIST_SHAPES.values()),
+    f'{API_PREFIX}ingredients/?dietary[]=vegan',
+    f'{API_PREFIX}ingredients/?dietary[]=vegetarian',
+    f'{API_PREFIX}ingredients/?flavor[]=high_umami',
+    f'{API_PREFIX}ingredients/histograms/',
+    f'{API_PREFIX}ingredients/levels/',
+    f'{API_PREFIX}ingredients/top_pairings/',
+    f'{API_PREFIX}catalog/manifest/',
+]
+
+# "GET /api/ingredients/?q=kombu HTTP/1.1" in access logs, or a bare path per line
+_LOG_REQUEST = re.compile(r'"GET (\S+) HTTP/[\d.]+"')
+
+
+def configured_requests():
+    return list(getattr(settings, 'CACHE_WARMUP_REQUESTS', None) or DEFAULT_WARMUP_REQUESTS)
+
+
+def requests_from_log(lines, top):
+    """The ``top`` most frequent GET API paths in an access log or path list"""
+    counts = Counter()
+    for line in lines:
+        line = line.strip()
+        match = _LOG_REQUEST.search(line)
+        path = match.group(1) if match else line
+        if path.startswith(API_PREFIX):
+            counts[path] += 1
+    return [path for path, _ in counts.most_common(top)]
+
+
+def detail_requests(count):
+    """Detail and pairing pages of the first ``count`` ingredients on the landing list"""
+    if count <= 0:
+        return []
+    ids = list_queryset('').values_list('id', flat=True)[:count]
+    return [
+        path
+        for pk in ids
+        for path in (f'{API_PREFIX}ingredients/{pk}/', f'{API_PREFIX}ingredients/{pk}/pairings/')
+    ]
+
+
+def _warmup_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and not host.startswith('.') and host != '*']
+    return hosts[0] if hosts else 'localhost'
+
+
+@contextmanager
+def unthrottled():
+    """Disable DRF throttling for views using the default throttle classes"""
+    # APIView copies DEFAULT_THROTTLE_CLASSES at import, so a settings override has no effect
+    throttle_classes = APIView.throttle_classes
+    APIView.throttle_classes = ()
+    try:
+        yield
+    finally:
+        APIView.throttle_classes = throttle_classes
+
+
+def replay(paths, concurrency=4):
+    """GET every path concurrently; returns ``[(path, status, ms)]`` in input order"""
+    from django.test import Client
+
+    host = _warmup_host()
+    # SECURE_SSL_REDIRECT would otherwise answer every request with a redirect
+    secure = getattr(settings, 'SECURE_SSL_REDIRECT', False)
+
+    def fetch(path):
+        client = Client(raise_request_exception=False, HTTP_HOST=host)
+        started = time.perf_counter()
+        try:
+            status = client.get(path, secure=secure).status_code
+        finally:
+            connections.close_all()
+        return path, status, (time.perf_counter() - started) * 1000
+
+    with unthrottled(), ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(fetch, paths))
@@ -1,5 +1,7 @@
 import os
 import dj_database_url
+import django
+from django.core.exceptions import ImproperlyConfigured
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +32,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Removes itself unless PROFILING_OUTPUT_DIR is set
+    'umami_api.profiling.ProfilingMiddleware',
+    # Removes itself unless prometheus_client is installed
+    'umami_api.metrics.MetricsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,6 +43,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Removes itself unless TRAFFIC_CAPTURE_PATH is set
+    'umami_api.traffic_capture.TrafficCaptureMiddleware',
+    # Removes itself when SLOW_QUERY_THRESHOLD_MS is 0
+    'umami_api.slow_queries.SlowQueryMiddleware',
 ]
 
 ROOT_URLCONF = 'umami_project.urls'
@@ -79,6 +89,50 @@ else:
         }
     }
 
+# Optional read replicas (comma-separated URLs) for IngredientViewSet reads;
+# writes and management commands always use the primary ('default')
+for index, replica_url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(','))):
+    DATABASES[f'replica_{index}'] = {
+        **dj_database_url.parse(replica_url.strip(), conn_max_age=600, conn_health_checks=True),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['umami_api.db_router.ReadReplicaRouter']
+
+# Pooled mode: native psycopg (3) connection pool plus server-side prepared
+# statements for any statement run DB_PREPARE_THRESHOLD times on a connection
+# (the hot search/filter/complementary templates). Requires psycopg[pool].
+# Behind PgBouncer transaction pooling set DB_PGBOUNCER=1; PgBouncer >= 1.21
+# needs max_prepared_statements > 0 to keep protocol-level prepares working.
+if os.getenv('DB_CONNECTION_POOL', '').lower() in ('1', 'true', 'yes'):
+    # The 'pool' option needs Django 5.1+ and psycopg 3 (psycopg2 ignores it and fails to connect)
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured('DB_CONNECTION_POOL requires Django 5.1 or newer')
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured("DB_CONNECTION_POOL requires psycopg 3 with pooling: pip install 'psycopg[binary,pool]'")
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 0  # The pool owns connection lifetime
+        database.setdefault('OPTIONS', {}).update({
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+            },
+            'prepare_threshold': int(os.getenv('DB_PREPARE_THRESHOLD', '2')),
+        })
+
+if os.getenv('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes'):
+    for database in DATABASES.values():
+        # Named server-side cursors do not survive transaction pooling
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Skip replicas lagging more than this many seconds (unset = no lag check)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS')) if os.getenv('REPLICA_MAX_LAG_SECONDS') else None
+REPLICA_LAG_CHECK_INTERVAL = int(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -102,6 +156,9 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Cache any file with a 12-hex content hash in its name forever (the manifest
+# storage's hashed assets; the catalog snapshot is served by /api/catalog/snapshot/)
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^.+\.[0-9a-f]{12}\.\w+$'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -160,10 +217,63 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
         'LOCATION': 'redis://127.0.0.1:6379/1',
         'OPTIONS': {
-            'CONNECTION_POOL_KWARGS': {
-                'max_connections': 50,
-            },
+            # Passed to redis-py's ConnectionPool
+            'max_connections': 50,
         },
         'TIMEOUT': 300,
     }
-}
\ No newline at end of file
+}
+# Composition sessions keep running totals in the cache between slider edits
+COMPOSITION_SESSION_TTL = int(os.getenv('COMPOSITION_SESSION_TTL', '3600'))
+# Seconds a delta waits for another request's session lease before answering 409
+COMPOSITION_SESSION_LEASE_WAIT = float(os.getenv('COMPOSITION_SESSION_LEASE_WAIT', '2.0'))
+
+# Cached list pages, histogram facets and detail payloads (see umami_api.single_flight):
+# fresh for RESPONSE_CACHE_TTL seconds (0 disables), then served stale for up to
+# RESPONSE_CACHE_STALE_TTL more while one worker holding a RESPONSE_CACHE_LEASE-second
+# lease recomputes; without a stale copy other workers wait up to RESPONSE_CACHE_WAIT seconds
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '60'))
+RESPONSE_CACHE_STALE_TTL = int(os.getenv('RESPONSE_CACHE_STALE_TTL', '600'))
+RESPONSE_CACHE_LEASE = int(os.getenv('RESPONSE_CACHE_LEASE', '30'))
+RESPONSE_CACHE_WAIT = float(os.getenv('RESPONSE_CACHE_WAIT', '2.0'))
+
+# Bearer token required by /metrics; unset keeps the endpoint closed (403)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Opt-in capture of /api/ingredients/ traffic for replay_traffic (JSONL; '{pid}' in the
+# path gives each worker its own file). Empty disables capture entirely.
+TRAFFIC_CAPTURE_PATH = os.getenv('TRAFFIC_CAPTURE_PATH', '')
+TRAFFIC_CAPTURE_SAMPLE_RATE = float(os.getenv('TRAFFIC_CAPTURE_SAMPLE_RATE', '1.0'))
+
+# On-demand request profiling: requests with 'X-Umami-Profile: <PROFILING_TOKEN>' or a
+# PROFILING_SAMPLE_RATE fraction of /api/ requests are profiled into PROFILING_OUTPUT_DIR.
+# Empty PROFILING_OUTPUT_DIR disables profiling entirely.
+PROFILING_OUTPUT_DIR = os.getenv('PROFILING_OUTPUT_DIR', '')
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', '0.005'))
+# Newest profiles kept in PROFILING_OUTPUT_DIR; older ones are deleted
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', '200'))
+
+# Slow query log (see umami_api.slow_queries): /api/ statements slower than
+# SLOW_QUERY_THRESHOLD_MS (0 disables) are stored with an EXPLAIN plan, each statement
+# template at most once per SLOW_QUERY_DEDUP_SECONDS and at most SLOW_QUERY_MAX_PER_MINUTE
+# per worker; plan capture is cut off after SLOW_QUERY_EXPLAIN_TIMEOUT_MS
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '1000'))
+SLOW_QUERY_DEDUP_SECONDS = int(os.getenv('SLOW_QUERY_DEDUP_SECONDS', '300'))
+SLOW_QUERY_MAX_PER_MINUTE = int(os.getenv('SLOW_QUERY_MAX_PER_MINUTE', '5'))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', '30000'))
+
+# Per-process partner search index is rebuilt after this many seconds
+PARTNER_INDEX_TTL = int(os.getenv('PARTNER_INDEX_TTL', '300'))
+
+# Request paths replayed by warm_caches (None: umami_api.warmup.DEFAULT_WARMUP_REQUESTS)
+CACHE_WARMUP_REQUESTS = [
+    path.strip() for path in os.getenv('CACHE_WARMUP_REQUESTS', '').split(',') if path.strip()
+] or None
+
+# Per-process Chinese (CJK bigram) search index is rebuilt after this many seconds
+CJK_INDEX_TTL = int(os.getenv('CJK_INDEX_TTL', '300'))
+
+# Per-process copy of the level cut point (quantile) table is reloaded after this many seconds
+QUANTILE_TABLE_TTL = int(os.getenv('QUANTILE_TABLE_TTL', '300'))
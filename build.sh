@@ -29,7 +29,31 @@ python manage.py load_fixture_data --file ../fixture_data.json.gz --clear
 echo "==> Initializing water ingredient..."
 python manage.py init_water || echo "Water ingredient initialization skipped"
 
+echo "==> Romanizing Chinese aliases..."
+python manage.py romanize_aliases
+
+echo "==> Normalizing dietary flags..."
+python manage.py normalize_dietary_flags
+
+echo "==> Building level cut points (quantiles) and flavor roles..."
+python manage.py build_quantiles
+
+echo "==> Building chemistry histograms..."
+python manage.py build_histograms
+
+echo "==> Precomputing ingredient pairings..."
+python manage.py build_pairings
+
+echo "==> Re-scoring saved recipes..."
+python manage.py rescore_recipes
+
 echo "==> Collecting static files..."
 python manage.py collectstatic --noinput
 
+echo "==> Building static catalog snapshot..."
+python manage.py build_catalog_snapshot
+
+echo "==> Warming caches..."
+python manage.py warm_caches || echo "Cache warm-up failed, continuing..."
+
 echo "==> Build complete!"
@@ -1,6 +1,7 @@
 import './globals.css'
 import type { Metadata } from 'next'
 import { Noto_Sans } from 'next/font/google'
+import { LevelCutsProvider } from '@/lib/levelCuts'
 
 const notoSans = Noto_Sans({ subsets: ['latin'], weight: ['100', '200', '300', '400', '500', '600', '700'] })
 
@@ -16,7 +17,9 @@ export default function RootLayout({
 }) {
   return (
     <html lang="en">
-      <body className={notoSans.className}>{children}</body>
+      <body className={notoSans.className}>
+        <LevelCutsProvider>{children}</LevelCutsProvider>
+      </body>
     </html>
   )
 }// Build: 1762107539
@@ -3,6 +3,7 @@
 import { LevelBars } from './LevelBars'
 import { BalanceSlider } from './BalanceSlider'
 import { formatValue, getUmamiDescription } from '@/lib/umamiLevels6'
+import { useLevelCuts } from '@/lib/levelCuts'
 import { Info } from 'lucide-react'
 
 interface CompositionChartProps {
@@ -21,7 +22,8 @@ export function CompositionChart({
   className = '' 
 }: CompositionChartProps) {
   
-  const umamiDescription = getUmamiDescription(synergy)
+  const levelCuts = useLevelCuts()
+  const umamiDescription = getUmamiDescription(synergy, levelCuts)
   
   return (
     <div className={`space-y-6 ${className}`}>
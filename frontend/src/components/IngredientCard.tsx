@@ -4,6 +4,7 @@ import type { KeyboardEvent } from 'react'
 import { Ingredient } from '@/types'
 import { LevelBars } from './LevelBars'
 import { getAALevel, getNucLevel, getSynergyLevel } from '@/lib/umamiLevels6'
+import { useLevelCuts } from '@/lib/levelCuts'
 
 type LabelMap = Record<string, string>
 
@@ -142,6 +143,7 @@ export function IngredientCard({
   const flags = ingredient.flags
   const showAddAction = Boolean(onAddToComposition)
   const flavors = tcm?.five_flavors ?? []
+  const levelCuts = useLevelCuts()
   const qi = tcm?.four_qi ?? []
   const hasTcmInfo = flavors.length > 0 || qi.length > 0
   const allergenItems = flags?.allergens ?? []
@@ -164,9 +166,9 @@ export function IngredientCard({
   const nuc = parseFloat(chemistry?.umami_nuc?.toString() || '0')
   const synergy = parseFloat(chemistry?.umami_synergy?.toString() || '0')
   
-  const aaLevel = getAALevel(aa).level
-  const nucLevel = getNucLevel(nuc).level
-  const synLevel = getSynergyLevel(synergy).level
+  const aaLevel = getAALevel(aa, levelCuts).level
+  const nucLevel = getNucLevel(nuc, levelCuts).level
+  const synLevel = getSynergyLevel(synergy, levelCuts).level
   
   // Staple foods that carry flavor
   const flavorCarriers = ['rice', 'bread', 'noodle', 'pasta', 'flour', 'wheat', 'grain']
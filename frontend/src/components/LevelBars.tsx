@@ -1,6 +1,7 @@
 'use client'
 
 import { getAALevel, getNucLevel, getSynergyLevel, formatValue } from '@/lib/umamiLevels6'
+import { useLevelCuts } from '@/lib/levelCuts'
 
 interface LevelBarsProps {
   aa: number // mg/100g
@@ -17,9 +18,10 @@ const NUC_COLORS = ['#FAF3E8', '#EFD9BA', '#DBBB8A', '#C69D5E', '#B8863A', '#A86
 const SYN_COLORS = ['#F9F3FC', '#EBD9F4', '#D5B5ED', '#C091E7', '#B67BE5', '#A865E4']
 
 export function LevelBars({ aa, nuc, synergy, size = 'small', showValues = false, className = '' }: LevelBarsProps) {
-  const aaLevel = getAALevel(aa)
-  const nucLevel = getNucLevel(nuc)
-  const synLevel = getSynergyLevel(synergy)
+  const cuts = useLevelCuts()
+  const aaLevel = getAALevel(aa, cuts)
+  const nucLevel = getNucLevel(nuc, cuts)
+  const synLevel = getSynergyLevel(synergy, cuts)
   
   const isSmall = size === 'small'
   const barHeight = isSmall ? 'h-2' : 'h-4'
@@ -10,6 +10,7 @@ import { BalanceSlider } from '@/components/BalanceSlider'
 import SynergyRatioDial from '@/components/SynergyRatioDial'
 import { Ingredient, FilterState, IngredientListResponse, CompositionState } from '@/types'
 import { searchIngredients, composePreview } from '@/lib/api'
+import { LevelCategory } from '@/lib/levelCuts'
 import { getUmamiLevel } from '@/lib/umamiLevels'
 
 interface StructuredSearchProps {
@@ -896,18 +897,21 @@ const handleAddWater = () => {
               {/* Results Grid - Mobile optimized */}
               {ingredients.length > 0 && (
                 <>
-                  <div className="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-4 gap-2 sm:gap-4 mb-6">
-                    {ingredients.map((ingredient) => (
-                      <div key={ingredient.id} className="paper-texture-light border border-gray-300 h-full">
-                        <IngredientCard
-                          ingredient={ingredient}
-                          onAddToComposition={handleAddIngredient}
-                          onOpenDetails={onOpenDetails}
-                          compact={true}
-                        />
-                      </div>
-                    ))}
-                  </div>
+                  {/* With one category selected, levels use that category's cut points (as the umami filter does) */}
+                  <LevelCategory category={filters.category.length === 1 ? filters.category[0] : null}>
+                    <div className="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-4 gap-2 sm:gap-4 mb-6">
+                      {ingredients.map((ingredient) => (
+                        <div key={ingredient.id} className="paper-texture-light border border-gray-300 h-full">
+                          <IngredientCard
+                            ingredient={ingredient}
+                            onAddToComposition={handleAddIngredient}
+                            onOpenDetails={onOpenDetails}
+                            compact={true}
+                          />
+                        </div>
+                      ))}
+                    </div>
+                  </LevelCategory>
                   
                   {/* Infinite scroll trigger */}
                   <div ref={observerTarget} className="h-4" />
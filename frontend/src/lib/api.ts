@@ -5,6 +5,7 @@ import {
   CompositionResult,
   FilterState 
 } from '@/types'
+import { LevelMetric } from './umamiLevels6'
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL 
   ? `${process.env.NEXT_PUBLIC_API_URL}/api`
@@ -87,6 +88,39 @@ export async function searchIngredients(
   return fetchAPI<IngredientListResponse>(`/ingredients/?${params.toString()}`)
 }
 
+export type HistogramMetric = 'umami_aa' | 'umami_nuc' | 'umami_synergy'
+
+export interface MetricHistogram {
+  edges: number[]   // log-spaced bin edges, mg/100g (counts[i] covers edges[i]..edges[i+1])
+  counts: number[]
+  zero: number      // ingredients with exactly 0
+  total: number
+  quantiles: Record<string, number | null>  // p10 ... p99, interpolated from the bins
+}
+
+export async function getHistograms(
+  filters: Partial<FilterState> = {}
+): Promise<Record<HistogramMetric, MetricHistogram>> {
+  // Only the categorical filters condition the precomputed histograms
+  const params = new URLSearchParams()
+  filters.category?.forEach(value => params.append('category[]', value))
+  filters.dietary?.forEach(value => params.append('dietary[]', value))
+  filters.flavor?.forEach(value => params.append('flavor[]', value))
+  return fetchAPI<Record<HistogramMetric, MetricHistogram>>(`/ingredients/histograms/?${params.toString()}`)
+}
+
+export interface LevelTable {
+  quantiles: Record<string, number>
+  level_cuts: number[]   // upper bounds of levels 1-5 (P25, P50, P75, P90, P95)
+  high_threshold: number // P90: the "High" filter and high-umami role threshold
+  by_category: Record<string, Record<string, number>>
+  level_cuts_by_category: Record<string, number[]> // categories with their own quantiles
+}
+
+export async function getLevelTable(): Promise<Record<LevelMetric, LevelTable>> {
+  return fetchAPI<Record<LevelMetric, LevelTable>>('/ingredients/levels/')
+}
+
 export async function getIngredient(id: number): Promise<Ingredient> {
   return fetchAPI<Ingredient>(`/ingredients/${id}/`)
 }
@@ -100,6 +134,116 @@ export async function composePreview(
   })
 }
 
+export interface CompositionAnalysis {
+  total_weight: number
+  total_synergy: number
+  pui: number
+  items: Array<{
+    id: number
+    name: string
+    quantity_grams: number
+    marginal_euc_per_g: number
+    marginal_pui_per_g: number
+    leave_one_out: {
+      euc_without: number
+      pui_without: number
+      euc_delta: number
+      pui_delta: number
+    }
+  }>
+}
+
+export async function composeAnalysis(
+  ingredients: CompositionIngredient[]
+): Promise<CompositionAnalysis> {
+  return fetchAPI<CompositionAnalysis>('/ingredients/compose_analysis/', {
+    method: 'POST',
+    body: JSON.stringify(ingredients),
+  })
+}
+
+export interface CompositionSessionResponse {
+  session_id: string
+  result: CompositionResult | null
+}
+
+export type CompositionDelta =
+  | { op: 'add'; ingredient_id: number; quantity: number; unit: string }
+  | { op: 'update'; ingredient_id: number; quantity: number; unit: string }
+  | { op: 'remove'; ingredient_id: number }
+
+export async function createCompositionSession(
+  ingredients: CompositionIngredient[]
+): Promise<CompositionSessionResponse> {
+  return fetchAPI<CompositionSessionResponse>('/composition-sessions/', {
+    method: 'POST',
+    body: JSON.stringify(ingredients),
+  })
+}
+
+// Last pending delta request per session; deltas are sent one at a time so a
+// fast slider drag arrives in order and the final value always wins
+const pendingDeltas = new Map<string, Promise<unknown>>()
+
+export async function applyCompositionDelta(
+  sessionId: string,
+  deltas: CompositionDelta | CompositionDelta[]
+): Promise<CompositionSessionResponse> {
+  const previous = pendingDeltas.get(sessionId) ?? Promise.resolve()
+  const request = previous
+    .catch(() => undefined)
+    .then(() =>
+      fetchAPI<CompositionSessionResponse>(`/composition-sessions/${sessionId}/apply/`, {
+        method: 'POST',
+        body: JSON.stringify(deltas),
+      })
+    )
+  pendingDeltas.set(sessionId, request)
+  try {
+    return await request
+  } finally {
+    if (pendingDeltas.get(sessionId) === request) pendingDeltas.delete(sessionId)
+  }
+}
+
+export interface CatalogManifest {
+  schema_version: number
+  hash: string
+  file: string
+  url: string
+  count: number
+  bytes: number
+  generated_at: string
+}
+
+// Columnar catalog snapshot: columns[name][i] is ingredient i's value; coded
+// facets index into vocab[facet]; tags[facet][i] is a bitset over vocab[facet]
+// (a number, or an array of 32-bit words for vocabularies over 32 entries)
+export interface CatalogSnapshot {
+  schema_version: number
+  count: number
+  level_cuts: Record<'umami_aa' | 'umami_nuc' | 'umami_synergy', number[]>
+  // Cut points for a single-category view, as the umami[] filter uses them
+  category_level_cuts?: Record<'umami_aa' | 'umami_nuc' | 'umami_synergy', Record<string, number[]>>
+  vocab: Record<string, string[]>
+  columns: Record<string, Array<number | string | null>>
+  tags: Record<string, Array<number | number[]>>
+}
+
+export async function getCatalogManifest(): Promise<CatalogManifest> {
+  return fetchAPI<CatalogManifest>('/catalog/manifest/', { cache: 'no-cache' })
+}
+
+export async function getCatalogSnapshot(manifest: CatalogManifest): Promise<CatalogSnapshot> {
+  // The snapshot URL is content-hashed and served with immutable caching
+  const origin = API_BASE.replace(/\/api$/, '')
+  const response = await fetch(`${origin}${manifest.url}`)
+  if (!response.ok) {
+    throw new APIError(`Catalog snapshot unavailable: ${response.statusText}`, response.status)
+  }
+  return response.json()
+}
+
 // Utility functions for state management
 export function encodeState(state: any): string {
   return btoa(JSON.stringify(state))
@@ -0,0 +1,76 @@
+'use client'
+
+import { createContext, useContext, useEffect, useMemo, useState, type ReactNode } from 'react'
+import { getLevelTable } from './api'
+import { DEFAULT_LEVEL_CUTS, LevelCuts, LevelMetric } from './umamiLevels6'
+
+const METRICS: LevelMetric[] = ['umami_aa', 'umami_nuc', 'umami_synergy']
+
+interface LevelTableState {
+  cuts: LevelCuts
+  byCategory: Record<LevelMetric, Record<string, number[]>>
+}
+
+const DEFAULT_STATE: LevelTableState = {
+  cuts: DEFAULT_LEVEL_CUTS,
+  byCategory: { umami_aa: {}, umami_nuc: {}, umami_synergy: {} },
+}
+
+const LevelTableContext = createContext<LevelTableState>(DEFAULT_STATE)
+const LevelCategoryContext = createContext<string | null>(null)
+
+/**
+ * Loads the server's quantile table once and re-renders every level consumer
+ * when it arrives; the built-in defaults apply until then.
+ */
+export function LevelCutsProvider({ children }: { children: ReactNode }) {
+  const [state, setState] = useState<LevelTableState>(DEFAULT_STATE)
+
+  useEffect(() => {
+    let cancelled = false
+    getLevelTable()
+      .then(table => {
+        if (cancelled) return
+        setState({
+          cuts: {
+            umami_aa: table.umami_aa.level_cuts,
+            umami_nuc: table.umami_nuc.level_cuts,
+            umami_synergy: table.umami_synergy.level_cuts,
+          },
+          byCategory: {
+            umami_aa: table.umami_aa.level_cuts_by_category ?? {},
+            umami_nuc: table.umami_nuc.level_cuts_by_category ?? {},
+            umami_synergy: table.umami_synergy.level_cuts_by_category ?? {},
+          },
+        })
+      })
+      .catch(error => console.error('Error loading level cut points:', error))
+    return () => {
+      cancelled = true
+    }
+  }, [])
+
+  return <LevelTableContext.Provider value={state}>{children}</LevelTableContext.Provider>
+}
+
+/**
+ * Levels below this use the category's own cut points (global ones where it has
+ * none), matching the umami[] filter when exactly one category[] is selected.
+ */
+export function LevelCategory({ category, children }: { category: string | null; children: ReactNode }) {
+  return <LevelCategoryContext.Provider value={category}>{children}</LevelCategoryContext.Provider>
+}
+
+export function useLevelCuts(): LevelCuts {
+  const { cuts, byCategory } = useContext(LevelTableContext)
+  const category = useContext(LevelCategoryContext)
+  return useMemo(() => {
+    if (!category) return cuts
+    const scoped = { ...cuts }
+    METRICS.forEach(metric => {
+      const categoryCuts = byCategory[metric][category]
+      if (categoryCuts) scoped[metric] = categoryCuts
+    })
+    return scoped
+  }, [cuts, byCategory, category])
+}
@@ -16,50 +16,61 @@ export const COLORS = {
   SYN: '#E4ABF3'   // Purple
 }
 
+export type LevelMetric = 'umami_aa' | 'umami_nuc' | 'umami_synergy'
+
+export type LevelCuts = Record<LevelMetric, number[]>
+
+/**
+ * Upper bounds of levels 1-5 (P25, P50, P75, P90, P95) per metric, weighted
+ * mg/100g (Synergy: EUC). Level 0 is exactly 0; above the last bound is 6.
+ * These defaults apply until the server's quantile table has loaded; components
+ * read the live cut points through useLevelCuts() (levelCuts.tsx).
+ */
+export const DEFAULT_LEVEL_CUTS: LevelCuts = {
+  umami_aa: [13, 50, 260, 740, 1330],
+  umami_nuc: [15, 75, 290, 650, 870],
+  umami_synergy: [16, 76, 400, 1900, 11800],
+}
+
+const LEVEL_LABELS = ['None', 'Very Low', 'Low', 'Moderate', 'High', 'Very High', 'Exceptional']
+
+function levelFor(value: number, cuts: number[], colors: string[]): UmamiLevel6 {
+  let level = 0
+  if (value !== 0) {
+    level = 1 + cuts.filter(cut => value > cut).length
+  }
+  return { level: level as UmamiLevel6['level'], label: LEVEL_LABELS[level], color: colors[level] }
+}
+
 /**
  * Get AA level (0-6) based on weighted mg/100g
- * Thresholds based on actual data distribution (P25, P50, P75, P90, P95)
  * Pale green to deep forest green
  */
-export function getAALevel(mg: number): UmamiLevel6 {
-  if (mg === 0) return { level: 0, label: 'None', color: '#F3F4F6' }
-  if (mg <= 13) return { level: 1, label: 'Very Low', color: '#EEF4EB' }  // ~P25
-  if (mg <= 50) return { level: 2, label: 'Low', color: '#D4E5CF' }       // ~P50
-  if (mg <= 260) return { level: 3, label: 'Moderate', color: '#B0D1A7' } // ~P75
-  if (mg <= 740) return { level: 4, label: 'High', color: '#8AB87F' }     // ~P90
-  if (mg <= 1330) return { level: 5, label: 'Very High', color: '#73A36A' } // ~P95
-  return { level: 6, label: 'Exceptional', color: '#5E8756' }              // >P95
+export function getAALevel(mg: number, cuts: LevelCuts = DEFAULT_LEVEL_CUTS): UmamiLevel6 {
+  return levelFor(mg, cuts.umami_aa, [
+    '#F3F4F6', '#EEF4EB', '#D4E5CF', '#B0D1A7', '#8AB87F', '#73A36A', '#5E8756'
+  ])
 }
 
 /**
  * Get Nuc level (0-6) based on weighted mg/100g
- * Thresholds based on actual data distribution (P25, P50, P75, P90, P95)
  * Light sand to rich caramel brown
  */
-export function getNucLevel(mg: number): UmamiLevel6 {
-  if (mg === 0) return { level: 0, label: 'None', color: '#F3F4F6' }
-  if (mg <= 15) return { level: 1, label: 'Very Low', color: '#FAF3E8' }   // ~P25
-  if (mg <= 75) return { level: 2, label: 'Low', color: '#EFD9BA' }        // ~P50
-  if (mg <= 290) return { level: 3, label: 'Moderate', color: '#DBBB8A' }  // ~P75
-  if (mg <= 650) return { level: 4, label: 'High', color: '#C69D5E' }      // ~P90
-  if (mg <= 870) return { level: 5, label: 'Very High', color: '#B8863A' } // ~P95
-  return { level: 6, label: 'Exceptional', color: '#A86D1C' }               // >P95
+export function getNucLevel(mg: number, cuts: LevelCuts = DEFAULT_LEVEL_CUTS): UmamiLevel6 {
+  return levelFor(mg, cuts.umami_nuc, [
+    '#F3F4F6', '#FAF3E8', '#EFD9BA', '#DBBB8A', '#C69D5E', '#B8863A', '#A86D1C'
+  ])
 }
 
 /**
  * Get Synergy level (0-6) based on EUC value (mg MSG eq/100g)
- * Thresholds based on actual data distribution (P25, P50, P75, P90, P95)
  * Soft lilac to vibrant violet
  * Using formula: EUC = weighted_AA + 1218 × weighted_AA × weighted_Nuc
  */
-export function getSynergyLevel(euc: number): UmamiLevel6 {
-  if (euc === 0) return { level: 0, label: 'None', color: '#F3F4F6' }
-  if (euc <= 16) return { level: 1, label: 'Very Low', color: '#F9F3FC' }     // ~P25
-  if (euc <= 76) return { level: 2, label: 'Low', color: '#EBD9F4' }          // ~P50
-  if (euc <= 400) return { level: 3, label: 'Moderate', color: '#D5B5ED' }    // ~P75
-  if (euc <= 1900) return { level: 4, label: 'High', color: '#C091E7' }       // ~P90
-  if (euc <= 11800) return { level: 5, label: 'Very High', color: '#B67BE5' } // ~P95
-  return { level: 6, label: 'Exceptional', color: '#A865E4' }                  // >P95 (up to 448,753!)
+export function getSynergyLevel(euc: number, cuts: LevelCuts = DEFAULT_LEVEL_CUTS): UmamiLevel6 {
+  return levelFor(euc, cuts.umami_synergy, [
+    '#F3F4F6', '#F9F3FC', '#EBD9F4', '#D5B5ED', '#C091E7', '#B67BE5', '#A865E4'
+  ])
 }
 
 /**
@@ -99,8 +110,8 @@ export function calculateRatio(aa: number, nuc: number): { aa: number; nuc: numb
 /**
  * Get descriptive text for umami level
  */
-export function getUmamiDescription(synergy: number): string {
-  const level = getSynergyLevel(synergy)
+export function getUmamiDescription(synergy: number, cuts: LevelCuts = DEFAULT_LEVEL_CUTS): string {
+  const level = getSynergyLevel(synergy, cuts)
   
   switch (level.level) {
     case 0:
@@ -14,7 +14,31 @@ echo "===== Loading Fixture Data ====="
 # Load the pre-calculated ingredient data
 python manage.py load_fixture_data --file ../fixture_data.json.gz --clear
 
+echo "===== Romanizing Chinese Aliases ====="
+python manage.py romanize_aliases
+
+echo "===== Normalizing Dietary Flags ====="
+python manage.py normalize_dietary_flags
+
+echo "===== Building Level Cut Points (Quantiles) and Flavor Roles ====="
+python manage.py build_quantiles
+
+echo "===== Building Chemistry Histograms ====="
+python manage.py build_histograms
+
+echo "===== Precomputing Ingredient Pairings ====="
+python manage.py build_pairings
+
+echo "===== Re-scoring Saved Recipes ====="
+python manage.py rescore_recipes
+
 echo "===== Collecting Static Files ====="
 python manage.py collectstatic --noinput
 
+echo "===== Building Static Catalog Snapshot ====="
+python manage.py build_catalog_snapshot
+
+echo "===== Warming Caches ====="
+python manage.py warm_caches || echo "Cache warm-up failed, continuing..."
+
 echo "===== Build Complete ====="